@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Response
 from typing import List, Optional, Dict, Any
 
 from app.core.database import get_db
+from app.core.executor import task_executor
+from app.core.tracing import span
+from app.services.embeddings import prepare_match_embeddings, sentence_embedder
 from app.models.match import MatchRequest, MatchResult
 from app.services.advanced_matcher import AdvancedResumeMatcher
 from app.services.performance_monitor import performance_monitor
+from app.services.match_cache import match_result_cache
+from app.services.data_versions import data_versions
 
 router = APIRouter()
 
@@ -14,49 +19,76 @@ advanced_matcher = AdvancedResumeMatcher()
 @router.post("/advanced/calculate", response_model=List[Dict[str, Any]])
 @performance_monitor.monitor_performance("advanced_matching_endpoint")
 async def calculate_advanced_matches(
+    response: Response,
     request: MatchRequest = Body(...),
     db = Depends(get_db)
 ):
     """Calculate advanced matches between a job and resumes with semantic matching and bias detection"""
     try:
-        # Get job posting
-        job = db.jobs.find_one({"id": request.job_id})
-        if not job:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Job not found"
-            )
-        
-        # Get resumes
-        if request.resume_ids:
-            # Match with specific resumes
-            resumes = list(db.resumes.find({"id": {"$in": request.resume_ids}}))
-        else:
-            # Match with all resumes
-            resumes = list(db.resumes.find())
-        
-        if not resumes:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="No resumes found to match"
-            )
+        # Read the versions before the documents, so results are never cached under a newer version
+        versions = data_versions.match_versions(db, request.job_id)
+        model_version = sentence_embedder.model_version if request.vector_field == "embedding" else ""
+        cache_key = match_result_cache.key(
+            "advanced", request.job_id, versions, request.resume_ids, request.vector_field,
+            (advanced_matcher.vector_weight, advanced_matcher.skills_weight,
+             advanced_matcher.experience_weight, advanced_matcher.bias_detection), model_version
+        )
+        # Repeated requests for an unchanged job and resume corpus reuse the ranking
+        match_results = match_result_cache.get(cache_key)
         
-        # Calculate advanced matches
-        match_results = advanced_matcher.rank_resumes_advanced(job, resumes)
+        if match_results is None:
+            # Get job posting
+            job = db.jobs.find_one({"id": request.job_id})
+            if not job:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Job not found"
+                )
+            
+            # Get resumes
+            with span("load_resumes") as load_span:
+                if request.resume_ids:
+                    # Match with specific resumes
+                    resumes = list(db.resumes.find({"id": {"$in": request.resume_ids}}))
+                else:
+                    # Match with all resumes
+                    resumes = list(db.resumes.find())
+                if load_span is not None:
+                    load_span.set_attribute("resumes", len(resumes))
+            
+            if not resumes:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="No resumes found to match"
+                )
+            
+            # Embed documents that have no embedding from the current model yet
+            if request.vector_field == "embedding":
+                await task_executor.run(prepare_match_embeddings, db, job, resumes)
+            
+            # Calculate advanced matches
+            match_results = await task_executor.run(advanced_matcher.rank_resumes_advanced, job, resumes, request.vector_field)
+            match_result_cache.put(cache_key, match_results)
         
-        # Save matches to database
-        for result in match_results:
-            db.matches.update_one(
-                {
-                    "job_id": result["job_id"],
-                    "resume_id": result["resume_id"]
-                },
-                {"$set": result},
-                upsert=True
-            )
+        # Save matches to database, unless these results are already stored for the job
+        if match_result_cache.needs_persist(cache_key):
+            with span("persist", matches=len(match_results)):
+                for result in match_results:
+                    db.matches.update_one(
+                        {
+                            "job_id": result["job_id"],
+                            "resume_id": result["resume_id"]
+                        },
+                        {"$set": result},
+                        upsert=True
+                    )
+            match_result_cache.mark_persisted(cache_key)
         
+        response.headers["ETag"] = match_result_cache.etag(cache_key)
         return match_results
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -79,7 +111,7 @@ async def semantic_skills_matching(
                 detail="Both resume_skills and job_skills are required"
             )
         
-        result = advanced_matcher.semantic_skill_matching(resume_skills, job_skills)
+        result = await task_executor.run(advanced_matcher.semantic_skill_matching, resume_skills, job_skills)
         
         return {
             "matching_skills": result["matching_skills"],
@@ -88,6 +120,8 @@ async def semantic_skills_matching(
             "semantic_matches": result["semantic_matches"]
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -109,7 +143,7 @@ async def detect_bias(
                 detail="Text is required for bias detection"
             )
         
-        bias_result = advanced_matcher.detect_bias(text)
+        bias_result = await task_executor.run(advanced_matcher.detect_bias, text)
         
         return {
             "bias_detected": bias_result["bias_detected"],
@@ -118,6 +152,8 @@ async def detect_bias(
             "details": bias_result["details"]
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -3,14 +3,19 @@ from typing import List, Optional
 from datetime import datetime
 
 from app.core.database import get_db
+from app.core.executor import task_executor
 from app.models.job import Job
-from app.services.vectorizer import ResumeJobVectorizer
+from app.core.config import settings
+from app.services.vectorizer import get_shared_vectorizer
+from app.services.embeddings import sentence_embedder
 from app.services.text_processor import TextProcessor
+from app.services.data_versions import JOB_CORPUS, data_versions
+from app.services.match_cache import match_result_cache
 
 router = APIRouter()
 
 # Initialize services
-vectorizer = ResumeJobVectorizer("models/tfidf_vectorizer.pkl")
+vectorizer = get_shared_vectorizer(settings.TFIDF_MODEL_PATH)
 text_processor = TextProcessor()
 
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=Job)
@@ -24,9 +29,14 @@ async def create_job(
         job_text = f"{job.title} {job.description} {' '.join(job.requirements)} {' '.join(job.qualifications)}"
         
         # Vectorize job text
-        vector = vectorizer.vectorize(job_text)
+        vector = await task_executor.run(vectorizer.vectorize, job_text)
         job.vector = vector.tolist()
         
+        if settings.EMBEDDING_STORE:
+            embedding = await task_executor.run(sentence_embedder.embed, job_text)
+            job.embedding = embedding.tolist()
+            job.embedding_model = sentence_embedder.model_version
+        
         # Save to database
         job_dict = job.dict()
         # Fill in defaults for missing fields
@@ -40,10 +50,14 @@ async def create_job(
         job_dict.setdefault("vector", [])
         job_dict.setdefault("created_at", datetime.now())
         job_dict.setdefault("updated_at", datetime.now())
+        data_versions.assign_sequence(db, JOB_CORPUS, [job_dict])
         db.jobs.insert_one(job_dict)
+        data_versions.bump_job(db, job_dict["id"])
         
         return job
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -93,8 +107,13 @@ async def update_job(
     job_text = f"{job_update.title} {job_update.description} {' '.join(job_update.requirements)} {' '.join(job_update.qualifications)}"
     
     # Vectorize job text
-    vector = vectorizer.vectorize(job_text)
+    vector = await task_executor.run(vectorizer.vectorize, job_text)
     job_update.vector = vector.tolist()
+    
+    if settings.EMBEDDING_STORE:
+        embedding = await task_executor.run(sentence_embedder.embed, job_text)
+        job_update.embedding = embedding.tolist()
+        job_update.embedding_model = sentence_embedder.model_version
     job_update.updated_at = datetime.now()
     
     # Update in database
@@ -113,6 +132,8 @@ async def update_job(
         {"id": job_id},
         {"$set": job_update_dict}
     )
+    data_versions.bump_job(db, job_id, updated=True)
+    match_result_cache.invalidate_job(job_id)
     
     return job_update
 
@@ -128,4 +149,6 @@ async def delete_job(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Job not found"
         )
+    data_versions.bump_job(db, job_id, deleted=True)
+    match_result_cache.invalidate_job(job_id)
     return None
\ No newline at end of file
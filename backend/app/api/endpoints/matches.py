@@ -1,8 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Body
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Header, Response
+from typing import List, Literal, Optional
 
 from app.core.database import get_db
-from app.models.match import MatchRequest, MatchResult
+from app.core.executor import task_executor
+from app.core.tracing import span
+from app.services.embeddings import prepare_match_embeddings, job_text, sentence_embedder
+from app.services.embedding_index import resume_embedding_index
+from app.services.match_cache import match_result_cache
+from app.services.data_versions import data_versions, etag_matches
+from app.models.match import MatchRequest, MatchResult, EmbeddingSearchRequest
 from app.services.matcher import ResumeMatcher
 
 router = APIRouter()
@@ -10,14 +16,126 @@ router = APIRouter()
 # Initialize matcher
 matcher = ResumeMatcher()
 
+def _match_cache_key(db, job_id: str, resume_ids: Optional[List[str]], vector_field: str):
+    """Match cache key from the current job and corpus versions, without reading any documents"""
+    versions = data_versions.match_versions(db, job_id)
+    model_version = sentence_embedder.model_version if vector_field == "embedding" else ""
+    return match_result_cache.key(
+        "basic", job_id, versions, resume_ids, vector_field,
+        (matcher.vector_weight, matcher.skills_weight), model_version
+    )
+
+async def _calculate_matches(db, job_id: str, resume_ids: Optional[List[str]], vector_field: str):
+    """Ranked matches of a job and their ETag, served from the match cache when nothing changed"""
+    # Read the versions before the documents, so results are never cached under a newer version
+    cache_key = _match_cache_key(db, job_id, resume_ids, vector_field)
+    match_results = match_result_cache.get(cache_key)
+    
+    if match_results is None:
+        # Get job posting
+        job = db.jobs.find_one({"id": job_id})
+        if not job:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Job not found"
+            )
+        
+        # Get resumes
+        with span("load_resumes") as load_span:
+            if resume_ids:
+                # Match with specific resumes
+                resumes = list(db.resumes.find({"id": {"$in": resume_ids}}))
+            else:
+                # Match with all resumes
+                resumes = list(db.resumes.find())
+            if load_span is not None:
+                load_span.set_attribute("resumes", len(resumes))
+        
+        if not resumes:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No resumes found to match"
+            )
+        
+        # Embed documents that have no embedding from the current model yet
+        if vector_field == "embedding":
+            await task_executor.run(prepare_match_embeddings, db, job, resumes)
+        
+        # Calculate matches
+        match_results = await task_executor.run(matcher.rank_resumes, job, resumes, vector_field)
+        match_result_cache.put(cache_key, match_results)
+    
+    # Save matches to database, unless these results are already stored for the job
+    if match_result_cache.needs_persist(cache_key):
+        with span("persist", matches=len(match_results)):
+            for result in match_results:
+                db.matches.update_one(
+                    {
+                        "job_id": result["job_id"],
+                        "resume_id": result["resume_id"]
+                    },
+                    {"$set": result},
+                    upsert=True
+                )
+        match_result_cache.mark_persisted(cache_key)
+    
+    return match_results, match_result_cache.etag(cache_key)
+
 @router.post("/calculate", response_model=List[MatchResult])
 async def calculate_matches(
+    response: Response,
     request: MatchRequest = Body(...),
     db = Depends(get_db)
 ):
     """Calculate matches between a job and resumes"""
     try:
-        # Get job posting
+        match_results, etag = await _calculate_matches(db, request.job_id, request.resume_ids, request.vector_field)
+        response.headers["ETag"] = etag
+        return match_results
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error calculating matches: {str(e)}"
+        )
+
+@router.get("/calculate/{job_id}", response_model=List[MatchResult])
+async def get_calculated_matches(
+    job_id: str,
+    response: Response,
+    vector_field: Literal["vector", "embedding"] = "vector",
+    if_none_match: Optional[str] = Header(None),
+    db = Depends(get_db)
+):
+    """Matches of a job against all resumes; answers 304 if the If-None-Match ETag is still current"""
+    try:
+        # The ETag depends only on versions, so an unchanged result costs one small query
+        if if_none_match:
+            etag = match_result_cache.etag(_match_cache_key(db, job_id, None, vector_field))
+            if etag_matches(if_none_match, etag):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        
+        match_results, etag = await _calculate_matches(db, job_id, None, vector_field)
+        response.headers["ETag"] = etag
+        return match_results
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error calculating matches: {str(e)}"
+        )
+
+@router.post("/embedding/search", response_model=List[MatchResult])
+async def search_matches(
+    request: EmbeddingSearchRequest = Body(...),
+    db = Depends(get_db)
+):
+    """Match a job against its top_k nearest resumes in the quantized embedding index"""
+    try:
         job = db.jobs.find_one({"id": request.job_id})
         if not job:
             raise HTTPException(
@@ -25,40 +143,41 @@ async def calculate_matches(
                 detail="Job not found"
             )
         
-        # Get resumes
-        if request.resume_ids:
-            # Match with specific resumes
-            resumes = list(db.resumes.find({"id": {"$in": request.resume_ids}}))
-        else:
-            # Match with all resumes
-            resumes = list(db.resumes.find())
-        
-        if not resumes:
+        query = await task_executor.run(sentence_embedder.embed, job_text(job))
+        nearest = await task_executor.run(
+            resume_embedding_index.search, db, query, request.top_k, request.rerank
+        )
+        if not nearest:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="No resumes found to match"
             )
         
-        # Calculate matches
-        match_results = matcher.rank_resumes(job, resumes)
+        # Score the shortlist like /calculate, with the same embeddings as the index
+        resumes = list(db.resumes.find({"id": {"$in": [resume_id for resume_id, _ in nearest]}}))
+        await task_executor.run(prepare_match_embeddings, db, job, resumes)
+        match_results = await task_executor.run(matcher.rank_resumes, job, resumes, "embedding")
         
-        # Save matches to database
-        for result in match_results:
-            db.matches.update_one(
-                {
-                    "job_id": result["job_id"],
-                    "resume_id": result["resume_id"]
-                },
-                {"$set": result},
-                upsert=True
-            )
+        with span("persist", matches=len(match_results)):
+            for result in match_results:
+                db.matches.update_one(
+                    {
+                        "job_id": result["job_id"],
+                        "resume_id": result["resume_id"]
+                    },
+                    {"$set": result},
+                    upsert=True
+                )
+        match_result_cache.forget_persisted(job["id"])
         
         return match_results
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error calculating matches: {str(e)}"
+            detail=f"Error searching matches: {str(e)}"
         )
 
 @router.get("/job/{job_id}", response_model=List[MatchResult])
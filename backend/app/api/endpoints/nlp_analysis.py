@@ -1,8 +1,17 @@
-from fastapi import APIRouter, HTTPException, status, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Body
 from typing import Dict, List, Any, Optional
+import re
 import numpy as np
 
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.executor import task_executor
+from app.core.security import require_admin
 from app.services.advanced_nlp import nlp_processor
+from app.services.entity_extractor import entity_extractor
+from app.services.embeddings import sentence_embedder, word_embedder
+from app.services.embedding_cache import embedding_cache
+from app.services.phrase_counter import phrase_corpus
 from app.services.performance_monitor import performance_monitor
 
 router = APIRouter()
@@ -22,7 +31,7 @@ async def get_bert_embeddings(
                 detail="Text is required for BERT embeddings"
             )
         
-        embeddings = nlp_processor.get_bert_embeddings(text)
+        embeddings = await task_executor.run(nlp_processor.get_bert_embeddings, text)
         
         return {
             "text": text,
@@ -31,6 +40,8 @@ async def get_bert_embeddings(
             "model": "bert-base-uncased"
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -52,7 +63,7 @@ async def get_word2vec_embeddings(
                 detail="Text is required for Word2Vec embeddings"
             )
         
-        embeddings = nlp_processor.get_word2vec_embeddings(text)
+        embeddings = await task_executor.run(nlp_processor.get_word2vec_embeddings, text)
         
         return {
             "text": text,
@@ -61,6 +72,8 @@ async def get_word2vec_embeddings(
             "model": "word2vec"
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -82,7 +95,7 @@ async def get_hybrid_embeddings(
                 detail="Text is required for hybrid embeddings"
             )
         
-        embeddings = nlp_processor.get_hybrid_embeddings(text)
+        embeddings = await task_executor.run(nlp_processor.get_hybrid_embeddings, text)
         
         # Convert numpy arrays to lists for JSON serialization
         result = {}
@@ -97,6 +110,8 @@ async def get_hybrid_embeddings(
             "embeddings": result
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -118,7 +133,7 @@ async def recognize_entities(
                 detail="Text is required for entity recognition"
             )
         
-        entities = nlp_processor.advanced_entity_recognition(text)
+        entities = await task_executor.run(nlp_processor.advanced_entity_recognition, text)
         
         return {
             "text": text,
@@ -126,12 +141,53 @@ async def recognize_entities(
             "total_entities": sum(len(entities[key]) for key in entities)
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error in entity recognition: {str(e)}"
         )
 
+@router.get("/entities/patterns")
+async def get_entity_patterns():
+    """Get the active entity pattern set"""
+    return {
+        "patterns": nlp_processor.pattern_matcher.patterns,
+        "status": nlp_processor.pattern_matcher.get_status()
+    }
+
+@router.put("/entities/patterns", dependencies=[Depends(require_admin)])
+async def update_entity_patterns(
+    patterns: Dict[str, List[str]] = Body(...)
+):
+    """Replace the entity pattern set without restarting; in-flight requests finish with the old set
+
+    Admin only: a client-supplied regex with catastrophic backtracking would
+    stall every later entity recognition request.
+    """
+    try:
+        try:
+            await task_executor.run(nlp_processor.pattern_matcher.load, patterns)
+        except re.error as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid entity pattern: {str(e)}"
+            )
+        
+        return {
+            "patterns": nlp_processor.pattern_matcher.patterns,
+            "status": nlp_processor.pattern_matcher.get_status()
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error updating entity patterns: {str(e)}"
+        )
+
 @router.post("/sentiment/analyze")
 @performance_monitor.monitor_performance("sentiment_analysis_endpoint")
 async def analyze_sentiment(
@@ -147,13 +203,15 @@ async def analyze_sentiment(
                 detail="Text is required for sentiment analysis"
             )
         
-        sentiment = nlp_processor.sentiment_analysis(text)
+        sentiment = await task_executor.run(nlp_processor.sentiment_analysis, text)
         
         return {
             "text": text,
             "sentiment": sentiment
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -163,27 +221,49 @@ async def analyze_sentiment(
 @router.post("/phrases/extract")
 @performance_monitor.monitor_performance("key_phrases_endpoint")
 async def extract_key_phrases(
-    request: Dict[str, Any] = Body(...)
+    request: Dict[str, Any] = Body(...),
+    db = Depends(get_db)
 ):
-    """Extract key phrases from text"""
+    """Extract key phrases from text
+    
+    weighting "frequency" (default) ranks phrases by count in the text;
+    "tfidf" down-weights phrases common across stored resumes and jobs.
+    """
     try:
         text = request.get("text", "")
         num_phrases = request.get("num_phrases", 10)
+        weighting = request.get("weighting", "frequency")
         
         if not text:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Text is required for key phrase extraction"
             )
+        if weighting not in ("frequency", "tfidf"):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="weighting must be 'frequency' or 'tfidf'"
+            )
         
-        phrases = nlp_processor.extract_key_phrases(text, num_phrases)
+        if weighting == "tfidf":
+            # New and changed documents are counted in the background; this request uses the corpus as it is
+            phrase_corpus.refresh(db, nlp_processor.phrase_tokens)
+            phrases = await task_executor.run(nlp_processor.extract_key_phrases_tfidf, text, num_phrases)
+        else:
+            phrases = await task_executor.run(nlp_processor.extract_key_phrases, text, num_phrases)
         
-        return {
+        result = {
             "text": text,
             "key_phrases": phrases,
-            "num_phrases": len(phrases)
+            "num_phrases": len(phrases),
+            "weighting": weighting
         }
+        if weighting == "tfidf":
+            result["corpus"] = phrase_corpus.get_stats()
+        return result
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -205,13 +285,15 @@ async def analyze_complexity(
                 detail="Text is required for complexity analysis"
             )
         
-        complexity = nlp_processor.analyze_text_complexity(text)
+        complexity = await task_executor.run(nlp_processor.analyze_text_complexity, text)
         
         return {
             "text": text,
             "complexity": complexity
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -233,7 +315,11 @@ async def comprehensive_analysis(
                 detail="Text is required for comprehensive analysis"
             )
         
-        analysis = nlp_processor.comprehensive_text_analysis(text)
+        stages = request.get("stages")
+        try:
+            analysis = await task_executor.run(nlp_processor.comprehensive_text_analysis, text, stages)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
         
         # Convert numpy arrays to lists for JSON serialization
         if 'embeddings' in analysis:
@@ -245,12 +331,68 @@ async def comprehensive_analysis(
             "analysis": analysis
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error in comprehensive analysis: {str(e)}"
         )
 
+@router.post("/analysis/batch")
+@performance_monitor.monitor_performance("batch_analysis_endpoint")
+async def batch_analysis(
+    request: Dict[str, Any] = Body(...)
+):
+    """Analyze many texts at once, running only the requested stages"""
+    try:
+        texts = request.get("texts", [])
+        
+        if not texts or not all(isinstance(text, str) for text in texts):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="A non-empty list of texts is required for batch analysis"
+            )
+        
+        max_texts = settings.ANALYSIS_BATCH_MAX_TEXTS
+        if max_texts and len(texts) > max_texts:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Batch has {len(texts)} texts, which exceeds the {max_texts} text limit"
+            )
+        max_chars = settings.ANALYSIS_BATCH_MAX_CHARS
+        total_chars = sum(len(text) for text in texts)
+        if max_chars and total_chars > max_chars:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Batch has {total_chars} characters, which exceeds the {max_chars} character limit"
+            )
+        
+        stages = request.get("stages")
+        try:
+            analyses = await task_executor.run(nlp_processor.comprehensive_text_analysis_batch, texts, stages)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        
+        # Convert numpy arrays to lists for JSON serialization
+        for analysis in analyses:
+            if 'embeddings' in analysis:
+                for key, embedding in analysis['embeddings'].items():
+                    analysis['embeddings'][key] = embedding.tolist()
+        
+        return {
+            "count": len(analyses),
+            "analyses": analyses
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error in batch analysis: {str(e)}"
+        )
+
 @router.post("/resume/analyze")
 @performance_monitor.monitor_performance("resume_analysis_endpoint")
 async def analyze_resume(
@@ -288,7 +430,7 @@ async def analyze_resume(
         combined_text = " ".join(text_parts)
         
         # Perform comprehensive analysis
-        analysis = nlp_processor.comprehensive_text_analysis(combined_text)
+        analysis = await task_executor.run(nlp_processor.comprehensive_text_analysis, combined_text)
         
         # Convert numpy arrays to lists
         if 'embeddings' in analysis:
@@ -301,6 +443,8 @@ async def analyze_resume(
             "text_length": len(combined_text)
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -343,7 +487,7 @@ async def analyze_job(
         combined_text = " ".join(text_parts)
         
         # Perform comprehensive analysis
-        analysis = nlp_processor.comprehensive_text_analysis(combined_text)
+        analysis = await task_executor.run(nlp_processor.comprehensive_text_analysis, combined_text)
         
         # Convert numpy arrays to lists
         if 'embeddings' in analysis:
@@ -356,6 +500,8 @@ async def analyze_job(
             "text_length": len(combined_text)
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -376,11 +522,45 @@ async def get_model_status():
         return {
             "models": status,
             "available_features": list(status.keys()),
-            "total_models": sum(status.values())
+            "total_models": sum(status.values()),
+            "entity_pipeline": entity_extractor.get_status(),
+            "entity_patterns": nlp_processor.pattern_matcher.get_status(),
+            "embedding_backends": {
+                "sentence": sentence_embedder.get_status(),
+                "word": word_embedder.get_status()
+            }
         }
     
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error getting model status: {str(e)}"
+        )
+
+@router.post("/models/reload", dependencies=[Depends(require_admin)])
+async def reload_models():
+    """Reload the TF-IDF model, entity patterns and embedding models from disk, invalidating cached vectors of replaced models"""
+    try:
+        def reload():
+            nlp_processor.tfidf_model.reload()
+            nlp_processor.pattern_matcher.reload()
+            sentence_embedder.reload()
+            word_embedder.reload()
+        
+        await task_executor.run(reload)
+        
+        return {
+            "tfidf_model_version": nlp_processor.tfidf_model.model_version,
+            "entity_patterns": nlp_processor.pattern_matcher.get_status(),
+            "embedding_backends": {
+                "sentence": sentence_embedder.get_status(),
+                "word": word_embedder.get_status()
+            },
+            "embedding_cache": embedding_cache.get_stats()
+        }
+    
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error reloading models: {str(e)}"
         ) 
\ No newline at end of file
@@ -1,10 +1,19 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
 from typing import Dict, Any
-import psutil
+import asyncio
 import time
 from datetime import datetime
 
+from app.core.config import settings
+from app.core.executor import task_executor
+from app.core.memory import memory_accountant
+from app.core.profiler import sampling_profiler, ProfilerBusyError
+from app.core.security import require_admin
+from app.core.tracing import tracer, chrome_trace
 from app.services.performance_monitor import performance_monitor
+from app.services.parser_pool import parser_pool
+from app.services.embedding_index import resume_embedding_index
 
 router = APIRouter()
 
@@ -12,42 +21,31 @@ router = APIRouter()
 async def get_performance_metrics():
     """Get comprehensive performance metrics"""
     try:
-        # Get system metrics
-        cpu_percent = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
-        
-        # Get performance monitoring data
-        perf_summary = performance_monitor.get_performance_summary()
-        
-        # Get cache statistics
-        cache_stats = performance_monitor.get_cache_stats()
+        # System usage is sampled in the background, so this never blocks
+        system = performance_monitor.system_sampler.get_latest()
         
         metrics = {
             "timestamp": datetime.now().isoformat(),
             "system": {
-                "cpu_percent": cpu_percent,
-                "memory_percent": memory.percent,
-                "memory_available_gb": round(memory.available / (1024**3), 2),
-                "disk_percent": disk.percent,
-                "disk_free_gb": round(disk.free / (1024**3), 2)
+                "cpu_percent": system["cpu_percent"],
+                "memory_percent": system["memory_percent"],
+                "memory_available_gb": system["memory_available_gb"],
+                "disk_percent": system["disk_usage_percent"],
+                "disk_free_gb": system["disk_free_gb"],
+                "sampled_at": system["timestamp"]
             },
             "application": {
-                "basic_matching_time": perf_summary.get("basic_matching", {}).get("avg_time", 0.15),
-                "advanced_matching_time": perf_summary.get("advanced_matching", {}).get("avg_time", 0.35),
-                "vectorization_time": perf_summary.get("vectorization", {}).get("avg_time", 0.05),
-                "semantic_matching_time": perf_summary.get("semantic_matching", {}).get("avg_time", 0.001),
-                "bias_detection_time": perf_summary.get("bias_detection", {}).get("avg_time", 0.002),
-                "api_response_time": perf_summary.get("api_response", {}).get("avg_time", 0.3)
-            },
-            "cache": {
-                "hit_rate": cache_stats.get("hit_rate", 0.82),
-                "total_requests": cache_stats.get("total_requests", 1000),
-                "cache_hits": cache_stats.get("cache_hits", 820),
-                "cache_misses": cache_stats.get("cache_misses", 180)
+                name: {
+                    "calls": summary["calls"],
+                    "avg_time": summary["execution_time"]["mean"],
+                    "p95_time": summary["execution_time"]["p95"]
+                }
+                for name, summary in performance_monitor.function_summaries().items()
             },
-            "memory_usage_mb": round(memory.used / (1024**2), 2),
-            "uptime_seconds": time.time() - performance_monitor.start_time if hasattr(performance_monitor, 'start_time') else 0
+            "cache": performance_monitor.get_cache_stats(),
+            "memory_usage_mb": system["memory_used_mb"],
+            "process_memory_mb": system["process_rss_mb"],
+            "uptime_seconds": time.time() - performance_monitor.start_time
         }
         
         return metrics
@@ -58,6 +56,196 @@ async def get_performance_metrics():
             detail=f"Error getting performance metrics: {str(e)}"
         )
 
+@router.get("/executor")
+async def get_executor_stats():
+    """Get queue depth, concurrency and timing statistics of the CPU task executor"""
+    try:
+        return task_executor.get_stats()
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error getting executor stats: {str(e)}"
+        )
+
+@router.get("/caches")
+async def get_cache_stats():
+    """Get hit rates and sizes of the result cache and registered service caches"""
+    try:
+        return performance_monitor.get_cache_stats()
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error getting cache stats: {str(e)}"
+        )
+
+@router.get("/parser-pool")
+async def get_parser_pool_stats():
+    """Get worker, timeout and crash statistics of the isolated PDF parser pool"""
+    try:
+        return parser_pool.get_stats()
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error getting parser pool stats: {str(e)}"
+        )
+
+@router.get("/embedding-index")
+async def get_embedding_index_stats():
+    """Get size and build statistics of the quantized resume embedding index"""
+    try:
+        return resume_embedding_index.get_stats()
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error getting embedding index stats: {str(e)}"
+        )
+
+@router.get("/traces")
+async def get_slowest_traces(limit: int = 20, format: str = "json"):
+    """Get the slowest request traces as JSON or in Chrome trace event format"""
+    try:
+        if format not in ("json", "chrome"):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="format must be 'json' or 'chrome'"
+            )
+        traces = tracer.slowest(limit)
+        if format == "chrome":
+            return chrome_trace(traces)
+        return {
+            "traces": [trace.to_dict() for trace in traces],
+            "stats": tracer.get_stats()
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error getting traces: {str(e)}"
+        )
+
+@router.get("/traces/{trace_id}")
+async def get_trace(trace_id: str, format: str = "json"):
+    """Get one recent or slow trace by the id returned in the X-Trace-Id header"""
+    try:
+        trace = tracer.get(trace_id)
+        if trace is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Trace not found"
+            )
+        return chrome_trace([trace]) if format == "chrome" else trace.to_dict()
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error getting trace: {str(e)}"
+        )
+
+@router.get("/profile", dependencies=[Depends(require_admin)])
+async def run_profile(
+    seconds: float = Query(10.0, gt=0),
+    interval_ms: float = Query(10.0, ge=1, le=1000),
+    format: str = "collapsed",
+    include_idle: bool = False
+):
+    """Sample the stacks of every thread in this worker for a number of seconds
+
+    Returns collapsed stacks (for flamegraph.pl or speedscope) or a speedscope
+    JSON file. Admin only, and disabled unless PROFILER_ENABLED is set.
+    """
+    if not settings.PROFILER_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profiler is disabled"
+        )
+    if format not in ("collapsed", "speedscope"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="format must be 'collapsed' or 'speedscope'"
+        )
+    if seconds > settings.PROFILER_MAX_SECONDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"seconds must be at most {settings.PROFILER_MAX_SECONDS}"
+        )
+    try:
+        # Sample from a plain thread so the event loop keeps serving the traffic being profiled
+        profile = await asyncio.to_thread(
+            sampling_profiler.profile, seconds, interval_ms / 1000, include_idle
+        )
+        if format == "speedscope":
+            return profile.to_speedscope(name=f"profile {datetime.fromtimestamp(profile.start_time).isoformat()}")
+        return PlainTextResponse(profile.to_collapsed())
+    except ProfilerBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error profiling: {str(e)}"
+        )
+
+@router.get("/memory")
+async def get_memory_usage():
+    """Get the approximate footprint of models, vocabularies, indexes, caches and metrics buffers"""
+    try:
+        # Sizing large vocabularies walks every entry, so keep it off the event loop
+        return await asyncio.to_thread(memory_accountant.report)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error measuring memory usage: {str(e)}"
+        )
+
+@router.post("/memory/tracemalloc/start", dependencies=[Depends(require_admin)])
+async def start_tracemalloc(frames: int = Query(1, ge=1, le=64)):
+    """Start tracing allocations and take the baseline snapshot for /memory/tracemalloc/diff
+
+    Tracing slows down every allocation; stop it when done.
+    """
+    try:
+        return await asyncio.to_thread(memory_accountant.start_tracing, frames)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error starting tracemalloc: {str(e)}"
+        )
+
+@router.get("/memory/tracemalloc/diff", dependencies=[Depends(require_admin)])
+async def get_tracemalloc_diff(
+    limit: int = Query(25, ge=1, le=500),
+    group_by: str = "lineno",
+    rebase: bool = False
+):
+    """Get the allocation sites that grew most since the baseline snapshot"""
+    if group_by not in ("lineno", "filename", "traceback"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="group_by must be 'lineno', 'filename' or 'traceback'"
+        )
+    try:
+        return await asyncio.to_thread(memory_accountant.diff, limit, group_by, rebase)
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error diffing tracemalloc snapshots: {str(e)}"
+        )
+
+@router.post("/memory/tracemalloc/stop", dependencies=[Depends(require_admin)])
+async def stop_tracemalloc():
+    """Stop tracing allocations and drop the baseline snapshot"""
+    memory_accountant.stop_tracing()
+    return memory_accountant.tracemalloc_status()
+
 @router.get("/summary")
 async def get_performance_summary():
     """Get performance monitoring summary"""
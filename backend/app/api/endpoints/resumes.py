@@ -1,26 +1,38 @@
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, status, Form, Path
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, status, Form, Path, BackgroundTasks
 from typing import List, Optional
-from datetime import datetime
 import json
-import uuid
 import traceback
 import os
+import shutil
+import tempfile
 
 from app.core.database import get_db
+from app.core.executor import task_executor
 from app.models.resume import Resume
 from app.services.resume_parser import ResumeParser
-from app.services.vectorizer import ResumeJobVectorizer
+from app.core.config import settings
+from app.services.vectorizer import get_shared_vectorizer
 from app.services.text_processor import TextProcessor
+from app.services.resume_ingestion import ingest_resume_file, UnsupportedFormatError
+from app.services.bulk_ingestion import bulk_ingestion_manager, UploadLimitExceededError
+from app.services.parse_cache import parse_cache
+from app.services.document_extractor import DocumentLimitExceededError
+from app.services.parser_pool import ParserWorkerError
+from app.services.data_versions import RESUME_CORPUS, data_versions
 
 router = APIRouter()
 
+# Stored embeddings are internal matching data (quantized ones are raw bytes), never returned
+EMBEDDING_FIELDS = ("embedding", "embedding_q", "embedding_f16")
+RESUME_PROJECTION = {"_id": 0, **{field: 0 for field in EMBEDDING_FIELDS}}
+
 # Initialize services
 # Note: In production, you would load this from a database
 with open("data/skills_database.json", "r") as f:
     skills_database = json.load(f)
 
 resume_parser = ResumeParser(skills_database)
-vectorizer = ResumeJobVectorizer("models/tfidf_vectorizer.pkl")
+vectorizer = get_shared_vectorizer(settings.TFIDF_MODEL_PATH)
 text_processor = TextProcessor()
 
 @router.post("/")
@@ -33,81 +45,39 @@ async def create_resume(
         # Read file content
         content = await file.read()
         
-        # Store file name for better name extraction
-        resume_parser.current_file_name = os.path.splitext(file.filename)[0]
-        
-        # Parse resume based on file type
-        if file.filename.endswith(".pdf"):
-            resume_data = resume_parser.parse_pdf(content)
-        elif file.filename.endswith(".json"):
-            resume_data = resume_parser.parse_json(content)
-        else:
+        # Parse based on file type, validate, fill defaults and vectorize off the event loop
+        try:
+            resume = await task_executor.run(
+                ingest_resume_file, resume_parser, vectorizer, file.filename, content, db
+            )
+        except UnsupportedFormatError as e:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Unsupported file format. Please upload PDF or JSON."
+                detail=str(e)
+            )
+        except DocumentLimitExceededError as e:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=str(e)
+            )
+        except ParserWorkerError as e:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Could not parse document: {str(e)}"
             )
-        
-        # Ensure all required fields are present with default values
-        if "name" not in resume_data or not resume_data["name"] or resume_data["name"] == "Unknown":
-            # Try to extract name from filename
-            filename = os.path.splitext(file.filename)[0]
-            name_from_file = filename.replace('_', ' ').replace('-', ' ')
-            resume_data["name"] = name_from_file or "Unknown"
-            
-        if "education" not in resume_data or not resume_data["education"]:
-            resume_data["education"] = []
-            
-        if "experience" not in resume_data or not resume_data["experience"]:
-            resume_data["experience"] = []
-            
-        # Validate and fill missing fields in education entries
-        for edu in resume_data.get("education", []):
-            if "institution" not in edu or not edu["institution"]:
-                edu["institution"] = "Unknown Institution"
-            if "degree" not in edu or not edu["degree"]:
-                edu["degree"] = "Unknown Degree"
-        
-        # Validate and fill missing fields in experience entries
-        for exp in resume_data.get("experience", []):
-            if "company" not in exp or not exp["company"]:
-                exp["company"] = "Unknown Company"
-            if "title" not in exp or not exp["title"]:
-                exp["title"] = "Unknown Title"
-        
-        # Create resume object with validated data
-        resume = {
-            "id": str(uuid.uuid4()),
-            "name": resume_data.get("name", "Unknown"),
-            "email": resume_data.get("email"),
-            "phone": resume_data.get("phone"),
-            "summary": resume_data.get("summary", ""),
-            "skills": resume_data.get("skills", []),
-            "education": resume_data.get("education", []),
-            "experience": resume_data.get("experience", []),
-            "raw_text": resume_data.get("raw_text", ""),
-            "created_at": datetime.now(),
-            "updated_at": datetime.now()
-        }
-        
-        # Vectorize resume text
-        if resume["raw_text"]:
-            try:
-                vector = vectorizer.vectorize(resume["raw_text"])
-                resume["vector"] = vector.tolist()
-            except Exception as e:
-                print(f"Error vectorizing resume: {str(e)}")
-                resume["vector"] = []
         
         # Save to database
+        data_versions.assign_sequence(db, RESUME_CORPUS, [resume])
         db.resumes.insert_one(resume)
-        
-        # Clean up to help with memory usage
-        if hasattr(resume_parser, 'current_file_name'):
-            del resume_parser.current_file_name
+        data_versions.bump_resumes(db)
 
         resume.pop('_id', None)  # Remove MongoDB's _id field if present
+        for field in EMBEDDING_FIELDS:
+            resume.pop(field, None)
         return resume
     
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error processing resume: {str(e)}")
         print(traceback.format_exc())
@@ -116,19 +86,117 @@ async def create_resume(
             detail=f"Error processing resume: {str(e)}"
         )
 
+def _spool_uploads(files: List[UploadFile], upload_dir: str) -> List[str]:
+    """Copy uploaded files into upload_dir and return their paths"""
+    paths = []
+    for index, upload in enumerate(files):
+        filename = os.path.basename(upload.filename or f"upload_{index}")
+        path = os.path.join(upload_dir, f"{index}_{filename}")
+        with open(path, "wb") as f:
+            shutil.copyfileobj(upload.file, f)
+        paths.append(path)
+    return paths
+
+@router.post("/bulk", status_code=status.HTTP_202_ACCEPTED)
+async def create_resumes_bulk(
+    background_tasks: BackgroundTasks,
+    files: List[UploadFile] = File(...),
+    db = Depends(get_db)
+):
+    """Queue a zip archive or several resume files for background ingestion"""
+    upload_dir = tempfile.mkdtemp(prefix="resume_bulk_")
+    try:
+        # Spool uploads to disk so the worker pool can stream them after the request ends
+        paths = await task_executor.run(_spool_uploads, files, upload_dir)
+        
+        try:
+            job = await task_executor.run(bulk_ingestion_manager.create_job, upload_dir, paths)
+        except UploadLimitExceededError as e:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=str(e)
+            )
+        if job["total_files"] == 0:
+            bulk_ingestion_manager.discard_job(job["job_id"])
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="No supported resume files found. Please upload PDF, DOCX, TXT or JSON files, or a zip archive of them."
+            )
+        
+        background_tasks.add_task(bulk_ingestion_manager.run_job, job["job_id"], db)
+        return job
+    
+    except HTTPException:
+        shutil.rmtree(upload_dir, ignore_errors=True)
+        raise
+    except Exception as e:
+        shutil.rmtree(upload_dir, ignore_errors=True)
+        print(f"Error queuing bulk ingestion: {str(e)}")
+        print(traceback.format_exc())
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error queuing bulk ingestion: {str(e)}"
+        )
+
+@router.get("/bulk")
+async def get_bulk_jobs():
+    """Get progress of all tracked bulk ingestion jobs"""
+    return bulk_ingestion_manager.list_jobs()
+
+@router.get("/bulk/{job_id}")
+async def get_bulk_job(job_id: str):
+    """Get progress and throughput of a bulk ingestion job"""
+    job = bulk_ingestion_manager.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Bulk ingestion job not found")
+    return job
+
 @router.get("/")
 async def get_resumes(db = Depends(get_db)):
     """Get all resumes"""
-    resumes = list(db.resumes.find())
+    resumes = list(db.resumes.find({}, RESUME_PROJECTION))
     for resume in resumes:
         resume["id"] = str(resume.get("id", ""))
-        resume.pop("_id", None)  # Remove MongoDB's _id field
     return resumes
 
+@router.get("/duplicates")
+async def get_duplicate_resumes(db = Depends(get_db)):
+    """Get groups of resumes that were uploaded from byte-identical files"""
+    try:
+        groups = db.resumes.aggregate([
+            {"$match": {"content_hash": {"$exists": True}}},
+            {"$sort": {"created_at": 1}},
+            {"$group": {
+                "_id": "$content_hash",
+                "count": {"$sum": 1},
+                "resume_ids": {"$push": "$id"},
+                "names": {"$addToSet": "$name"}
+            }},
+            {"$match": {"count": {"$gt": 1}}},
+            {"$sort": {"count": -1}}
+        ])
+        duplicates = []
+        for group in groups:
+            group["content_hash"] = group.pop("_id")
+            duplicates.append(group)
+        
+        return {
+            "duplicate_groups": len(duplicates),
+            "duplicate_resumes": sum(group["count"] - 1 for group in duplicates),
+            "groups": duplicates,
+            "parse_cache": parse_cache.get_stats()
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error finding duplicate resumes: {str(e)}"
+        )
+
 @router.delete("/{resume_id}")
 async def delete_resume(resume_id: str, db = Depends(get_db)):
     """Delete a resume by ID"""
     result = db.resumes.delete_one({"id": resume_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Resume not found")
+    data_versions.bump_resumes(db, deleted=True)
     return {"message": "Resume deleted successfully"}
\ No newline at end of file
@@ -17,8 +17,117 @@ class Settings(BaseSettings):
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-for-jwt")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Sent as the X-Admin-Token header to reach admin endpoints (empty disables them)
+    ADMIN_TOKEN: str = os.getenv("ADMIN_TOKEN", "")
     
     # CORS settings
     BACKEND_CORS_ORIGINS: List[str] = ["http://localhost:3000"]
+    
+    # NLP settings
+    SPACY_MODEL: str = os.getenv("SPACY_MODEL", "en_core_web_sm")
+    NER_BATCH_SIZE: int = int(os.getenv("NER_BATCH_SIZE", "64"))
+    NER_N_PROCESS: int = int(os.getenv("NER_N_PROCESS", "1"))
+    TFIDF_MODEL_PATH: str = os.getenv("TFIDF_MODEL_PATH", "models/tfidf_vectorizer.pkl")
+    # JSON file of {entity type: [regex, ...]} for advanced entity recognition
+    # (empty or missing uses the built-in patterns)
+    ENTITY_PATTERNS_PATH: str = os.getenv("ENTITY_PATTERNS_PATH", "")
+    # Distinct n-grams whose document frequency is kept for TF-IDF key phrases
+    PHRASE_CORPUS_MAX_NGRAMS: int = int(os.getenv("PHRASE_CORPUS_MAX_NGRAMS", "200000"))
+    
+    # Batch text analysis: sentiment, key phrase and complexity stages run in
+    # ANALYSIS_N_PROCESS worker processes (1 keeps them in-process)
+    ANALYSIS_N_PROCESS: int = int(os.getenv("ANALYSIS_N_PROCESS", "1"))
+    ANALYSIS_CHUNK_SIZE: int = int(os.getenv("ANALYSIS_CHUNK_SIZE", "50"))
+    ANALYSIS_START_METHOD: str = os.getenv("ANALYSIS_START_METHOD", "spawn")
+    # Batch analysis request budgets (0 disables a limit)
+    ANALYSIS_BATCH_MAX_TEXTS: int = int(os.getenv("ANALYSIS_BATCH_MAX_TEXTS", "1000"))
+    ANALYSIS_BATCH_MAX_CHARS: int = int(os.getenv("ANALYSIS_BATCH_MAX_CHARS", "2000000"))
+    
+    # Local embedding backends ("onnx", "word2vec" or "hashing"). Models are read
+    # from disk only; hashing needs no model and is the fallback.
+    EMBEDDING_BACKEND: str = os.getenv("EMBEDDING_BACKEND", "hashing")
+    EMBEDDING_MODEL_PATH: str = os.getenv("EMBEDDING_MODEL_PATH", "")
+    EMBEDDING_DIMENSION: int = int(os.getenv("EMBEDDING_DIMENSION", "384"))
+    EMBEDDING_MAX_SEQ_LENGTH: int = int(os.getenv("EMBEDDING_MAX_SEQ_LENGTH", "256"))
+    EMBEDDING_BATCH_SIZE: int = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+    EMBEDDING_NUM_THREADS: int = int(os.getenv("EMBEDDING_NUM_THREADS", "1"))
+    EMBEDDING_STORE: bool = os.getenv("EMBEDDING_STORE", "true").lower() == "true"
+    WORD2VEC_MODEL_PATH: str = os.getenv("WORD2VEC_MODEL_PATH", "")
+    
+    # Stored resume embeddings and the search index are quantized ("int8",
+    # "float16" or "none"); the top_k * RERANK_FACTOR candidates are re-scored exactly
+    EMBEDDING_QUANTIZATION: str = os.getenv("EMBEDDING_QUANTIZATION", "int8")
+    EMBEDDING_RERANK_FACTOR: int = int(os.getenv("EMBEDDING_RERANK_FACTOR", "4"))
+    
+    # Embedding cache: in-process LRU bounded in bytes in front of a sqlite file
+    # (an empty path keeps the cache in memory only)
+    EMBEDDING_CACHE_ENABLED: bool = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+    EMBEDDING_CACHE_MAX_BYTES: int = int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    EMBEDDING_CACHE_PATH: str = os.getenv("EMBEDDING_CACHE_PATH", "data/embedding_cache.sqlite3")
+    
+    # Bulk ingestion settings (0 workers means one per CPU core)
+    BULK_INGEST_WORKERS: int = int(os.getenv("BULK_INGEST_WORKERS", "0"))
+    BULK_INGEST_BATCH_SIZE: int = int(os.getenv("BULK_INGEST_BATCH_SIZE", "50"))
+    BULK_INGEST_START_METHOD: str = os.getenv("BULK_INGEST_START_METHOD", "spawn")
+    # Per-upload caps on resume files and their uncompressed bytes, so a zip bomb
+    # is rejected before anything is extracted (0 disables a limit)
+    BULK_INGEST_MAX_FILES: int = int(os.getenv("BULK_INGEST_MAX_FILES", "10000"))
+    BULK_INGEST_MAX_BYTES: int = int(os.getenv("BULK_INGEST_MAX_BYTES", str(1024 * 1024 * 1024)))
+    
+    # Thread pool for blocking service calls (0 concurrency means one slot per
+    # worker, 0 queue means unbounded)
+    EXECUTOR_MAX_WORKERS: int = int(os.getenv("EXECUTOR_MAX_WORKERS", str(os.cpu_count() or 4)))
+    EXECUTOR_MAX_CONCURRENCY: int = int(os.getenv("EXECUTOR_MAX_CONCURRENCY", "0"))
+    EXECUTOR_MAX_QUEUE: int = int(os.getenv("EXECUTOR_MAX_QUEUE", "100"))
+    
+    # In-process tier of the resume parse cache (the full cache lives in MongoDB)
+    PARSE_CACHE_MAX_ENTRIES: int = int(os.getenv("PARSE_CACHE_MAX_ENTRIES", "1000"))
+    
+    # Ranked match results per job, resume set and weights (0 TTL keeps entries until evicted)
+    MATCH_CACHE_MAX_ENTRIES: int = int(os.getenv("MATCH_CACHE_MAX_ENTRIES", "256"))
+    MATCH_CACHE_MAX_BYTES: int = int(os.getenv("MATCH_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    MATCH_CACHE_TTL_SECONDS: float = float(os.getenv("MATCH_CACHE_TTL_SECONDS", "3600"))
+    
+    # PDF extraction budgets (0 disables a limit)
+    PDF_MAX_PAGES: int = int(os.getenv("PDF_MAX_PAGES", "30"))
+    PDF_MAX_BYTES: int = int(os.getenv("PDF_MAX_BYTES", str(10 * 1024 * 1024)))
+    PDF_MAX_TEXT_CHARS: int = int(os.getenv("PDF_MAX_TEXT_CHARS", "100000"))
+    PDF_TIME_BUDGET_SECONDS: float = float(os.getenv("PDF_TIME_BUDGET_SECONDS", "10"))
+    
+    # Isolated PDF parser worker processes (0 workers means one per CPU core,
+    # 0 memory limit or max tasks disables the limit)
+    PARSER_POOL_ENABLED: bool = os.getenv("PARSER_POOL_ENABLED", "true").lower() == "true"
+    PARSER_POOL_WORKERS: int = int(os.getenv("PARSER_POOL_WORKERS", "0"))
+    PARSER_POOL_TIMEOUT_SECONDS: float = float(os.getenv("PARSER_POOL_TIMEOUT_SECONDS", "30"))
+    PARSER_POOL_MEMORY_LIMIT_MB: int = int(os.getenv("PARSER_POOL_MEMORY_LIMIT_MB", "1024"))
+    PARSER_POOL_MAX_TASKS_PER_WORKER: int = int(os.getenv("PARSER_POOL_MAX_TASKS_PER_WORKER", "200"))
+    PARSER_POOL_START_METHOD: str = os.getenv("PARSER_POOL_START_METHOD", "spawn")
+    
+    # DOCX and plain-text extraction budgets (0 disables a limit)
+    DOCUMENT_MAX_BYTES: int = int(os.getenv("DOCUMENT_MAX_BYTES", str(10 * 1024 * 1024)))
+    DOCUMENT_MAX_TEXT_CHARS: int = int(os.getenv("DOCUMENT_MAX_TEXT_CHARS", "100000"))
+    
+    # Performance monitoring: reading process RSS around every monitored call
+    # costs more than the timing itself, so memory deltas are opt-in
+    PERFORMANCE_TRACK_MEMORY: bool = os.getenv("PERFORMANCE_TRACK_MEMORY", "false").lower() == "true"
+    # Recent calls kept per monitored function, and seconds between system stat samples
+    PERFORMANCE_RECENT_CALLS: int = int(os.getenv("PERFORMANCE_RECENT_CALLS", "1000"))
+    PERFORMANCE_SYSTEM_SAMPLE_SECONDS: float = float(os.getenv("PERFORMANCE_SYSTEM_SAMPLE_SECONDS", "5"))
+    # Prometheus text-format metrics at /metrics, with per-route request timing
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    
+    # In-process request tracing: the slowest and most recent traces are kept for
+    # /performance/traces, and exported to an OTLP/HTTP collector if an endpoint
+    # such as http://localhost:4318 is set
+    TRACING_ENABLED: bool = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+    TRACING_SLOWEST_TRACES: int = int(os.getenv("TRACING_SLOWEST_TRACES", "50"))
+    TRACING_RECENT_TRACES: int = int(os.getenv("TRACING_RECENT_TRACES", "100"))
+    TRACING_MAX_SPANS: int = int(os.getenv("TRACING_MAX_SPANS", "2000"))
+    TRACING_OTLP_ENDPOINT: str = os.getenv("TRACING_OTLP_ENDPOINT", "")
+    
+    # On-demand sampling profiler at /performance/profile (admin only); nothing
+    # runs between profiles
+    PROFILER_ENABLED: bool = os.getenv("PROFILER_ENABLED", "false").lower() == "true"
+    PROFILER_MAX_SECONDS: int = int(os.getenv("PROFILER_MAX_SECONDS", "60"))
 
 settings = Settings()
\ No newline at end of file
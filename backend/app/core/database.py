@@ -1,10 +1,12 @@
 from pymongo import MongoClient
 from pymongo.database import Database
 from app.core.config import settings
+from app.core.prometheus import mongo_command_listener
+from app.core.tracing import mongo_trace_listener
 from fastapi import Depends
 
-# Create a MongoDB client
-client = MongoClient(settings.MONGODB_URL)
+# Create a MongoDB client; the listeners time every command for /metrics and traces
+client = MongoClient(settings.MONGODB_URL, event_listeners=[mongo_command_listener, mongo_trace_listener])
 db = client[settings.DATABASE_NAME]
 
 def get_db() -> Database:
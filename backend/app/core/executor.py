@@ -0,0 +1,137 @@
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.tracing import span
+
+class ExecutorOverloadedError(HTTPException):
+    """Raised when too many calls are already waiting for a worker"""
+
+    def __init__(self, queue_depth: int):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Server is busy ({queue_depth} tasks queued). Please retry shortly."
+        )
+
+class TaskExecutor:
+    """Runs blocking service calls off the event loop in a bounded thread pool
+
+    Calls share the process with their caller, so they may take database handles
+    and mutate the shared service instances (e.g. pattern or model reloads).
+    Work that must be isolated in processes has its own pools (the PDF parser
+    pool and bulk ingestion).
+    """
+
+    def __init__(self,
+                 max_workers: int = None,
+                 max_concurrency: int = None,
+                 max_queue: int = None):
+        self.max_workers = max_workers or settings.EXECUTOR_MAX_WORKERS
+        self.max_concurrency = max_concurrency or settings.EXECUTOR_MAX_CONCURRENCY or self.max_workers
+        self.max_queue = max_queue if max_queue is not None else settings.EXECUTOR_MAX_QUEUE
+
+        self._pool: ThreadPoolExecutor = None
+        self._pool_lock = threading.Lock()
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        # Counters are only touched from the event loop thread
+        self.queued = 0
+        self.in_flight = 0
+        self.max_queue_depth = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.total_run_time = 0.0
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="task-executor"
+                    )
+        return self._pool
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run func(*args, **kwargs) in the worker pool and await its result
+        
+        func runs in a copy of the caller's context, so its tracing spans nest
+        under the caller's span.
+        """
+        with span(f"executor.run {getattr(func, '__qualname__', repr(func))}") as run_span:
+            return await self._run(run_span, func, *args, **kwargs)
+
+    async def _run(self, run_span, func: Callable, *args, **kwargs) -> Any:
+        if self.max_queue and self.queued >= self.max_queue:
+            self.rejected += 1
+            raise ExecutorOverloadedError(self.queued)
+
+        self.queued += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queued)
+        enqueued_at = time.perf_counter()
+
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+
+        started_at = time.perf_counter()
+        wait_time = started_at - enqueued_at
+        self.total_wait_time += wait_time
+        self.max_wait_time = max(self.max_wait_time, wait_time)
+        self.in_flight += 1
+        if run_span is not None:
+            run_span.set_attribute("wait_ms", wait_time * 1000)
+
+        try:
+            loop = asyncio.get_running_loop()
+            call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+            result = await loop.run_in_executor(self._get_pool(), call)
+            self.completed += 1
+            return result
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self.total_run_time += time.perf_counter() - started_at
+            self._semaphore.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth, concurrency and timing statistics"""
+        finished = self.completed + self.failed
+        started = finished + self.in_flight
+        return {
+            "max_workers": self.max_workers,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "queue_depth": self.queued,
+            "max_queue_depth": self.max_queue_depth,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_wait_seconds": self.total_wait_time / started if started else 0.0,
+            "max_wait_seconds": self.max_wait_time,
+            "avg_run_seconds": self.total_run_time / finished if finished else 0.0
+        }
+
+    def shutdown(self) -> None:
+        """Stop the worker pool"""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+# Global task executor instance
+task_executor = TaskExecutor()
@@ -0,0 +1,210 @@
+import sys
+import threading
+import tracemalloc
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+import psutil
+
+from app.core.profiler import short_path
+
+_CONTAINERS = (dict, list, tuple, set, frozenset, deque)
+
+def array_bytes(array: Any) -> int:
+    """Bytes of a numpy array's data; memory-mapped arrays are file-backed and count as 0"""
+    if array is None or isinstance(array, np.memmap):
+        return 0
+    return int(getattr(array, "nbytes", 0))
+
+def deep_sizeof(obj: Any, follow_objects: bool = False) -> int:
+    """Approximate bytes reachable from obj, counting shared objects once
+
+    Containers, numpy arrays and scipy sparse matrices are walked. Other
+    objects are counted shallowly unless follow_objects is set, in which case
+    their __dict__ and __slots__ are walked too; modules, classes and
+    functions are never followed.
+    """
+    seen = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+
+        if isinstance(item, np.ndarray):
+            # getsizeof includes the data only for arrays that own it
+            total += sys.getsizeof(item)
+            if not item.flags.owndata:
+                if isinstance(item.base, np.ndarray):
+                    # Views share their base's buffer, which is counted once through the base
+                    stack.append(item.base)
+                else:
+                    total += array_bytes(item)
+            continue
+        if hasattr(item, "indptr") and hasattr(item, "indices") and hasattr(item, "data"):
+            # scipy.sparse CSR/CSC matrix
+            stack.extend((item.data, item.indices, item.indptr))
+            continue
+
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, _CONTAINERS):
+            stack.extend(item)
+        elif follow_objects and not isinstance(item, (type, type(sys), type(deep_sizeof), str, bytes, int, float)):
+            attributes = getattr(item, "__dict__", None)
+            if attributes is not None:
+                stack.append(attributes)
+            for cls in type(item).__mro__:
+                for slot in getattr(cls, "__slots__", ()):
+                    if hasattr(item, slot):
+                        stack.append(getattr(item, slot))
+    return total
+
+def spacy_model_usage(nlp) -> Dict[str, Any]:
+    """Weight bytes per pipeline component plus static vectors of a spaCy Language
+
+    Layers shared between components (e.g. a tok2vec with listeners) are
+    counted once, under the first component that holds them. Disabled
+    components still hold their weights and are included.
+    """
+    seen = set()
+    components = {}
+    for name, component in nlp.components:
+        model = getattr(component, "model", None)
+        size = 0
+        if model is not None and hasattr(model, "walk"):
+            for node in model.walk():
+                if id(node) in seen:
+                    continue
+                seen.add(id(node))
+                for param in node.param_names:
+                    if node.has_param(param):
+                        size += int(node.get_param(param).nbytes)
+        components[name] = size
+
+    vectors = int(getattr(nlp.vocab.vectors.data, "nbytes", 0))
+    return {
+        "bytes": sum(components.values()) + vectors,
+        "components": components,
+        "vectors_bytes": vectors,
+        "strings": len(nlp.vocab.strings),
+        "lexemes": len(nlp.vocab)
+    }
+
+class MemoryAccountant:
+    """Registry of in-process memory consumers plus an optional tracemalloc snapshot diff
+
+    Each component registers a callable returning a dict whose "bytes" is its
+    approximate resident footprint; measurements only run when a report is asked for.
+    """
+
+    # Frames that only show the tracing machinery itself
+    SNAPSHOT_FILTERS = [
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        tracemalloc.Filter(False, "<unknown>")
+    ]
+
+    def __init__(self):
+        self.components: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        self.baseline: Optional[tracemalloc.Snapshot] = None
+        self._lock = threading.Lock()
+
+    def register(self, name: str, measure: Callable[[], Dict[str, Any]]) -> None:
+        """Include a component in memory reports"""
+        self.components[name] = measure
+
+    def report(self) -> Dict[str, Any]:
+        """Footprint of every registered component against the process RSS"""
+        components = {}
+        accounted = 0
+        for name, measure in sorted(self.components.items()):
+            try:
+                usage = measure()
+            except Exception as e:
+                usage = {"bytes": 0, "error": str(e)}
+            accounted += usage.get("bytes", 0)
+            components[name] = usage
+
+        rss = psutil.Process().memory_info().rss
+        return {
+            "process_rss_bytes": rss,
+            "accounted_bytes": accounted,
+            "unaccounted_bytes": rss - accounted,
+            "components": components,
+            "tracemalloc": self.tracemalloc_status()
+        }
+
+    def tracemalloc_status(self) -> Dict[str, Any]:
+        if not tracemalloc.is_tracing():
+            return {"tracing": False}
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "tracing": True,
+            "frames": tracemalloc.get_traceback_limit(),
+            "traced_bytes": current,
+            "peak_traced_bytes": peak,
+            "overhead_bytes": tracemalloc.get_tracemalloc_memory(),
+            "has_baseline": self.baseline is not None
+        }
+
+    def take_snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(self.SNAPSHOT_FILTERS)
+
+    def start_tracing(self, frames: int = 1) -> Dict[str, Any]:
+        """Start tracemalloc if needed and take the baseline snapshot
+
+        Tracing slows every allocation down noticeably, so it is only on
+        between start_tracing and stop_tracing.
+        """
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+            tracemalloc.reset_peak()
+            self.baseline = self.take_snapshot()
+        return self.tracemalloc_status()
+
+    def diff(self, limit: int = 25, group_by: str = "lineno", rebase: bool = False) -> Dict[str, Any]:
+        """Largest allocation changes since the baseline snapshot
+
+        With rebase, the current snapshot becomes the baseline of the next diff.
+        """
+        with self._lock:
+            if not tracemalloc.is_tracing() or self.baseline is None:
+                raise RuntimeError("tracemalloc is not tracing; start it first")
+            snapshot = self.take_snapshot()
+            stats = snapshot.compare_to(self.baseline, group_by)
+            if rebase:
+                self.baseline = snapshot
+
+        return {
+            "group_by": group_by,
+            "size_diff_bytes": sum(stat.size_diff for stat in stats),
+            "count_diff": sum(stat.count_diff for stat in stats),
+            "top": [
+                {
+                    "location": [f"{short_path(frame.filename)}:{frame.lineno}" for frame in stat.traceback],
+                    "size_bytes": stat.size,
+                    "size_diff_bytes": stat.size_diff,
+                    "count": stat.count,
+                    "count_diff": stat.count_diff
+                }
+                for stat in stats[:limit]
+            ],
+            "status": self.tracemalloc_status()
+        }
+
+    def stop_tracing(self) -> None:
+        with self._lock:
+            self.baseline = None
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+
+# Global memory accountant instance
+memory_accountant = MemoryAccountant()
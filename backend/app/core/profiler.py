@@ -0,0 +1,180 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+# Leaf frames of threads that are parked waiting for work (event loop select,
+# executor queues, condition waits); dropped unless idle stacks are requested
+IDLE_LEAVES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+    ("connection.py", "_poll"),
+    ("connection.py", "_recv"),
+}
+
+# A frame is (function name, file, first line of the function)
+Frame = Tuple[str, str, int]
+
+class ProfilerBusyError(Exception):
+    """Raised when a profile is requested while another one is running"""
+    pass
+
+def short_path(filename: str) -> str:
+    """Path relative to the working directory, or the last two components for library code"""
+    cwd = os.getcwd() + os.sep
+    if filename.startswith(cwd):
+        return filename[len(cwd):]
+    parts = filename.replace("\\", "/").split("/")
+    return "/".join(parts[-2:])
+
+class Profile:
+    """Stack counts of one profiling run, per thread"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.start_time = time.time()
+        self.duration = 0.0
+        self.samples = 0
+        self.stacks: Counter = Counter()  # (thread name, (frame, ...)) -> count
+
+    def to_collapsed(self) -> str:
+        """Brendan Gregg's collapsed stack format, as read by flamegraph.pl and speedscope"""
+        lines = []
+        for (thread_name, stack), count in self.stacks.most_common():
+            names = [thread_name] + [f"{name} ({filename}:{line})" for name, filename, line in stack]
+            lines.append(f"{';'.join(name.replace(';', ':') for name in names)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def to_speedscope(self, name: str = "profile") -> Dict[str, Any]:
+        """speedscope file format with one sampled profile per thread"""
+        frames: List[Dict[str, Any]] = []
+        frame_index: Dict[Frame, int] = {}
+        per_thread: Dict[str, Tuple[List[List[int]], List[float]]] = {}
+        for (thread_name, stack), count in self.stacks.items():
+            indexes = []
+            for frame in stack:
+                if frame not in frame_index:
+                    frame_index[frame] = len(frames)
+                    frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+                indexes.append(frame_index[frame])
+            samples, weights = per_thread.setdefault(thread_name, ([], []))
+            samples.append(indexes)
+            weights.append(count * self.interval)
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "resume-matching sampling profiler",
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": thread_name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": sum(weights),
+                    "samples": samples,
+                    "weights": weights
+                }
+                for thread_name, (samples, weights) in sorted(per_thread.items())
+            ]
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "started_at": self.start_time,
+            "duration_seconds": self.duration,
+            "interval_seconds": self.interval,
+            "samples": self.samples,
+            "distinct_stacks": len(self.stacks)
+        }
+
+class SamplingProfiler:
+    """On-demand wall-clock sampling profiler built on sys._current_frames
+
+    Nothing runs between profiles: a run samples the stacks of every thread of
+    this process at a fixed interval from the calling thread and stops after the
+    requested duration. Work in the PDF parser and bulk ingestion processes is not seen.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Code objects outlive samples, so their labels are computed once
+        self._frame_labels: Dict[Any, Frame] = {}
+        self.last_profile: Optional[Profile] = None
+
+    def _label(self, code) -> Frame:
+        label = self._frame_labels.get(code)
+        if label is None:
+            label = (code.co_name, short_path(code.co_filename), code.co_firstlineno)
+            self._frame_labels[code] = label
+        return label
+
+    def _stack(self, frame) -> Tuple[Frame, ...]:
+        stack = []
+        while frame is not None:
+            stack.append(self._label(frame.f_code))
+            frame = frame.f_back
+        stack.reverse()
+        return tuple(stack)
+
+    @staticmethod
+    def _is_idle(stack: Tuple[Frame, ...]) -> bool:
+        if not stack:
+            return True
+        name, filename, _ = stack[-1]
+        return (os.path.basename(filename), name) in IDLE_LEAVES
+
+    def profile(self, duration: float, interval: float = 0.01, include_idle: bool = False) -> Profile:
+        """Sample all threads for duration seconds, blocking the calling thread
+
+        Raises ProfilerBusyError if another profile is running.
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("A profile is already running")
+        try:
+            profile = Profile(interval)
+            own_thread = threading.get_ident()
+            start = time.perf_counter()
+            deadline = start + duration
+            next_sample = start
+            while True:
+                thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+                frames = sys._current_frames()
+                for thread_id, frame in frames.items():
+                    if thread_id == own_thread:
+                        continue
+                    stack = self._stack(frame)
+                    if not include_idle and self._is_idle(stack):
+                        continue
+                    profile.stacks[(thread_names.get(thread_id, f"thread-{thread_id}"), stack)] += 1
+                # Do not keep other threads' frames (and their locals) alive while sleeping
+                frames = frame = None
+                profile.samples += 1
+
+                next_sample += interval
+                now = time.perf_counter()
+                if next_sample >= deadline:
+                    break
+                if next_sample > now:
+                    time.sleep(next_sample - now)
+                else:
+                    # Fell behind (e.g. waiting for the GIL); skip missed ticks instead of bursting
+                    next_sample = now
+            profile.duration = time.perf_counter() - start
+            self.last_profile = profile
+            return profile
+        finally:
+            self._lock.release()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+# Global sampling profiler instance
+sampling_profiler = SamplingProfiler()
@@ -0,0 +1,272 @@
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
+
+from pymongo import monitoring
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Request latency buckets in seconds, as used by the Prometheus client libraries
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MONGO_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+MODEL_LOAD_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# A sample is (name suffix, labels, value); a family is (name, type, help, samples)
+Sample = Tuple[str, Dict[str, str], float]
+Family = Tuple[str, str, str, List[Sample]]
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    return repr(float(value)) if not isinstance(value, int) else str(value)
+
+def render_families(families: Sequence[Family]) -> str:
+    """Prometheus text exposition format (0.0.4) of metric families"""
+    lines = []
+    for name, metric_type, help_text, samples in families:
+        lines.append(f"# HELP {name} {_escape(help_text)}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for suffix, labels, value in samples:
+            label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+            lines.append(f"{name}{suffix}{{{label_text}}} {_format_value(value)}" if label_text
+                         else f"{name}{suffix} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+class _Metric:
+    """A metric family with one child per combination of label values"""
+
+    metric_type = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _samples(self, labels: Dict[str, str], child) -> List[Sample]:
+        raise NotImplementedError
+
+    def collect(self) -> Family:
+        samples = []
+        for values, child in list(self._children.items()):
+            samples.extend(self._samples(dict(zip(self.labelnames, values)), child))
+        return self.name, self.metric_type, self.help, samples
+
+class _Value:
+    __slots__ = ("value", "lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        with self.lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        with self.lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+class Counter(_Metric):
+    metric_type = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def _samples(self, labels, child):
+        return [("_total", labels, child.value)]
+
+class Gauge(_Metric):
+    metric_type = "gauge"
+
+    def _new_child(self):
+        return _Value()
+
+    def _samples(self, labels, child):
+        return [("", labels, child.value)]
+
+class _Buckets:
+    __slots__ = ("upper_bounds", "counts", "sum", "lock")
+
+    def __init__(self, upper_bounds: Tuple[float, ...]):
+        self.upper_bounds = upper_bounds
+        self.counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.upper_bounds, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+
+class Histogram(_Metric):
+    metric_type = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _Buckets(self.buckets)
+
+    def _samples(self, labels, child):
+        with child.lock:
+            counts, total = list(child.counts), child.sum
+        samples, cumulative = [], 0
+        for upper_bound, count in zip(self.buckets + (math.inf,), counts):
+            cumulative += count
+            samples.append(("_bucket", {**labels, "le": _format_value(upper_bound)}, cumulative))
+        samples.append(("_sum", labels, total))
+        samples.append(("_count", labels, cumulative))
+        return samples
+
+class MetricsRegistry:
+    """Metrics owned by the service plus collectors that read existing stats on each scrape"""
+
+    def __init__(self):
+        self.metrics: Dict[str, _Metric] = {}
+        self.collectors: Dict[str, Callable[[], List[Family]]] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def register_collector(self, name: str, collect: Callable[[], List[Family]]) -> None:
+        """Call collect on every scrape; it returns metric families"""
+        self.collectors[name] = collect
+
+    def register_stats(self, prefix: str, get_stats: Callable[[], Dict[str, Any]], help_text: str = "") -> None:
+        """Export every numeric field of a get_stats() dict as a gauge named prefix_field"""
+        def collect() -> List[Family]:
+            families = []
+            for key, value in get_stats().items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    families.append((f"{prefix}_{key}", "gauge", f"{help_text} {key}".strip(), [("", {}, value)]))
+            return families
+        self.register_collector(prefix, collect)
+
+    def collect(self) -> List[Family]:
+        families = [metric.collect() for metric in list(self.metrics.values())]
+        for name, collect in list(self.collectors.items()):
+            try:
+                families.extend(collect())
+            except Exception as e:
+                print(f"Error collecting {name} metrics: {e}")
+        return families
+
+    def render(self) -> str:
+        return render_families(self.collect())
+
+# Global metrics registry instance
+registry = MetricsRegistry()
+
+http_requests = registry.counter(
+    "http_requests", "HTTP requests handled", ("method", "route", "status"))
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route"))
+http_requests_in_progress = registry.gauge(
+    "http_requests_in_progress", "HTTP requests being handled", ("method",))
+mongo_command_duration = registry.histogram(
+    "mongo_command_duration_seconds", "MongoDB command latency", ("command", "status"), MONGO_BUCKETS)
+model_load_duration = registry.histogram(
+    "model_load_duration_seconds", "Time to load a model", ("model",), MODEL_LOAD_BUCKETS)
+model_last_load_seconds = registry.gauge(
+    "model_last_load_seconds", "Duration of the most recent load of a model", ("model",))
+
+class PrometheusMiddleware:
+    """ASGI middleware counting and timing HTTP requests per route template
+
+    Requests that match no route are labelled "unmatched", so arbitrary paths
+    cannot create unbounded label values.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = http_requests_in_progress.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_progress.dec()
+            # The router stores the matched route in the scope
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            http_request_duration.labels(method, route).observe(elapsed)
+            http_requests.labels(method, route, str(status_code)).inc()
+
+class MongoCommandListener(monitoring.CommandListener):
+    """Records the duration of every MongoDB command by command name"""
+
+    def started(self, event) -> None:
+        pass
+
+    def succeeded(self, event) -> None:
+        mongo_command_duration.labels(event.command_name, "succeeded").observe(event.duration_micros / 1e6)
+
+    def failed(self, event) -> None:
+        mongo_command_duration.labels(event.command_name, "failed").observe(event.duration_micros / 1e6)
+
+# Pass to MongoClient(event_listeners=[...])
+mongo_command_listener = MongoCommandListener()
+
+@contextmanager
+def time_model_load(model: str) -> Iterator[None]:
+    """Record how long the enclosed model load takes; failed loads are not recorded"""
+    start = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - start
+    model_load_duration.labels(model).observe(elapsed)
+    model_last_load_seconds.labels(model).set(elapsed)
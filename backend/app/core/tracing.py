@@ -0,0 +1,426 @@
+import contextvars
+import heapq
+import inspect
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+import urllib.request
+from collections import deque
+from functools import wraps
+from typing import Any, Dict, List, Optional
+
+from pymongo import monitoring
+
+from app.core.config import settings
+from app.core.memory import deep_sizeof, memory_accountant
+
+class Span:
+    """One timed stage of a trace; aggregate spans sum repeated calls under one parent"""
+
+    __slots__ = ("trace", "span_id", "parent_id", "name", "start_ns", "duration_ns",
+                 "thread_id", "attributes", "error", "count")
+
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = time.perf_counter_ns()
+        self.duration_ns = 0
+        self.thread_id = threading.get_ident()
+        self.attributes = attributes
+        self.error: Optional[str] = None
+        self.count = 1
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        span = {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ms": (self.start_ns - self.trace.start_ns) / 1e6,
+            "duration_ms": self.duration_ns / 1e6,
+            "thread_id": self.thread_id,
+            "attributes": dict(self.attributes)
+        }
+        if self.count > 1:
+            span["count"] = self.count
+        if self.error:
+            span["error"] = self.error
+        return span
+
+class Trace:
+    """Spans of one request, the first being the root"""
+
+    def __init__(self, name: str, attributes: Dict[str, Any], max_spans: int):
+        self.trace_id = os.urandom(16).hex()
+        self.start_time_ns = time.time_ns()
+        self.start_ns = time.perf_counter_ns()
+        self.max_spans = max_spans
+        self.dropped_spans = 0
+        self.spans: List[Span] = []
+        self.aggregates: Dict[tuple, Span] = {}
+        self.root = self.add_span(name, None, attributes)
+
+    def add_span(self, name: str, parent_id: Optional[str], attributes: Dict[str, Any]) -> Optional[Span]:
+        if len(self.spans) >= self.max_spans:
+            self.dropped_spans += 1
+            return None
+        span = Span(self, name, parent_id, attributes)
+        self.spans.append(span)
+        return span
+
+    @property
+    def duration_ns(self) -> int:
+        return self.root.duration_ns
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.root.name,
+            "start_time": self.start_time_ns / 1e9,
+            "duration_ms": self.duration_ns / 1e6,
+            "dropped_spans": self.dropped_spans,
+            "spans": [span.to_dict() for span in list(self.spans)]
+        }
+
+    def to_chrome_events(self) -> List[Dict[str, Any]]:
+        """Complete ("X") events of the Chrome trace event format, in microseconds"""
+        start_us = self.start_time_ns / 1000
+        pid = os.getpid()
+        events = []
+        for span in list(self.spans):
+            args = {**span.attributes, "trace_id": self.trace_id, "span_id": span.span_id}
+            if span.count > 1:
+                args["count"] = span.count
+            if span.error:
+                args["error"] = span.error
+            events.append({
+                "name": span.name,
+                "cat": "aggregate" if span.count > 1 else "span",
+                "ph": "X",
+                "ts": start_us + (span.start_ns - self.start_ns) / 1000,
+                "dur": span.duration_ns / 1000,
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": args
+            })
+        return events
+
+# Innermost open span of the current request, inherited by tasks and copied contexts
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+class _SpanContext:
+    """Context manager opening a child span of the current span; does nothing outside a trace"""
+
+    __slots__ = ("name", "attributes", "aggregate", "span", "token", "start_ns")
+
+    def __init__(self, name: str, aggregate: bool, attributes: Dict[str, Any]):
+        self.name = name
+        self.aggregate = aggregate
+        self.attributes = attributes
+        self.span: Optional[Span] = None
+        self.token = None
+
+    def __enter__(self) -> Optional[Span]:
+        parent = _current_span.get()
+        if parent is None:
+            return None
+        trace = parent.trace
+        if self.aggregate:
+            key = (parent.span_id, self.name)
+            span = trace.aggregates.get(key)
+            if span is None:
+                span = trace.add_span(self.name, parent.span_id, self.attributes)
+                if span is not None:
+                    trace.aggregates[key] = span
+                    span.count = 0
+            self.span = span
+            self.start_ns = time.perf_counter_ns()
+            # Stages inside an aggregate span are not traced separately
+            return span
+        self.span = trace.add_span(self.name, parent.span_id, self.attributes)
+        if self.span is not None:
+            self.token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        span = self.span
+        if span is None:
+            return
+        if self.aggregate:
+            span.duration_ns += time.perf_counter_ns() - self.start_ns
+            span.count += 1
+        else:
+            span.duration_ns = time.perf_counter_ns() - span.start_ns
+            _current_span.reset(self.token)
+        if exc_type is not None and not span.error:
+            span.error = f"{exc_type.__name__}: {exc}"
+
+def span(name: str, aggregate: bool = False, **attributes) -> _SpanContext:
+    """Time the enclosed block as a child of the current span
+
+    aggregate=True sums every call with the same name under the same parent
+    into one span with a count, for stages run once per resume.
+    """
+    return _SpanContext(name, aggregate, attributes)
+
+def traced(name: str = None, aggregate: bool = False):
+    """Decorator running a function, or awaiting a coroutine function, inside a span"""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with _SpanContext(span_name, aggregate, {}):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with _SpanContext(span_name, aggregate, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def record_span(name: str, duration_ns: int, **attributes) -> None:
+    """Add an already finished child span to the current span, e.g. from an event callback"""
+    parent = _current_span.get()
+    if parent is None:
+        return
+    span = parent.trace.add_span(name, parent.span_id, attributes)
+    if span is not None:
+        span.start_ns -= duration_ns
+        span.duration_ns = duration_ns
+
+class _TraceContext:
+    def __init__(self, tracer: "Tracer", name: str, attributes: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.trace: Optional[Trace] = None
+
+    def __enter__(self) -> Optional[Trace]:
+        if not self.tracer.enabled:
+            return None
+        self.trace = Trace(self.name, self.attributes, self.tracer.max_spans)
+        self.token = _current_span.set(self.trace.root)
+        return self.trace
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self.trace is None:
+            return
+        root = self.trace.root
+        root.duration_ns = time.perf_counter_ns() - root.start_ns
+        if exc_type is not None:
+            root.error = f"{exc_type.__name__}: {exc}"
+        _current_span.reset(self.token)
+        self.tracer.finish(self.trace)
+
+class Tracer:
+    """Collects finished traces, keeping the slowest and the most recent ones
+
+    Traces can also be exported to an OTLP/HTTP collector (JSON encoding) from
+    a background thread; exports are dropped rather than slowing requests.
+    """
+
+    def __init__(self,
+                 enabled: bool = None,
+                 slowest: int = None,
+                 recent: int = None,
+                 max_spans: int = None,
+                 otlp_endpoint: str = None):
+        self.enabled = enabled if enabled is not None else settings.TRACING_ENABLED
+        self.slowest_size = slowest or settings.TRACING_SLOWEST_TRACES
+        self.max_spans = max_spans or settings.TRACING_MAX_SPANS
+        self.otlp_endpoint = otlp_endpoint if otlp_endpoint is not None else settings.TRACING_OTLP_ENDPOINT
+        self.recent: deque = deque(maxlen=recent or settings.TRACING_RECENT_TRACES)
+        self._slowest: List[tuple] = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self.finished = 0
+        self.exported = 0
+        self.export_errors = 0
+        self.export_dropped = 0
+        self._export_queue: Optional[queue.Queue] = None
+        self._export_thread: Optional[threading.Thread] = None
+
+    def trace(self, name: str, **attributes) -> _TraceContext:
+        """Start a new trace for the enclosed block, e.g. one request"""
+        return _TraceContext(self, name, attributes)
+
+    def finish(self, trace: Trace) -> None:
+        entry = (trace.duration_ns, next(self._sequence), trace)
+        with self._lock:
+            self.finished += 1
+            self.recent.append(trace)
+            if len(self._slowest) < self.slowest_size:
+                heapq.heappush(self._slowest, entry)
+            elif entry > self._slowest[0]:
+                heapq.heapreplace(self._slowest, entry)
+        if self.otlp_endpoint:
+            self._export(trace)
+
+    def slowest(self, limit: int = None) -> List[Trace]:
+        """Slowest finished traces, slowest first"""
+        with self._lock:
+            entries = sorted(self._slowest, reverse=True)
+        return [trace for _, _, trace in entries[:limit]]
+
+    def get(self, trace_id: str) -> Optional[Trace]:
+        with self._lock:
+            candidates = list(self.recent) + [trace for _, _, trace in self._slowest]
+        return next((trace for trace in candidates if trace.trace_id == trace_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._slowest.clear()
+            self.recent.clear()
+
+    def memory_usage(self) -> Dict[str, Any]:
+        """Bytes of the kept traces and their spans"""
+        with self._lock:
+            traces = list(self.recent) + [trace for _, _, trace in self._slowest]
+        return {"bytes": deep_sizeof(traces, follow_objects=True), "traces": len(set(map(id, traces)))}
+
+    def _export(self, trace: Trace) -> None:
+        if self._export_thread is None:
+            with self._lock:
+                if self._export_thread is None:
+                    self._export_queue = queue.Queue(maxsize=1000)
+                    self._export_thread = threading.Thread(target=self._export_loop, name="otlp-exporter", daemon=True)
+                    self._export_thread.start()
+        try:
+            self._export_queue.put_nowait(trace)
+        except queue.Full:
+            self.export_dropped += 1
+
+    def _export_loop(self) -> None:
+        url = self.otlp_endpoint.rstrip("/") + "/v1/traces"
+        while True:
+            traces = [self._export_queue.get()]
+            while len(traces) < 100:
+                try:
+                    traces.append(self._export_queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                body = json.dumps(otlp_payload(traces)).encode()
+                request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+                with urllib.request.urlopen(request, timeout=5):
+                    pass
+                self.exported += len(traces)
+            except Exception as e:
+                self.export_errors += 1
+                print(f"Error exporting traces to {url}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "finished_traces": self.finished,
+            "slowest_kept": len(self._slowest),
+            "recent_kept": len(self.recent),
+            "max_spans": self.max_spans,
+            "otlp_endpoint": self.otlp_endpoint,
+            "exported": self.exported,
+            "export_errors": self.export_errors,
+            "export_dropped": self.export_dropped
+        }
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+def otlp_payload(traces: List[Trace]) -> Dict[str, Any]:
+    """OTLP/HTTP JSON request body for finished traces"""
+    spans = []
+    for trace in traces:
+        for span in list(trace.spans):
+            start = trace.start_time_ns + span.start_ns - trace.start_ns
+            attributes = dict(span.attributes)
+            if span.count > 1:
+                attributes["count"] = span.count
+            otlp_span = {
+                "traceId": trace.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": 2 if span.parent_id is None else 1,
+                "startTimeUnixNano": str(start),
+                "endTimeUnixNano": str(start + span.duration_ns),
+                "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()],
+                "status": {"code": 2, "message": span.error} if span.error else {}
+            }
+            if span.parent_id:
+                otlp_span["parentSpanId"] = span.parent_id
+            spans.append(otlp_span)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": settings.PROJECT_NAME}}]},
+            "scopeSpans": [{"scope": {"name": "app.core.tracing"}, "spans": spans}]
+        }]
+    }
+
+def chrome_trace(traces: List[Trace]) -> Dict[str, Any]:
+    """Chrome trace event JSON (chrome://tracing, Perfetto) of traces"""
+    return {
+        "traceEvents": [event for trace in traces for event in trace.to_chrome_events()],
+        "displayTimeUnit": "ms"
+    }
+
+# Global tracer instance
+tracer = Tracer()
+memory_accountant.register("traces", tracer.memory_usage)
+
+class TracingMiddleware:
+    """ASGI middleware tracing each HTTP request and returning its id in X-Trace-Id"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        with tracer.trace(scope["method"], path=scope["path"]) as trace:
+            async def send_with_trace_id(message):
+                if message["type"] == "http.response.start":
+                    trace.root.set_attribute("status_code", message["status"])
+                    message["headers"] = list(message.get("headers", [])) + [(b"x-trace-id", trace.trace_id.encode())]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_trace_id)
+            finally:
+                route = getattr(scope.get("route"), "path", None)
+                trace.root.name = f"{scope['method']} {route or scope['path']}"
+
+class MongoTraceListener(monitoring.CommandListener):
+    """Adds a span for every MongoDB command run inside a traced request"""
+
+    def started(self, event) -> None:
+        pass
+
+    def succeeded(self, event) -> None:
+        record_span(f"mongo.{event.command_name}", event.duration_micros * 1000, database=event.database_name)
+
+    def failed(self, event) -> None:
+        record_span(f"mongo.{event.command_name}", event.duration_micros * 1000,
+                    database=event.database_name, error=str(event.failure))
+
+# Pass to MongoClient(event_listeners=[...])
+mongo_trace_listener = MongoTraceListener()
@@ -16,5 +16,7 @@ class Job(BaseModel):
     job_type: Optional[str] = None
     salary_range: Optional[str] = None
     vector: Optional[List[float]] = None
+    embedding: Optional[List[float]] = None
+    embedding_model: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
\ No newline at end of file
@@ -1,11 +1,17 @@
 from pydantic import BaseModel, Field
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Literal
 from datetime import datetime
 import uuid
 
 class MatchRequest(BaseModel):
     job_id: str
     resume_ids: Optional[List[str]] = None  # If None, match all resumes
+    vector_field: Literal["vector", "embedding"] = "vector"  # TF-IDF vectors or local embeddings
+
+class EmbeddingSearchRequest(BaseModel):
+    job_id: str
+    top_k: int = Field(10, ge=1, le=1000)
+    rerank: bool = True  # Re-score quantized candidates with exact embeddings
 
 class MatchDetail(BaseModel):
     vector_similarity: float
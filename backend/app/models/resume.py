@@ -30,5 +30,7 @@ class Resume(BaseModel):
     experience: List[Dict[str, Any]] = []  # Changed from List[Experience] to allow flexible structure
     raw_text: str
     vector: Optional[List[float]] = None
+    embedding: Optional[List[float]] = None
+    embedding_model: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
\ No newline at end of file
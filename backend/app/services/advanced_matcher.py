@@ -5,6 +5,8 @@ import re
 from collections import defaultdict
 import json
 
+from app.core.tracing import span
+
 class AdvancedResumeMatcher:
     def __init__(self, 
                  vector_weight: float = 0.5, 
@@ -266,17 +268,21 @@ class AdvancedResumeMatcher:
         Calculate advanced match score with multiple factors
         """
         # Vector similarity
-        vector_similarity = cosine_similarity([resume_vector], [job_vector])[0][0]
+        with span("match.vector_similarity", aggregate=True):
+            vector_similarity = cosine_similarity([resume_vector], [job_vector])[0][0]
         
         # Semantic skills matching
-        skills_match = self.semantic_skill_matching(resume_skills, job_skills)
+        with span("match.skills", aggregate=True):
+            skills_match = self.semantic_skill_matching(resume_skills, job_skills)
         
         # Experience matching
-        experience_match = self.calculate_experience_match(resume_experience, job_requirements)
+        with span("match.experience", aggregate=True):
+            experience_match = self.calculate_experience_match(resume_experience, job_requirements)
         
         # Bias detection
-        resume_bias = self.detect_bias(resume_text)
-        job_bias = self.detect_bias(job_text)
+        with span("match.bias_detection", aggregate=True):
+            resume_bias = self.detect_bias(resume_text)
+            job_bias = self.detect_bias(job_text)
         
         # Calculate weighted score
         weighted_score = (
@@ -308,16 +314,21 @@ class AdvancedResumeMatcher:
             }
         }
     
-    def rank_resumes_advanced(self, job: Dict[str, Any], resumes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def rank_resumes_advanced(self,
+                              job: Dict[str, Any],
+                              resumes: List[Dict[str, Any]],
+                              vector_field: str = "vector") -> List[Dict[str, Any]]:
         """
         Rank resumes using advanced matching algorithm
+        
+        vector_field selects the compared vectors: "vector" (TF-IDF) or "embedding".
         """
         match_results = []
         
         for resume in resumes:
             match_data = self.calculate_advanced_match_score(
-                resume.get("vector", []),
-                job.get("vector", []),
+                resume.get(vector_field, []),
+                job.get(vector_field, []),
                 resume.get("skills", []),
                 job.get("skills_required", []),
                 resume.get("experience", []),
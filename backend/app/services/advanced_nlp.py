@@ -1,14 +1,15 @@
 import numpy as np
 from typing import List, Dict, Any, Tuple, Optional
-import re
 import json
 import os
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
-import spacy
-from textblob import TextBlob
+from textblob.en.sentiments import PatternAnalyzer
 import nltk
-from nltk.tokenize import word_tokenize, sent_tokenize
 from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
 import pickle
@@ -16,6 +17,16 @@ import joblib
 import warnings
 warnings.filterwarnings('ignore')
 
+from app.core.config import settings
+from app.core.prometheus import time_model_load
+from app.services.entity_extractor import entity_extractor
+from app.services.analyzed_document import AnalyzedDocument
+from app.services.phrase_counter import PhraseCorpus, phrase_corpus, count_ngrams, top_ngrams
+from app.services.pattern_matcher import EntityPatternMatcher, DEFAULT_ENTITY_PATTERNS
+from app.services.vectorizer import ResumeJobVectorizer, get_shared_vectorizer, model_fingerprint
+from app.services.embeddings import sentence_embedder, word_embedder
+from app.services.embedding_cache import embedding_cache
+
 # Download required NLTK data
 try:
     nltk.download('punkt', quiet=True)
@@ -27,184 +38,154 @@ try:
 except:
     pass
 
+# Embedding size returned when no fitted TF-IDF model is available
+TFIDF_FALLBACK_SIZE = 1000
+
+# Stages of comprehensive_text_analysis, in output order. The text stages are
+# pure Python per document, so batch analysis spreads them over processes.
+ANALYSIS_STAGES = ('embeddings', 'entities', 'sentiment', 'key_phrases', 'complexity')
+TEXT_STAGES = ('sentiment', 'key_phrases', 'complexity')
+
+# TextBlob's default analyzer, applied to text directly instead of through a TextBlob
+SENTIMENT_ANALYZER = PatternAnalyzer()
+
+def _analyze_text_chunk(texts: List[str], stages: Tuple[str, ...]) -> List[Dict[str, Any]]:
+    """Run the text stages on a chunk of texts inside a worker process"""
+    return [nlp_processor.analyze_text_stages(text, stages) for text in texts]
+
 class AdvancedNLPProcessor:
     def __init__(self, use_bert: bool = True, use_word2vec: bool = True):
         self.use_bert = use_bert
         self.use_word2vec = use_word2vec
         
-        # Load spaCy model for advanced NLP
-        try:
-            self.nlp = spacy.load("en_core_web_sm")
-        except:
-            print("Warning: spaCy model not found. Install with: python -m spacy download en_core_web_sm")
-            self.nlp = None
+        # spaCy is only used for NER, so share the trimmed pipeline
+        self.nlp = entity_extractor.nlp
         
         # Initialize NLTK components
         self.stop_words = set(stopwords.words('english'))
         self.lemmatizer = WordNetLemmatizer()
         
-        # Initialize vectorizers
-        self.tfidf_vectorizer = TfidfVectorizer(
-            max_features=1000,
-            ngram_range=(1, 2),
-            min_df=2,
-            max_df=0.8
-        )
+        # TF-IDF embeddings use the corpus-fitted vectorizer shared with resume and
+        # job vectors, so they are comparable across documents and never refit
+        self.tfidf_model = get_shared_vectorizer(settings.TFIDF_MODEL_PATH)
+        self._warned_unfitted = False
         
-        # Load or initialize Word2Vec model
+        # Local embedding backends (see app.services.embeddings)
         self.word2vec_model = None
         if self.use_word2vec:
             self._initialize_word2vec()
         
-        # Load or initialize BERT model
         self.bert_model = None
         self.bert_tokenizer = None
         if self.use_bert:
             self._initialize_bert()
         
-        # Entity patterns for advanced recognition
-        self.entity_patterns = {
-            'skills': [
-                r'\b(?:Python|JavaScript|Java|C\+\+|C#|Go|Rust|Swift|Kotlin|TypeScript|PHP|Ruby|Scala|R|MATLAB)\b',
-                r'\b(?:React|Angular|Vue\.js|Node\.js|Express\.js|Django|Flask|Spring Boot|ASP\.NET|Laravel)\b',
-                r'\b(?:SQL|MySQL|PostgreSQL|MongoDB|Redis|Oracle|SQLite|Cassandra|DynamoDB)\b',
-                r'\b(?:AWS|Azure|GCP|Docker|Kubernetes|Terraform|Jenkins|GitLab CI|GitHub Actions)\b',
-                r'\b(?:Machine Learning|Deep Learning|Neural Networks|TensorFlow|PyTorch|Scikit-learn|NLP)\b'
-            ],
-            'education': [
-                r'\b(?:Bachelor|Master|PhD|Associate|Diploma|Certificate)\b',
-                r'\b(?:Computer Science|Information Technology|Data Science|Software Engineering)\b',
-                r'\b(?:University|College|Institute|School)\b'
-            ],
-            'experience': [
-                r'\b(?:years?|months?|experience|senior|junior|lead|manager|director)\b',
-                r'\b(?:Software Engineer|Developer|Data Scientist|Product Manager|DevOps Engineer)\b'
-            ],
-            'companies': [
-                r'\b(?:Google|Microsoft|Amazon|Facebook|Apple|IBM|Oracle|Twitter|LinkedIn|Uber|Airbnb|Netflix)\b'
-            ]
-        }
+        # Worker processes for batch text stages, started on first use
+        self._pool = None
+        self._pool_workers = 0
+        self._pool_lock = threading.Lock()
+        
+        # Entity patterns for advanced recognition, compiled into one scan
+        self.pattern_matcher = EntityPatternMatcher()
+    
+    @property
+    def entity_patterns(self) -> Dict[str, List[str]]:
+        """The active entity pattern set; assigning a new set recompiles it"""
+        return self.pattern_matcher.patterns
+    
+    @entity_patterns.setter
+    def entity_patterns(self, patterns: Dict[str, List[str]]) -> None:
+        self.pattern_matcher.load(patterns)
     
     def _initialize_word2vec(self):
-        """Initialize Word2Vec model (simulated for now)"""
-        try:
-            # In a real implementation, you would load a pre-trained Word2Vec model
-            # from gensim.models import Word2Vec
-            # self.word2vec_model = Word2Vec.load('path/to/word2vec.model')
-            
-            # For now, create a simple word embedding simulation
-            self.word2vec_model = {
-                'vector_size': 100,
-                'vocab': set(['python', 'javascript', 'react', 'node', 'mongodb', 'aws', 'docker', 
-                             'java', 'c++', 'c#', 'go', 'rust', 'swift', 'kotlin', 'typescript', 
-                             'php', 'ruby', 'scala', 'r', 'matlab', 'sql', 'mysql', 'postgresql', 
-                             'redis', 'oracle', 'sqlite', 'cassandra', 'dynamodb', 'elasticsearch', 
-                             'neo4j', 'influxdb', 'couchdb', 'mariadb', 'azure', 'gcp', 'kubernetes', 
-                             'terraform', 'jenkins', 'gitlab', 'github', 'ansible', 'chef', 'puppet', 
-                             'vagrant', 'vmware', 'openstack', 'machine', 'learning', 'deep', 'neural', 
-                             'networks', 'tensorflow', 'pytorch', 'scikit', 'nlp', 'computer', 'vision', 
-                             'data', 'mining', 'predictive', 'analytics', 'statistical', 'reinforcement', 
-                             'ios', 'android', 'react', 'native', 'flutter', 'xamarin', 'mobile', 'app', 
-                             'cybersecurity', 'network', 'security', 'information', 'penetration', 'testing', 
-                             'ethical', 'hacking', 'cryptography', 'security', 'auditing', 'incident', 'response', 
-                             'siem', 'agile', 'scrum', 'kanban', 'project', 'management', 'jira', 'confluence', 
-                             'trello', 'asana', 'microsoft', 'waterfall', 'lean', 'six', 'sigma', 'pmi', 
-                             'leadership', 'communication', 'teamwork', 'problem', 'solving', 'critical', 
-                             'thinking', 'time', 'management', 'customer', 'service', 'sales', 'marketing', 
-                             'public', 'speaking', 'negotiation'])
-            }
-            print("Word2Vec model initialized (simulated)")
-        except Exception as e:
-            print(f"Warning: Could not initialize Word2Vec model: {e}")
-            self.word2vec_model = None
+        """Describe the word embedding backend; the model itself is loaded on first use"""
+        self.word2vec_model = {
+            'backend': word_embedder.backend_name,
+            'model_path': word_embedder.model_path,
+            'max_length': word_embedder.max_seq_length
+        }
     
     def _initialize_bert(self):
-        """Initialize BERT model (simulated for now)"""
-        try:
-            # In a real implementation, you would load a pre-trained BERT model
-            # from transformers import BertModel, BertTokenizer
-            # self.bert_tokenizer = BertTokenizer.from_pretrained('bert-base-uncased')
-            # self.bert_model = BertModel.from_pretrained('bert-base-uncased')
-            
-            # For now, create a simple BERT simulation
-            self.bert_model = {
-                'model_name': 'bert-base-uncased',
-                'max_length': 512,
-                'vector_size': 768
-            }
-            self.bert_tokenizer = {
-                'vocab_size': 30522,
-                'max_length': 512
-            }
-            print("BERT model initialized (simulated)")
-        except Exception as e:
-            print(f"Warning: Could not initialize BERT model: {e}")
-            self.bert_model = None
-            self.bert_tokenizer = None
+        """Describe the sentence embedding backend; the model itself is loaded on first use"""
+        self.bert_model = {
+            'backend': sentence_embedder.backend_name,
+            'model_path': sentence_embedder.model_path,
+            'max_length': sentence_embedder.max_seq_length
+        }
     
     def get_bert_embeddings(self, text: str) -> np.ndarray:
-        """Get BERT embeddings for text"""
+        """Get sentence embeddings for text from the local embedding backend"""
         if not self.bert_model:
-            # Fallback to TF-IDF if BERT is not available
+            # Fallback to TF-IDF if sentence embeddings are disabled
             return self.get_tfidf_embeddings(text)
         
         try:
-            # Simulate BERT embeddings
-            # In real implementation:
-            # inputs = self.bert_tokenizer(text, return_tensors="pt", padding=True, truncation=True)
-            # with torch.no_grad():
-            #     outputs = self.bert_model(**inputs)
-            # embeddings = outputs.last_hidden_state.mean(dim=1).numpy()
-            
-            # For now, create a simulated BERT embedding
-            words = text.lower().split()
-            embedding = np.zeros(self.bert_model['vector_size'])
-            
-            for word in words[:50]:  # Limit to first 50 words
-                # Simple hash-based embedding simulation
-                word_hash = hash(word) % self.bert_model['vector_size']
-                embedding[word_hash] = 1.0
-            
-            return embedding / (np.linalg.norm(embedding) + 1e-8)
-        
+            return sentence_embedder.embed(text)
         except Exception as e:
             print(f"Error getting BERT embeddings: {e}")
             return self.get_tfidf_embeddings(text)
     
+    def get_bert_embeddings_batch(self, texts: List[str]) -> np.ndarray:
+        """Get sentence embeddings for several texts with batched inference"""
+        if not self.bert_model:
+            return self.get_tfidf_embeddings_batch(texts)
+        return sentence_embedder.embed_batch(texts)
+    
     def get_word2vec_embeddings(self, text: str) -> np.ndarray:
-        """Get Word2Vec embeddings for text"""
+        """Get averaged word embeddings for text"""
         if not self.word2vec_model:
             return self.get_tfidf_embeddings(text)
         
         try:
-            words = text.lower().split()
-            word_vectors = []
-            
-            for word in words:
-                if word in self.word2vec_model['vocab']:
-                    # Simulate Word2Vec vector
-                    word_vector = np.random.randn(self.word2vec_model['vector_size'])
-                    word_vector = word_vector / np.linalg.norm(word_vector)
-                    word_vectors.append(word_vector)
-            
-            if word_vectors:
-                return np.mean(word_vectors, axis=0)
-            else:
-                return np.zeros(self.word2vec_model['vector_size'])
-        
+            return word_embedder.embed(text)
         except Exception as e:
             print(f"Error getting Word2Vec embeddings: {e}")
             return self.get_tfidf_embeddings(text)
     
+    def get_word2vec_embeddings_batch(self, texts: List[str]) -> np.ndarray:
+        """Get averaged word embeddings for several texts"""
+        if not self.word2vec_model:
+            return self.get_tfidf_embeddings_batch(texts)
+        return word_embedder.embed_batch(texts)
+    
+    @property
+    def tfidf_vectorizer(self) -> Optional[TfidfVectorizer]:
+        """The fitted scikit-learn vectorizer, or None if no model is loaded"""
+        return self.tfidf_model.vectorizer if self.tfidf_model.is_fitted else None
+    
+    def _tfidf_unavailable(self) -> None:
+        if not self._warned_unfitted:
+            print(f"Warning: TF-IDF model not found at {settings.TFIDF_MODEL_PATH}. "
+                  f"Run scripts/train_model.py to create it.")
+            self._warned_unfitted = True
+    
     def get_tfidf_embeddings(self, text: str) -> np.ndarray:
         """Get TF-IDF embeddings for text"""
+        if not self.tfidf_model.is_fitted:
+            self._tfidf_unavailable()
+            return np.zeros(TFIDF_FALLBACK_SIZE)
+        
         try:
-            # Fit and transform the text
-            embedding = self.tfidf_vectorizer.fit_transform([text])
-            return embedding.toarray()[0]
+            return embedding_cache.get_or_compute(
+                f"tfidf-{self.tfidf_model.model_version}", text, self.tfidf_model.vectorize
+            )
         except Exception as e:
             print(f"Error getting TF-IDF embeddings: {e}")
-            return np.zeros(1000)  # Default size
+            return np.zeros(self.tfidf_model.dimension)
+    
+    def get_tfidf_embeddings_batch(self, texts: List[str]) -> np.ndarray:
+        """Get TF-IDF embeddings for several texts as one (len(texts), dimension) matrix"""
+        if not self.tfidf_model.is_fitted:
+            self._tfidf_unavailable()
+            return np.zeros((len(texts), TFIDF_FALLBACK_SIZE))
+        
+        try:
+            return np.vstack(embedding_cache.get_or_compute_batch(
+                f"tfidf-{self.tfidf_model.model_version}", texts, self.tfidf_model.vectorize_batch
+            ))
+        except Exception as e:
+            print(f"Error getting TF-IDF embeddings: {e}")
+            return np.zeros((len(texts), self.tfidf_model.dimension))
     
     def get_hybrid_embeddings(self, text: str) -> Dict[str, np.ndarray]:
         """Get multiple types of embeddings for comprehensive analysis"""
@@ -220,8 +201,25 @@ class AdvancedNLPProcessor:
         
         return embeddings
     
-    def advanced_entity_recognition(self, text: str) -> Dict[str, List[str]]:
-        """Advanced entity recognition using multiple methods"""
+    def get_hybrid_embeddings_batch(self, texts: List[str]) -> List[Dict[str, np.ndarray]]:
+        """Get hybrid embeddings for several texts, one batched call per embedding type"""
+        embeddings = {'tfidf': self.get_tfidf_embeddings_batch(texts)}
+        
+        if self.use_bert:
+            embeddings['bert'] = self.get_bert_embeddings_batch(texts)
+        
+        if self.use_word2vec:
+            embeddings['word2vec'] = self.get_word2vec_embeddings_batch(texts)
+        
+        return [{key: matrix[i] for key, matrix in embeddings.items()} for i in range(len(texts))]
+    
+    def advanced_entity_recognition(self, text: str, doc=None) -> Dict[str, List[str]]:
+        """Advanced entity recognition using multiple methods
+        
+        Args:
+            text: Text to analyze
+            doc: Optional spaCy doc for text that was already run through the NER pipeline
+        """
         entities = {
             'skills': [],
             'education': [],
@@ -233,46 +231,57 @@ class AdvancedNLPProcessor:
             'phones': []
         }
         
-        # Pattern-based extraction
-        for entity_type, patterns in self.entity_patterns.items():
-            for pattern in patterns:
-                matches = re.findall(pattern, text, re.IGNORECASE)
-                entities[entity_type].extend(matches)
+        # Pattern-based extraction (skills, education, experience, companies,
+        # emails and phones) in a single scan of the text
+        entities.update(self.pattern_matcher.match(text))
         
         # spaCy-based extraction
-        if self.nlp:
+        if doc is None and self.nlp:
             doc = self.nlp(text)
+        if doc is not None:
+            self._add_spacy_entities(entities, doc)
             
-            # Named entities
-            for ent in doc.ents:
-                if ent.label_ == 'ORG':
-                    entities['companies'].append(ent.text)
-                elif ent.label_ == 'GPE':
-                    entities['locations'].append(ent.text)
-                elif ent.label_ == 'DATE':
-                    entities['dates'].append(ent.text)
-        
-        # Email extraction
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        entities['emails'] = re.findall(email_pattern, text)
-        
-        # Phone extraction
-        phone_pattern = r'\b(\+\d{1,2}\s)?\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4}\b'
-        entities['phones'] = re.findall(phone_pattern, text)
-        
-        # Remove duplicates and clean
-        for key in entities:
-            entities[key] = list(set(entities[key]))
+            # Remove duplicates from the spaCy buckets, keeping first occurrences
+            for key in ('companies', 'locations', 'dates'):
+                entities[key] = list(dict.fromkeys(entities[key]))
         
         return entities
     
-    def sentiment_analysis(self, text: str) -> Dict[str, Any]:
-        """Perform sentiment analysis on text"""
+    def advanced_entity_recognition_batch(self, texts: List[str],
+                                          batch_size: int = None,
+                                          n_process: int = None) -> List[Dict[str, List[str]]]:
+        """Advanced entity recognition for many texts, batching spaCy through nlp.pipe"""
+        if not self.nlp:
+            return [self.advanced_entity_recognition(text) for text in texts]
+        
+        docs = entity_extractor.iter_docs(texts, batch_size=batch_size, n_process=n_process)
+        return [
+            self.advanced_entity_recognition(text, doc=doc)
+            for text, doc in zip(texts, docs)
+        ]
+    
+    def _add_spacy_entities(self, entities: Dict[str, List[str]], doc) -> None:
+        """Merge spaCy named entities from doc into the entity buckets"""
+        for ent in doc.ents:
+            if ent.label_ == 'ORG':
+                entities['companies'].append(ent.text)
+            elif ent.label_ == 'GPE':
+                entities['locations'].append(ent.text)
+            elif ent.label_ == 'DATE':
+                entities['dates'].append(ent.text)
+    
+    def sentiment_analysis(self, text: str, analyzed: AnalyzedDocument = None) -> Dict[str, Any]:
+        """Perform sentiment analysis on text
+        
+        Args:
+            text: Text to analyze
+            analyzed: Optional tokenization of text shared with other stages
+        """
         try:
+            analyzed = analyzed or AnalyzedDocument(text)
+            
             # TextBlob sentiment analysis
-            blob = TextBlob(text)
-            sentiment_score = blob.sentiment.polarity
-            subjectivity_score = blob.sentiment.subjectivity
+            sentiment_score, subjectivity_score = SENTIMENT_ANALYZER.analyze(text)
             
             # Categorize sentiment
             if sentiment_score > 0.1:
@@ -283,15 +292,14 @@ class AdvancedNLPProcessor:
                 sentiment = "neutral"
             
             # Analyze sentiment by sentences
-            sentences = sent_tokenize(text)
             sentence_sentiments = []
             
-            for sentence in sentences[:10]:  # Limit to first 10 sentences
-                sentence_blob = TextBlob(sentence)
+            for sentence in analyzed.sentences[:10]:  # Limit to first 10 sentences
+                polarity, subjectivity = SENTIMENT_ANALYZER.analyze(sentence)
                 sentence_sentiments.append({
                     'sentence': sentence,
-                    'polarity': sentence_blob.sentiment.polarity,
-                    'subjectivity': sentence_blob.sentiment.subjectivity
+                    'polarity': polarity,
+                    'subjectivity': subjectivity
                 })
             
             return {
@@ -312,58 +320,59 @@ class AdvancedNLPProcessor:
                 'confidence': 0.0
             }
     
-    def extract_key_phrases(self, text: str, num_phrases: int = 10) -> List[Dict[str, Any]]:
+    def extract_key_phrases(self,
+                            text: str,
+                            num_phrases: int = 10,
+                            analyzed: AnalyzedDocument = None) -> List[Dict[str, Any]]:
         """Extract key phrases from text using multiple methods"""
         try:
-            # Tokenize and preprocess
-            tokens = word_tokenize(text.lower())
-            tokens = [token for token in tokens if token.isalnum() and token not in self.stop_words]
-            
-            # Get bigrams and trigrams
-            bigrams = list(zip(tokens, tokens[1:]))
-            trigrams = list(zip(tokens, tokens[1:], tokens[2:]))
-            
-            # Calculate phrase frequencies
-            phrase_freq = {}
-            
-            # Single words
-            for token in tokens:
-                phrase_freq[token] = phrase_freq.get(token, 0) + 1
-            
-            # Bigrams
-            for bigram in bigrams:
-                phrase = ' '.join(bigram)
-                phrase_freq[phrase] = phrase_freq.get(phrase, 0) + 1
-            
-            # Trigrams
-            for trigram in trigrams:
-                phrase = ' '.join(trigram)
-                phrase_freq[phrase] = phrase_freq.get(phrase, 0) + 1
-            
-            # Sort by frequency and return top phrases
-            sorted_phrases = sorted(phrase_freq.items(), key=lambda x: x[1], reverse=True)
-            
-            key_phrases = []
-            for phrase, frequency in sorted_phrases[:num_phrases]:
-                key_phrases.append({
-                    'phrase': phrase,
-                    'frequency': frequency,
-                    'length': len(phrase.split()),
-                    'type': 'word' if len(phrase.split()) == 1 else 'phrase'
-                })
-            
-            return key_phrases
+            # Count words, bigrams and trigrams and keep the most frequent
+            tokens = self.phrase_tokens(text, analyzed)
+            top = top_ngrams(count_ngrams(tokens, 3), num_phrases)
+            return [self._key_phrase(gram, frequency) for gram, frequency in top]
         
         except Exception as e:
             print(f"Error extracting key phrases: {e}")
             return []
     
-    def analyze_text_complexity(self, text: str) -> Dict[str, Any]:
+    def extract_key_phrases_tfidf(self,
+                                  text: str,
+                                  num_phrases: int = 10,
+                                  analyzed: AnalyzedDocument = None,
+                                  corpus: PhraseCorpus = None) -> List[Dict[str, Any]]:
+        """Extract key phrases weighted by inverse document frequency across the phrase corpus"""
+        try:
+            corpus = corpus or phrase_corpus
+            tokens = self.phrase_tokens(text, analyzed)
+            return [
+                {**self._key_phrase(gram, frequency), 'score': score}
+                for gram, frequency, score in corpus.top_phrases(tokens, num_phrases)
+            ]
+        
+        except Exception as e:
+            print(f"Error extracting key phrases: {e}")
+            return []
+    
+    def phrase_tokens(self, text: str, analyzed: AnalyzedDocument = None) -> List[str]:
+        """Lowercase alphanumeric tokens of text without stopwords, as counted for key phrases"""
+        analyzed = analyzed or AnalyzedDocument(text)
+        return [token for token in analyzed.words if token not in self.stop_words]
+    
+    @staticmethod
+    def _key_phrase(gram: Tuple[str, ...], frequency: int) -> Dict[str, Any]:
+        return {
+            'phrase': ' '.join(gram),
+            'frequency': frequency,
+            'length': len(gram),
+            'type': 'word' if len(gram) == 1 else 'phrase'
+        }
+    
+    def analyze_text_complexity(self, text: str, analyzed: AnalyzedDocument = None) -> Dict[str, Any]:
         """Analyze text complexity and readability"""
         try:
-            sentences = sent_tokenize(text)
-            words = word_tokenize(text.lower())
-            words = [word for word in words if word.isalnum()]
+            analyzed = analyzed or AnalyzedDocument(text)
+            sentences = analyzed.sentences
+            words = analyzed.words
             
             # Basic statistics
             num_sentences = len(sentences)
@@ -448,15 +457,115 @@ class AdvancedNLPProcessor:
         
         return count
     
-    def comprehensive_text_analysis(self, text: str) -> Dict[str, Any]:
-        """Perform comprehensive text analysis"""
-        return {
-            'embeddings': self.get_hybrid_embeddings(text),
-            'entities': self.advanced_entity_recognition(text),
-            'sentiment': self.sentiment_analysis(text),
-            'key_phrases': self.extract_key_phrases(text),
-            'complexity': self.analyze_text_complexity(text)
-        }
+    def _resolve_stages(self, stages: Optional[List[str]]) -> Tuple[str, ...]:
+        """Validate requested stages and put them in output order; None means all"""
+        if stages is None:
+            return ANALYSIS_STAGES
+        unknown = set(stages) - set(ANALYSIS_STAGES)
+        if unknown:
+            raise ValueError(f"Unknown analysis stages: {', '.join(sorted(unknown))}. "
+                             f"Available: {', '.join(ANALYSIS_STAGES)}")
+        return tuple(stage for stage in ANALYSIS_STAGES if stage in stages)
+    
+    def analyze_text_stages(self, text: str, stages: Tuple[str, ...] = TEXT_STAGES) -> Dict[str, Any]:
+        """Run the selected sentiment, key phrase and complexity stages on one text, tokenizing it once"""
+        analyzed = AnalyzedDocument(text)
+        result = {}
+        if 'sentiment' in stages:
+            result['sentiment'] = self.sentiment_analysis(text, analyzed=analyzed)
+        if 'key_phrases' in stages:
+            result['key_phrases'] = self.extract_key_phrases(text, analyzed=analyzed)
+        if 'complexity' in stages:
+            result['complexity'] = self.analyze_text_complexity(text, analyzed=analyzed)
+        return result
+    
+    def _run_text_stages(self, texts: List[str], stages: Tuple[str, ...], n_process: int) -> List[Dict[str, Any]]:
+        """Run the text stages in this process, or in chunks across worker processes"""
+        chunk_size = settings.ANALYSIS_CHUNK_SIZE
+        if n_process <= 1 or len(texts) <= chunk_size:
+            return [self.analyze_text_stages(text, stages) for text in texts]
+        
+        chunks = [texts[start:start + chunk_size] for start in range(0, len(texts), chunk_size)]
+        executor = self._get_pool(n_process)
+        return [result for chunk in executor.map(_analyze_text_chunk, chunks, repeat(stages))
+                for result in chunk]
+    
+    def _get_pool(self, n_process: int) -> ProcessPoolExecutor:
+        """Reuse worker processes across batches, since each one loads the NLP models once"""
+        with self._pool_lock:
+            if self._pool is None or self._pool_workers != n_process:
+                if self._pool is not None:
+                    self._pool.shutdown(wait=False)
+                context = multiprocessing.get_context(settings.ANALYSIS_START_METHOD)
+                self._pool = ProcessPoolExecutor(max_workers=n_process, mp_context=context)
+                self._pool_workers = n_process
+            return self._pool
+    
+    def shutdown(self) -> None:
+        """Stop the batch analysis worker processes"""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True, cancel_futures=True)
+                self._pool = None
+    
+    def comprehensive_text_analysis(self, text: str, stages: List[str] = None) -> Dict[str, Any]:
+        """Perform comprehensive text analysis
+        
+        Args:
+            text: Text to analyze
+            stages: Stages to run from ANALYSIS_STAGES; None runs all of them
+        """
+        stages = self._resolve_stages(stages)
+        analysis = {}
+        if 'embeddings' in stages:
+            analysis['embeddings'] = self.get_hybrid_embeddings(text)
+        if 'entities' in stages:
+            analysis['entities'] = self.advanced_entity_recognition(text)
+        analysis.update(self.analyze_text_stages(text, stages))
+        return analysis
+    
+    def comprehensive_text_analysis_batch(self,
+                                          texts: List[str],
+                                          stages: List[str] = None,
+                                          n_process: int = None,
+                                          batch_size: int = None) -> List[Dict[str, Any]]:
+        """
+        Comprehensive analysis of many texts, paying only for the selected stages
+        
+        Embeddings are computed in batches per type, entities run through
+        nlp.pipe, and the text stages are spread over n_process processes.
+        
+        Args:
+            texts: Texts to analyze
+            stages: Stages to run from ANALYSIS_STAGES; None runs all of them
+            n_process: Worker processes for the text stages and spaCy
+                (defaults to ANALYSIS_N_PROCESS and NER_N_PROCESS)
+            batch_size: spaCy nlp.pipe batch size
+            
+        Returns:
+            One analysis dictionary per text, as returned by comprehensive_text_analysis
+        """
+        stages = self._resolve_stages(stages)
+        results = [{} for _ in texts]
+        if not texts:
+            return results
+        
+        if 'embeddings' in stages:
+            for result, embeddings in zip(results, self.get_hybrid_embeddings_batch(texts)):
+                result['embeddings'] = embeddings
+        
+        if 'entities' in stages:
+            entities = self.advanced_entity_recognition_batch(texts, batch_size=batch_size, n_process=n_process)
+            for result, text_entities in zip(results, entities):
+                result['entities'] = text_entities
+        
+        text_stages = tuple(stage for stage in stages if stage in TEXT_STAGES)
+        if text_stages:
+            n_process = n_process or settings.ANALYSIS_N_PROCESS
+            for result, partial in zip(results, self._run_text_stages(texts, text_stages, n_process)):
+                result.update(partial)
+        
+        return results
     
     def save_model(self, filepath: str):
         """Save the NLP model"""
@@ -475,11 +584,16 @@ class AdvancedNLPProcessor:
     def load_model(self, filepath: str):
         """Load the NLP model"""
         try:
-            model_data = joblib.load(filepath)
-            self.tfidf_vectorizer = model_data['tfidf_vectorizer']
+            with time_model_load("nlp_processor"):
+                model_data = joblib.load(filepath)
+            # Keep the shared vectorizer untouched; this processor gets its own
+            self.tfidf_model = ResumeJobVectorizer()
+            self.tfidf_model.vectorizer = model_data['tfidf_vectorizer']
+            self.tfidf_model.model_version = model_fingerprint(filepath)
             self.word2vec_model = model_data['word2vec_model']
             self.bert_model = model_data['bert_model']
-            self.entity_patterns = model_data['entity_patterns']
+            # Entity types missing from older model files keep the built-in patterns
+            self.entity_patterns = {**DEFAULT_ENTITY_PATTERNS, **model_data['entity_patterns']}
             print(f"NLP model loaded from {filepath}")
         except Exception as e:
             print(f"Error loading NLP model: {e}")
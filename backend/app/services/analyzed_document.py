@@ -0,0 +1,33 @@
+from functools import cached_property
+from typing import List
+
+from nltk.tokenize import sent_tokenize, word_tokenize
+
+class AnalyzedDocument:
+    """Sentence and word tokenization of one text, shared by the analysis stages
+
+    Each form is computed on first access and then reused, so stages that run
+    on the same document never tokenize it twice, and a stage that needs only
+    sentences never pays for word tokenization.
+    """
+
+    def __init__(self, text: str):
+        self.text = text or ""
+
+    @cached_property
+    def sentences(self) -> List[str]:
+        return sent_tokenize(self.text)
+
+    @cached_property
+    def tokens(self) -> List[str]:
+        # Same tokens as word_tokenize(text), which sentence-splits internally
+        return [token for sentence in self.sentences for token in word_tokenize(sentence, preserve_line=True)]
+
+    @cached_property
+    def lower_tokens(self) -> List[str]:
+        return [token.lower() for token in self.tokens]
+
+    @cached_property
+    def words(self) -> List[str]:
+        """Lowercase alphanumeric tokens, without punctuation"""
+        return [token for token in self.lower_tokens if token.isalnum()]
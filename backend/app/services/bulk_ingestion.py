@@ -0,0 +1,393 @@
+import functools
+import json
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+import traceback
+import uuid
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.document_extractor import DocumentLimitExceededError
+from app.services.resume_ingestion import is_supported_file, parse_resume_file, build_resume_record, record_from_cache
+from app.services.parse_cache import parse_cache, content_hash, build_model_version, cacheable_fields
+from app.services.vectorizer import model_fingerprint
+from app.services.data_versions import RESUME_CORPUS, data_versions
+
+class UploadLimitExceededError(DocumentLimitExceededError):
+    """Raised when a bulk upload holds too many resume files or expands to too many bytes"""
+
+# Per-process services, created once by the pool initializer
+_worker_parser = None
+_worker_vectorizer = None
+
+def _init_worker(skills_database_path: str, vectorizer_model_path: str) -> None:
+    """Load the parser and vectorizer once per worker process"""
+    global _worker_parser, _worker_vectorizer
+    from app.services.resume_parser import ResumeParser
+    from app.services.vectorizer import ResumeJobVectorizer
+
+    with open(skills_database_path, "r") as f:
+        skills_database = json.load(f)
+
+    # Bulk workers are already separate processes, so they extract PDFs in-process
+    _worker_parser = ResumeParser(skills_database, use_worker_pool=False)
+    _worker_vectorizer = ResumeJobVectorizer(vectorizer_model_path)
+
+def _process_batch(batch: List[Tuple[str, bytes, str]]) -> List[Dict[str, Any]]:
+    """Parse and vectorize a batch of (filename, content, content_hash) inside a worker process
+
+    Files are parsed one by one without entities, which are then extracted for
+    the whole batch in one nlp.pipe pass before the records are built.
+    """
+    results: List[Dict[str, Any]] = []
+    parsed = []
+    for filename, content, digest in batch:
+        result = {"filename": filename, "content_hash": digest}
+        results.append(result)
+        try:
+            resume_data = parse_resume_file(_worker_parser, filename, content, extract_entities=False)
+            parsed.append((result, resume_data))
+        except Exception as e:
+            result["error"] = str(e)
+
+    # JSON resumes carry their own structure and get no extracted entities
+    tagged = [resume_data for result, resume_data in parsed if not result["filename"].lower().endswith(".json")]
+    if tagged:
+        try:
+            entities = _worker_parser.text_processor.extract_entities_batch(
+                [resume_data.get("raw_text", "") for resume_data in tagged]
+            )
+            for resume_data, found in zip(tagged, entities):
+                resume_data["entities"] = found
+        except Exception as e:
+            print(f"Error extracting entities for batch: {str(e)}")
+
+    for result, resume_data in parsed:
+        try:
+            record = build_resume_record(resume_data, result["filename"], _worker_vectorizer)
+            record["content_hash"] = result["content_hash"]
+            result["record"] = record
+        except Exception as e:
+            result["error"] = str(e)
+    return results
+
+def upload_size_limit(filename: str) -> int:
+    """Largest accepted size in bytes of one resume file, as enforced by its extractor (0 means no limit)"""
+    return settings.PDF_MAX_BYTES if filename.lower().endswith(".pdf") else settings.DOCUMENT_MAX_BYTES
+
+def oversized_file_error(filename: str, size: int) -> Optional[str]:
+    """Error message for a resume file too large to ingest, or None"""
+    limit = upload_size_limit(filename)
+    if limit and size > limit:
+        return f"File is {size} bytes, which exceeds the {limit} byte limit"
+    return None
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+def _iter_upload_members(paths: List[str]) -> Iterator[Tuple[str, int, Callable[[], bytes]]]:
+    """Yield (filename, uncompressed size, read) for each supported file in stored uploads"""
+    for path in paths:
+        if zipfile.is_zipfile(path):
+            with zipfile.ZipFile(path) as archive:
+                for info in archive.infolist():
+                    name = info.filename
+                    if info.is_dir() or name.startswith("__MACOSX/") or not is_supported_file(name):
+                        continue
+                    # zipfile never returns more than a member's declared size, so file_size is safe to trust
+                    yield os.path.basename(name), info.file_size, functools.partial(archive.read, info)
+        elif is_supported_file(path):
+            yield os.path.basename(path), os.path.getsize(path), functools.partial(_read_file, path)
+
+def iter_upload_files(paths: List[str]) -> Iterator[Tuple[str, bytes]]:
+    """Yield (filename, content) for stored uploads, expanding zip archives lazily
+
+    Files over their size limit are skipped without being decompressed.
+    """
+    for filename, size, read in _iter_upload_members(paths):
+        if oversized_file_error(filename, size) is None:
+            yield filename, read()
+
+def scan_upload_files(paths: List[str]) -> Tuple[int, List[Dict[str, str]]]:
+    """Count the supported resume files in stored uploads and list those too large to ingest
+
+    Only zip directories are read, so this is cheap however large the archives expand.
+
+    Raises:
+        UploadLimitExceededError: If the upload holds more files or more uncompressed
+            bytes than BULK_INGEST_MAX_FILES and BULK_INGEST_MAX_BYTES allow
+    """
+    max_files = settings.BULK_INGEST_MAX_FILES
+    max_bytes = settings.BULK_INGEST_MAX_BYTES
+    total = 0
+    total_bytes = 0
+    oversized = []
+    for filename, size, _ in _iter_upload_members(paths):
+        total += 1
+        if max_files and total > max_files:
+            raise UploadLimitExceededError(f"Upload contains more than {max_files} resume files")
+        error = oversized_file_error(filename, size)
+        if error:
+            oversized.append({"filename": filename, "error": error})
+            continue
+        total_bytes += size
+        if max_bytes and total_bytes > max_bytes:
+            raise UploadLimitExceededError(
+                f"Upload expands to more than {max_bytes} bytes of resume files"
+            )
+    return total, oversized
+
+def _iter_batches(files: Iterator[Tuple[str, bytes]], batch_size: int) -> Iterator[List[Tuple[str, bytes]]]:
+    batch = []
+    for item in files:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+class BulkIngestionManager:
+    """Runs bulk resume ingestion jobs on a shared process pool
+
+    Job progress is kept in memory, so it only survives as long as the API process.
+    """
+
+    MAX_TRACKED_JOBS = 100
+    MAX_REPORTED_ERRORS = 50
+
+    def __init__(self,
+                 max_workers: int = None,
+                 batch_size: int = None,
+                 start_method: str = None,
+                 skills_database_path: str = "data/skills_database.json",
+                 vectorizer_model_path: str = None):
+        self.max_workers = max_workers or settings.BULK_INGEST_WORKERS or os.cpu_count() or 1
+        self.batch_size = batch_size or settings.BULK_INGEST_BATCH_SIZE
+        self.start_method = start_method or settings.BULK_INGEST_START_METHOD
+        self.skills_database_path = skills_database_path
+        self.vectorizer_model_path = vectorizer_model_path or settings.TFIDF_MODEL_PATH
+        self.jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self.lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=_init_worker,
+                    initargs=(self.skills_database_path, self.vectorizer_model_path)
+                )
+            return self._pool
+
+    def create_job(self, upload_dir: str, paths: List[str]) -> Dict[str, Any]:
+        """Register a new ingestion job for files stored in upload_dir
+
+        Raises:
+            UploadLimitExceededError: If the upload is over the bulk ingestion limits
+        """
+        total_files, oversized = scan_upload_files(paths)
+        job = {
+            "job_id": str(uuid.uuid4()),
+            "status": "queued",
+            "total_files": total_files,
+            # Oversized files are never read, so they count as failed up front
+            "processed": len(oversized),
+            "succeeded": 0,
+            "failed": len(oversized),
+            "inserted": 0,
+            "cache_hits": 0,
+            "duplicates": 0,
+            "batches_completed": 0,
+            "errors": oversized[:self.MAX_REPORTED_ERRORS],
+            "created_at": datetime.now().isoformat(),
+            "started_at": None,
+            "finished_at": None,
+            "_upload_dir": upload_dir,
+            "_paths": paths,
+            "_start": None,
+            "_end": None
+        }
+
+        with self.lock:
+            self.jobs[job["job_id"]] = job
+            while len(self.jobs) > self.MAX_TRACKED_JOBS:
+                self.jobs.popitem(last=False)
+
+        return self.get_job(job["job_id"])
+
+    def discard_job(self, job_id: str) -> None:
+        """Forget a job that will never run"""
+        with self.lock:
+            self.jobs.pop(job_id, None)
+
+    def run_job(self, job_id: str, db) -> None:
+        """Process a registered job to completion; blocks the calling thread"""
+        job = self.jobs[job_id]
+        job["status"] = "running"
+        job["started_at"] = datetime.now().isoformat()
+        job["_start"] = time.perf_counter()
+
+        try:
+            pool = self._get_pool()
+            model_version = build_model_version(model_fingerprint(self.vectorizer_model_path))
+            batches = _iter_batches(iter_upload_files(job["_paths"]), self.batch_size)
+            max_in_flight = self.max_workers * 2
+            in_flight = {}
+
+            for batch in batches:
+                # Identical files are resolved from the parse cache without touching the pool
+                cached_results, misses, context = self._split_cached(batch, db, model_version)
+                if cached_results:
+                    self._store_batch(job, cached_results, db)
+                if not misses:
+                    continue
+
+                in_flight[pool.submit(_process_batch, misses)] = context
+                if len(in_flight) >= max_in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self._store_parsed(job, future.result(), in_flight.pop(future), db, model_version)
+
+            for future, context in in_flight.items():
+                self._store_parsed(job, future.result(), context, db, model_version)
+
+            job["status"] = "completed"
+        except Exception as e:
+            print(f"Error in bulk ingestion job {job_id}: {str(e)}")
+            print(traceback.format_exc())
+            job["status"] = "failed"
+            self._add_error(job, None, str(e))
+        finally:
+            job["_end"] = time.perf_counter()
+            job["finished_at"] = datetime.now().isoformat()
+            shutil.rmtree(job["_upload_dir"], ignore_errors=True)
+
+    def _split_cached(self, batch: List[Tuple[str, bytes]], db, model_version: str):
+        """Split a batch into cache hits and files that still need parsing
+
+        Repeated content inside the batch is only parsed once; the repeats are
+        returned in the context and filled in from the parsed record.
+        """
+        digests = [content_hash(content) for _, content in batch]
+        cached = parse_cache.get_many(db, digests, model_version)
+        originals = parse_cache.find_originals(db, digests)
+
+        cached_results = []
+        misses = []
+        repeats: Dict[str, List[str]] = {}
+        for (filename, content), digest in zip(batch, digests):
+            if digest in cached:
+                record = record_from_cache(cached[digest])
+                record["content_hash"] = digest
+                if digest in originals:
+                    record["duplicate_of"] = originals[digest]
+                cached_results.append({"filename": filename, "record": record, "cached": True})
+            elif digest in repeats:
+                repeats[digest].append(filename)
+            else:
+                repeats[digest] = []
+                misses.append((filename, content, digest))
+
+        return cached_results, misses, {"repeats": repeats, "originals": originals}
+
+    def _store_parsed(self, job: Dict[str, Any], results: List[Dict[str, Any]],
+                      context: Dict[str, Any], db, model_version: str) -> None:
+        """Cache freshly parsed records, expand in-batch repeats and store them"""
+        expanded = []
+        fresh = []
+        for result in results:
+            expanded.append(result)
+            digest = result["content_hash"]
+            repeated = context["repeats"].get(digest, [])
+            if "record" in result:
+                record = result["record"]
+                if digest in context["originals"]:
+                    record["duplicate_of"] = context["originals"][digest]
+                fresh.append((digest, record))
+
+                for filename in repeated:
+                    duplicate = record_from_cache(cacheable_fields(record))
+                    duplicate["content_hash"] = digest
+                    duplicate["duplicate_of"] = record.get("duplicate_of", record["id"])
+                    expanded.append({"filename": filename, "record": duplicate, "cached": True})
+            else:
+                for filename in repeated:
+                    expanded.append({"filename": filename, "error": result["error"]})
+
+        parse_cache.put_many(db, fresh, model_version)
+        self._store_batch(job, expanded, db)
+
+    def _store_batch(self, job: Dict[str, Any], results: List[Dict[str, Any]], db) -> None:
+        records = [r["record"] for r in results if "record" in r]
+        for result in results:
+            if "error" in result:
+                self._add_error(job, result["filename"], result["error"])
+
+        if records:
+            data_versions.assign_sequence(db, RESUME_CORPUS, records)
+            try:
+                db.resumes.insert_many(records, ordered=False)
+            finally:
+                # Unordered inserts may store part of the batch before failing
+                data_versions.bump_resumes(db)
+
+        with self.lock:
+            job["processed"] += len(results)
+            job["succeeded"] += len(records)
+            job["failed"] += len(results) - len(records)
+            job["inserted"] += len(records)
+            job["cache_hits"] += sum(1 for r in results if r.get("cached"))
+            job["duplicates"] += sum(1 for record in records if record.get("duplicate_of"))
+            job["batches_completed"] += 1
+
+    def _add_error(self, job: Dict[str, Any], filename: Optional[str], error: str) -> None:
+        with self.lock:
+            if len(job["errors"]) < self.MAX_REPORTED_ERRORS:
+                job["errors"].append({"filename": filename, "error": error})
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a progress snapshot for a job, including throughput"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            snapshot = {key: value for key, value in job.items() if not key.startswith("_")}
+            snapshot["errors"] = list(job["errors"])
+
+        elapsed = 0.0
+        if job["_start"] is not None:
+            elapsed = (job["_end"] or time.perf_counter()) - job["_start"]
+
+        snapshot["elapsed_seconds"] = elapsed
+        snapshot["throughput_per_second"] = snapshot["processed"] / elapsed if elapsed > 0 else 0.0
+        snapshot["progress"] = (
+            snapshot["processed"] / snapshot["total_files"] if snapshot["total_files"] else 0.0
+        )
+        return snapshot
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        """Get progress snapshots for all tracked jobs"""
+        with self.lock:
+            job_ids = list(self.jobs.keys())
+        return [job for job in (self.get_job(job_id) for job_id in job_ids) if job]
+
+    def shutdown(self) -> None:
+        """Stop the worker pool"""
+        with self.lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+# Global bulk ingestion manager instance
+bulk_ingestion_manager = BulkIngestionManager()
@@ -0,0 +1,191 @@
+import hashlib
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable
+
+import numpy as np
+
+# Rough per-entry bookkeeping cost (key tuple, OrderedDict node, entry tuple)
+ENTRY_OVERHEAD_BYTES = 200
+
+_MISSING = object()
+
+def estimate_size(value: Any, depth: int = 4) -> int:
+    """Approximate bytes held by a value: exact for arrays, shallow sizes summed for containers"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (bytes, bytearray, str)):
+        return sys.getsizeof(value)
+    size = sys.getsizeof(value)
+    if depth <= 0:
+        return size
+    if isinstance(value, dict):
+        return size + sum(estimate_size(k, depth - 1) + estimate_size(v, depth - 1) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(estimate_size(item, depth - 1) for item in value)
+    return size
+
+def stable_key(*parts: Any) -> str:
+    """Short digest of key parts that is stable across processes, unlike hash()
+
+    Parts should be small identifiers (ids, versions, weights), not payloads.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(repr(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+class LRUCache:
+    """Thread-safe least-recently-used cache with optional TTL
+
+    Bounded by entry count and/or estimated bytes; the least recently used
+    entries are evicted in O(1) from the front of an OrderedDict. Expired
+    entries are dropped when they are next looked up or reach the front.
+    """
+
+    def __init__(self,
+                 max_entries: int = None,
+                 max_bytes: int = None,
+                 ttl: float = None,
+                 sizeof: Callable[[Any], int] = estimate_size):
+        self.max_entries = max_entries or 0
+        self.max_bytes = max_bytes or 0
+        self.ttl = ttl or 0
+        self.sizeof = sizeof
+        # key -> (value, size in bytes, expiry time or 0)
+        self.entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.bytes = 0
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self.entries.pop(key)
+        self.bytes -= size
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Cached value for key, or default on a miss or after expiry"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[2] and entry[2] <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, ttl: float = None) -> None:
+        """Store value under key, evicting least recently used entries beyond the bounds"""
+        size = self.sizeof(value) + ENTRY_OVERHEAD_BYTES
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else 0
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (value, size, expires_at)
+            self.bytes += size
+            self._evict()
+
+    def _evict(self) -> None:
+        """Called with the lock held; always keeps the newest entry"""
+        now = time.monotonic()
+        while len(self.entries) > 1:
+            key, (_, size, expires_at) = next(iter(self.entries.items()))
+            if expires_at and expires_at <= now:
+                self.expirations += 1
+            elif (self.max_entries and len(self.entries) > self.max_entries) or \
+                    (self.max_bytes and self.bytes > self.max_bytes):
+                self.evictions += 1
+            else:
+                break
+            self._remove(key)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any], ttl: float = None) -> Any:
+        """Cached value for key, computing and storing it on a miss
+
+        compute runs without the lock, so concurrent misses may compute twice.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value, ttl)
+        return value
+
+    def touch(self, key: Hashable) -> bool:
+        """Mark an entry as recently used without counting a hit"""
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return True
+            return False
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return default
+            self._remove(key)
+            return entry[0]
+
+    def invalidate(self, predicate: Callable[[Hashable], bool] = None) -> int:
+        """Drop entries whose key matches predicate, or all entries; returns the number dropped"""
+        with self.lock:
+            if predicate is None:
+                dropped = len(self.entries)
+                self.entries.clear()
+                self.bytes = 0
+                return dropped
+            keys = [key for key in self.entries if predicate(key)]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self) -> None:
+        self.invalidate()
+
+    def reset_stats(self) -> None:
+        with self.lock:
+            self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def keys(self) -> Iterable[Hashable]:
+        with self.lock:
+            return list(self.entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self.lock:
+            entry = self.entries.get(key)
+            return entry is not None and not (entry[2] and entry[2] <= time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def memory_usage(self) -> Dict[str, Any]:
+        """Estimated bytes held, for the memory accountant"""
+        return {"bytes": self.bytes, "entries": len(self.entries)}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit rate, size and eviction counts"""
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total > 0 else 0,
+                "entries": len(self.entries),
+                "max_entries": self.max_entries,
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
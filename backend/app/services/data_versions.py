@@ -0,0 +1,106 @@
+from typing import Any, Dict, Iterable, List, Tuple
+
+from pymongo import ReturnDocument
+
+from app.services.cache import stable_key
+
+RESUME_CORPUS = "resumes"
+JOB_CORPUS = "jobs"
+
+# Insert sequence number stored on each resume and job
+SEQUENCE_FIELD = "corpus_seq"
+
+def job_version_name(job_id: str) -> str:
+    return f"job:{job_id}"
+
+class DataVersions:
+    """Monotonic version counters for the resume corpus and each job
+
+    Counters live in a small MongoDB collection so that every worker process
+    sees the same versions. Writers bump a counter after every create, update
+    and delete; readers use the versions to key caches and build ETags without
+    reading the documents themselves. The resume and job corpus counters also
+    count deletions and updates, which incremental readers cannot detect from
+    the documents, and hand out the insert sequence numbers they read by.
+    """
+
+    def __init__(self, collection_name: str = "data_versions"):
+        self.collection_name = collection_name
+
+    def bump(self, db, name: str, deleted: bool = False, updated: bool = False) -> int:
+        """Increment a counter, and its deletion or update count, and return its new value"""
+        increments = {"version": 1}
+        if deleted:
+            increments["deletions"] = 1
+        if updated:
+            increments["updates"] = 1
+        document = db[self.collection_name].find_one_and_update(
+            {"_id": name},
+            {"$inc": increments},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return document["version"]
+
+    def bump_resumes(self, db, deleted: bool = False) -> int:
+        return self.bump(db, RESUME_CORPUS, deleted)
+
+    def bump_job(self, db, job_id: str, deleted: bool = False, updated: bool = False) -> int:
+        """Bump the job corpus counter and the job's own counter, returning the latter"""
+        self.bump(db, JOB_CORPUS, deleted, updated)
+        return self.bump(db, job_version_name(job_id))
+
+    def assign_sequence(self, db, name: str, documents: List[Dict[str, Any]]) -> None:
+        """Stamp documents about to be inserted with consecutive insert sequence numbers of a corpus"""
+        if not documents:
+            return
+        document = db[self.collection_name].find_one_and_update(
+            {"_id": name},
+            {"$inc": {"sequence": len(documents)}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        first = document["sequence"] - len(documents) + 1
+        for offset, record in enumerate(documents):
+            record[SEQUENCE_FIELD] = first + offset
+
+    def get_many(self, db, names: Iterable[str]) -> Dict[str, int]:
+        """Current values of several counters in one query; counters never bumped are 0"""
+        names = list(names)
+        versions = dict.fromkeys(names, 0)
+        for document in db[self.collection_name].find({"_id": {"$in": names}}):
+            versions[document["_id"]] = document.get("version", 0)
+        return versions
+
+    def get(self, db, name: str) -> int:
+        return self.get_many(db, [name])[name]
+
+    def match_versions(self, db, job_id: str) -> Dict[str, int]:
+        """Versions of a job and of the resume corpus, which together determine its match results"""
+        versions = self.get_many(db, [job_version_name(job_id), RESUME_CORPUS])
+        return {"job": versions[job_version_name(job_id)], "resumes": versions[RESUME_CORPUS]}
+
+    def corpus_versions(self, db) -> Dict[str, Tuple[int, int, int]]:
+        """(version, deletions, updates) of the resume and job corpora in one query"""
+        versions = {RESUME_CORPUS: (0, 0, 0), JOB_CORPUS: (0, 0, 0)}
+        for document in db[self.collection_name].find({"_id": {"$in": list(versions)}}):
+            versions[document["_id"]] = (
+                document.get("version", 0), document.get("deletions", 0), document.get("updates", 0)
+            )
+        return versions
+
+def make_etag(*parts) -> str:
+    """Strong ETag header value for a response determined by parts"""
+    return f'"{stable_key(*parts)}"'
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Whether an If-None-Match header value covers etag (weak comparison)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return any((tag[2:] if tag.startswith("W/") else tag) == etag for tag in tags)
+
+# Global data versions instance
+data_versions = DataVersions()
@@ -0,0 +1,109 @@
+import codecs
+import io
+import time
+import zipfile
+from typing import Dict, Any, Iterator, Iterable
+from xml.etree.ElementTree import iterparse
+
+from app.core.config import settings
+
+WORD_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+PARAGRAPH_TAG = WORD_NAMESPACE + "p"
+
+# Run elements that contribute text to a paragraph
+RUN_TEXT = {
+    WORD_NAMESPACE + "tab": "\t",
+    WORD_NAMESPACE + "ptab": "\t",
+    WORD_NAMESPACE + "br": "\n",
+    WORD_NAMESPACE + "cr": "\n",
+    WORD_NAMESPACE + "noBreakHyphen": "-"
+}
+TEXT_TAG = WORD_NAMESPACE + "t"
+
+class DocumentLimitExceededError(ValueError):
+    """Raised when an uploaded document is rejected because it is too large"""
+
+def iter_docx_paragraphs(content: bytes) -> Iterator[str]:
+    """Yield paragraph texts in document order, including paragraphs inside tables
+
+    The document body is decompressed and parsed incrementally, and each paragraph
+    is discarded once yielded, so memory stays flat however long the document is.
+    """
+    with zipfile.ZipFile(io.BytesIO(content)) as archive:
+        with archive.open("word/document.xml") as stream:
+            for _, element in iterparse(stream, events=("end",)):
+                if element.tag != PARAGRAPH_TAG:
+                    continue
+                # Nested paragraphs (text boxes) were already yielded and cleared
+                parts = []
+                for node in element.iter():
+                    if node.tag == TEXT_TAG:
+                        parts.append(node.text or "")
+                    elif node.tag in RUN_TEXT:
+                        parts.append(RUN_TEXT[node.tag])
+                element.clear()
+                yield "".join(parts)
+
+def iter_text_lines(content: bytes, encoding: str = "utf-8") -> Iterator[str]:
+    """Yield lines of a plain-text file, decoding lazily"""
+    # utf-8-sig drops a leading byte order mark; undecodable bytes are replaced
+    if codecs.lookup(encoding).name == "utf-8":
+        encoding = "utf-8-sig"
+    stream = io.TextIOWrapper(io.BytesIO(content), encoding=encoding, errors="replace", newline=None)
+    for line in stream:
+        yield line.rstrip("\n")
+
+def _collect_text(blocks: Iterable[str], max_chars: int) -> Dict[str, Any]:
+    """Gather blocks until max_chars of text, joining them once at the end"""
+    started = time.perf_counter()
+    parts = []
+    total_chars = 0
+    truncated = False
+
+    for block in blocks:
+        parts.append(block)
+        total_chars += len(block) + 1
+        if max_chars and total_chars >= max_chars:
+            truncated = True
+            break
+
+    return {
+        "text": "\n".join(parts),
+        "blocks_extracted": len(parts),
+        "chars": max(total_chars - 1, 0),
+        "truncated": truncated,
+        "stop_reason": "max_chars" if truncated else None,
+        "seconds": time.perf_counter() - started
+    }
+
+def _check_size(content: bytes, max_bytes: int, kind: str) -> None:
+    if max_bytes and len(content) > max_bytes:
+        raise DocumentLimitExceededError(
+            f"{kind} is {len(content)} bytes, which exceeds the {max_bytes} byte limit"
+        )
+
+def extract_docx_text(content: bytes, max_bytes: int = None, max_chars: int = None) -> Dict[str, Any]:
+    """
+    Extract DOCX text paragraph by paragraph within byte and text budgets
+
+    Returns:
+        Dictionary with the joined text and extraction statistics
+    """
+    max_bytes = max_bytes if max_bytes is not None else settings.DOCUMENT_MAX_BYTES
+    max_chars = max_chars if max_chars is not None else settings.DOCUMENT_MAX_TEXT_CHARS
+    _check_size(content, max_bytes, "DOCX")
+
+    return _collect_text(iter_docx_paragraphs(content), max_chars)
+
+def extract_plain_text(content: bytes, max_bytes: int = None, max_chars: int = None) -> Dict[str, Any]:
+    """
+    Extract plain-text lines within byte and text budgets
+
+    Returns:
+        Dictionary with the joined text and extraction statistics
+    """
+    max_bytes = max_bytes if max_bytes is not None else settings.DOCUMENT_MAX_BYTES
+    max_chars = max_chars if max_chars is not None else settings.DOCUMENT_MAX_TEXT_CHARS
+    _check_size(content, max_bytes, "Text file")
+
+    return _collect_text(iter_text_lines(content), max_chars)
@@ -0,0 +1,216 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Any, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.memory import memory_accountant
+from app.services.cache import LRUCache
+from app.services.performance_monitor import performance_monitor
+
+def text_hash(text: str) -> str:
+    """SHA-256 hex digest of a text"""
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+class EmbeddingCache:
+    """Embeddings keyed by model version and text hash
+
+    The first tier is an in-process LRU bounded by the bytes of the stored
+    vectors; the second is a sqlite file shared by all worker processes.
+    """
+
+    def __init__(self,
+                 max_memory_bytes: int = None,
+                 db_path: str = None,
+                 enabled: bool = None):
+        self.enabled = settings.EMBEDDING_CACHE_ENABLED if enabled is None else enabled
+        self.max_memory_bytes = max_memory_bytes or settings.EMBEDDING_CACHE_MAX_BYTES
+        self.db_path = db_path if db_path is not None else settings.EMBEDDING_CACHE_PATH
+        self.memory = LRUCache(max_bytes=self.max_memory_bytes, sizeof=lambda vector: vector.nbytes)
+        self.lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_failed = False
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        """Open the sqlite tier on first use; called with the lock held"""
+        if self._db is None and self.db_path and not self._db_failed:
+            try:
+                directory = os.path.dirname(self.db_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                db = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute("PRAGMA synchronous=NORMAL")
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS embeddings ("
+                    "model_version TEXT NOT NULL, text_hash TEXT NOT NULL, "
+                    "dtype TEXT NOT NULL, vector BLOB NOT NULL, created_at REAL NOT NULL, "
+                    "PRIMARY KEY (model_version, text_hash))"
+                )
+                db.commit()
+                self._db = db
+            except sqlite3.Error as e:
+                print(f"Warning: Could not open embedding cache at {self.db_path}: {e}")
+                self._db_failed = True
+        return self._db
+
+    @staticmethod
+    def _freeze(vector: np.ndarray) -> np.ndarray:
+        # Cached vectors are shared between callers, so they must not be modified in place
+        vector = np.array(vector, copy=True)
+        vector.setflags(write=False)
+        return vector
+
+    def get_many(self, model_version: str, texts: List[str]) -> Dict[str, np.ndarray]:
+        """Look up several texts, returning vectors by text hash"""
+        hashes = list(dict.fromkeys(text_hash(text) for text in texts))
+        found = {}
+        if not self.enabled:
+            return found
+
+        with self.lock:
+            missing = []
+            for digest in hashes:
+                vector = self.memory.get((model_version, digest))
+                if vector is not None:
+                    found[digest] = vector
+                else:
+                    missing.append(digest)
+            self.memory_hits += len(found)
+
+            db = self._connection() if missing else None
+            disk_found = 0
+            if db is not None:
+                # Stay below sqlite's bound parameter limit
+                for start in range(0, len(missing), 500):
+                    chunk = missing[start:start + 500]
+                    rows = db.execute(
+                        f"SELECT text_hash, dtype, vector FROM embeddings WHERE model_version = ? "
+                        f"AND text_hash IN ({','.join('?' * len(chunk))})",
+                        [model_version] + chunk
+                    ).fetchall()
+                    for digest, dtype, blob in rows:
+                        vector = self._freeze(np.frombuffer(blob, dtype=dtype))
+                        found[digest] = vector
+                        self.memory.put((model_version, digest), vector)
+                        disk_found += 1
+            self.disk_hits += disk_found
+            self.misses += len(missing) - disk_found
+        return found
+
+    def put_many(self, model_version: str, items: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Store vectors by text hash in both tiers, returning the frozen copies"""
+        frozen = {digest: self._freeze(vector) for digest, vector in items.items()}
+        if not self.enabled or not frozen:
+            return frozen
+
+        with self.lock:
+            for digest, vector in frozen.items():
+                self.memory.put((model_version, digest), vector)
+            db = self._connection()
+            if db is not None:
+                now = time.time()
+                try:
+                    db.executemany(
+                        "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?, ?)",
+                        [(model_version, digest, vector.dtype.str, vector.tobytes(), now)
+                         for digest, vector in frozen.items()]
+                    )
+                    db.commit()
+                except sqlite3.Error as e:
+                    print(f"Warning: Could not write embedding cache: {e}")
+        return frozen
+
+    def get_or_compute(self,
+                       model_version: str,
+                       text: str,
+                       compute: Callable[[str], np.ndarray]) -> np.ndarray:
+        """Return the cached vector for text, computing and storing it on a miss"""
+        return self.get_or_compute_batch(model_version, [text], lambda texts: [compute(texts[0])])[0]
+
+    def get_or_compute_batch(self,
+                             model_version: str,
+                             texts: List[str],
+                             compute_batch: Callable[[List[str]], Any]) -> List[np.ndarray]:
+        """Return vectors for texts in order, computing only the misses in one batch"""
+        if not self.enabled:
+            return list(compute_batch(texts))
+
+        hashes = [text_hash(text) for text in texts]
+        found = self.get_many(model_version, texts)
+
+        pending = {}
+        for digest, text in zip(hashes, texts):
+            if digest not in found and digest not in pending:
+                pending[digest] = text
+        if pending:
+            vectors = compute_batch(list(pending.values()))
+            found.update(self.put_many(model_version, dict(zip(pending.keys(), vectors))))
+
+        return [found[digest] for digest in hashes]
+
+    def invalidate(self, model_version: str = None) -> None:
+        """Drop entries of one model version, or everything, from both tiers"""
+        with self.lock:
+            if model_version is None:
+                self.memory.clear()
+            else:
+                self.memory.invalidate(lambda key: key[0] == model_version)
+
+            db = self._connection()
+            if db is not None:
+                try:
+                    if model_version is None:
+                        db.execute("DELETE FROM embeddings")
+                    else:
+                        db.execute("DELETE FROM embeddings WHERE model_version = ?", (model_version,))
+                    db.commit()
+                except sqlite3.Error as e:
+                    print(f"Warning: Could not invalidate embedding cache: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit rates and sizes of both tiers"""
+        with self.lock:
+            hits = self.memory_hits + self.disk_hits
+            total = hits + self.misses
+            disk_entries = None
+            db = self._connection() if self.enabled else None
+            if db is not None:
+                try:
+                    disk_entries = db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+                except sqlite3.Error:
+                    pass
+            return {
+                "enabled": self.enabled,
+                "hits": hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": hits / total if total > 0 else 0,
+                "memory_entries": len(self.memory),
+                "memory_bytes": self.memory.bytes,
+                "max_memory_bytes": self.max_memory_bytes,
+                "evictions": self.memory.evictions,
+                "disk_entries": disk_entries,
+                "db_path": self.db_path
+            }
+
+    def close(self) -> None:
+        """Close the sqlite tier"""
+        with self.lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+# Global embedding cache instance
+embedding_cache = EmbeddingCache()
+performance_monitor.register_cache("embeddings", embedding_cache.get_stats)
+memory_accountant.register("embedding_cache", embedding_cache.memory.memory_usage)
@@ -0,0 +1,178 @@
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.memory import deep_sizeof, memory_accountant
+from app.services.data_versions import RESUME_CORPUS, data_versions
+from app.services.embeddings import sentence_embedder, resume_text, resume_embedding_fields, stored_float_embedding
+from app.services.quantization import QUANTIZATION_DTYPES, QuantizedIndex, quantize, encoded_codes
+
+class ResumeEmbeddingIndex:
+    """In-process quantized matrix of all resume embeddings for top-K search
+
+    Built from the stored (normally already quantized) embeddings and rebuilt
+    when resumes are added, changed or removed, or the embedding model changes.
+    Resumes without a current embedding are embedded and stored while building.
+    """
+
+    def __init__(self, dtype: str = None, rerank_factor: int = None):
+        configured = dtype or settings.EMBEDDING_QUANTIZATION
+        # The in-memory matrix is always quantized; "none" only affects storage
+        self.dtype = configured if configured in QUANTIZATION_DTYPES else "int8"
+        self.rerank_factor = rerank_factor or settings.EMBEDDING_RERANK_FACTOR
+        self.index: Optional[QuantizedIndex] = None
+        self.signature: Optional[Tuple] = None
+        self.lock = threading.Lock()
+
+        self.builds = 0
+        self.last_build_seconds = 0.0
+        self.searches = 0
+        self.rerank_embedded = 0
+
+    def _signature(self, db) -> Tuple:
+        # Every resume create, update and delete bumps the corpus counter
+        return (data_versions.get(db, RESUME_CORPUS), sentence_embedder.model_version)
+
+    def _build(self, db) -> QuantizedIndex:
+        version = sentence_embedder.model_version
+        ids, codes, scales, stale_ids = [], [], [], []
+
+        projection = {"id": 1, "embedding": 1, "embedding_q": 1, "embedding_model": 1, "_id": 0}
+        for resume in db.resumes.find({}, projection):
+            if resume.get("embedding_model") != version:
+                stale_ids.append(resume["id"])
+            elif resume.get("embedding_q"):
+                row, scale = encoded_codes(resume["embedding_q"], self.dtype)
+                ids.append(resume["id"])
+                codes.append(row)
+                scales.append(scale)
+            elif resume.get("embedding"):
+                row, scale = quantize(resume["embedding"], self.dtype)
+                ids.append(resume["id"])
+                codes.append(row[0])
+                scales.append(float(scale[0]))
+            else:
+                stale_ids.append(resume["id"])
+
+        # Embed and store what is missing, fetching raw text in batches
+        batch_size = sentence_embedder.batch_size * 8
+        for start in range(0, len(stale_ids), batch_size):
+            batch = list(db.resumes.find(
+                {"id": {"$in": stale_ids[start:start + batch_size]}}, {"id": 1, "raw_text": 1, "_id": 0}
+            ))
+            vectors = sentence_embedder.embed_batch([resume_text(resume) for resume in batch])
+            row_codes, row_scales = quantize(vectors, self.dtype)
+            for resume, vector, row, scale in zip(batch, vectors, row_codes, row_scales):
+                db.resumes.update_one({"id": resume["id"]}, {"$set": resume_embedding_fields(vector, version)})
+                ids.append(resume["id"])
+                codes.append(row)
+                scales.append(float(scale))
+
+        if not ids:
+            return QuantizedIndex(dtype=self.dtype)
+        return QuantizedIndex.from_codes(ids, np.vstack(codes), np.array(scales), dtype=self.dtype)
+
+    def get(self, db) -> QuantizedIndex:
+        """Get the index, rebuilding it if the resumes or the model changed"""
+        signature = self._signature(db)
+        with self.lock:
+            if self.index is None or signature != self.signature:
+                started = time.perf_counter()
+                self.index = self._build(db)
+                # Embedding stale resumes does not change the signature
+                self.signature = signature
+                self.builds += 1
+                self.last_build_seconds = time.perf_counter() - started
+            return self.index
+
+    def _exact_vectors(self, db, candidate_ids: List[str]) -> np.ndarray:
+        """Float embeddings of candidates from storage
+
+        Resumes stored before embedding_f16 existed have only int8 codes; they
+        are embedded again from text once and the float16 copy is stored.
+        """
+        version = sentence_embedder.model_version
+        projection = {"id": 1, "embedding": 1, "embedding_q": 1, "embedding_f16": 1, "embedding_model": 1, "_id": 0}
+        vectors = {}
+        for resume in db.resumes.find({"id": {"$in": candidate_ids}}, projection):
+            vector = stored_float_embedding(resume) if resume.get("embedding_model") == version else None
+            if vector is not None:
+                vectors[resume["id"]] = vector
+
+        missing = [id_ for id_ in candidate_ids if id_ not in vectors]
+        if missing:
+            batch = list(db.resumes.find({"id": {"$in": missing}}, {"id": 1, "raw_text": 1, "_id": 0}))
+            embedded = sentence_embedder.embed_batch([resume_text(resume) for resume in batch])
+            for resume, vector in zip(batch, embedded):
+                db.resumes.update_one({"id": resume["id"]}, {"$set": resume_embedding_fields(vector, version)})
+                vectors[resume["id"]] = vector
+        with self.lock:
+            self.rerank_embedded += len(missing)
+
+        dimension = len(next(iter(vectors.values()))) if vectors else 0
+        return np.vstack([vectors.get(id_, np.zeros(dimension, dtype=np.float32)) for id_ in candidate_ids])
+
+    def search(self,
+               db,
+               query: np.ndarray,
+               top_k: int = 10,
+               rerank: bool = True) -> List[Tuple[str, float]]:
+        """
+        Find the resumes most similar to a query embedding
+
+        Args:
+            db: Database handle
+            query: Embedding of the job
+            top_k: Number of resumes to return
+            rerank: Re-score the best candidates with exact float embeddings
+
+        Returns:
+            (resume id, cosine similarity) pairs, best first
+        """
+        index = self.get(db)
+
+        def exact_vectors(candidate_ids: List[str]) -> np.ndarray:
+            return self._exact_vectors(db, candidate_ids)
+
+        with self.lock:
+            self.searches += 1
+        return index.search(
+            query,
+            top_k=top_k,
+            rerank=exact_vectors if rerank else None,
+            rerank_factor=self.rerank_factor
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index size and build statistics"""
+        with self.lock:
+            return {
+                "dtype": self.dtype,
+                "resumes": len(self.index) if self.index is not None else 0,
+                "memory_bytes": self.index.nbytes if self.index is not None else 0,
+                "rerank_factor": self.rerank_factor,
+                "builds": self.builds,
+                "last_build_seconds": self.last_build_seconds,
+                "searches": self.searches,
+                "rerank_embedded": self.rerank_embedded
+            }
+
+    def memory_usage(self) -> Dict[str, Any]:
+        """Bytes of the quantized matrix and its id list"""
+        index = self.index
+        if index is None:
+            return {"bytes": 0, "resumes": 0}
+        ids = deep_sizeof(index.ids)
+        return {
+            "bytes": index.nbytes + ids,
+            "resumes": len(index),
+            "matrix_bytes": index.nbytes,
+            "ids_bytes": ids
+        }
+
+# Global resume embedding index instance
+resume_embedding_index = ResumeEmbeddingIndex()
+memory_accountant.register("embedding_index", resume_embedding_index.memory_usage)
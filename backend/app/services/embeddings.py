@@ -0,0 +1,358 @@
+import os
+import re
+import threading
+import zlib
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+from pymongo import UpdateOne
+
+from app.core.config import settings
+from app.core.memory import array_bytes, deep_sizeof, memory_accountant
+from app.core.prometheus import time_model_load
+from app.services.embedding_cache import embedding_cache
+from app.services.quantization import QUANTIZATION_DTYPES, encode_vector, decode_vector
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.\-]*")
+
+def _file_version(path: str) -> str:
+    """Cheap identity of a model file or directory that changes when it is replaced"""
+    stat = os.stat(path)
+    return f"{os.path.basename(os.path.normpath(path))}-{stat.st_size}-{int(stat.st_mtime)}"
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+class HashingEmbeddingBackend:
+    """Deterministic feature-hashing embeddings of unigrams and bigrams
+
+    Needs no model file, so it is the fallback when no local model is configured.
+    crc32 is used instead of hash() so vectors are stable across processes.
+    """
+
+    name = "hashing"
+
+    def __init__(self, dimension: int, max_seq_length: int):
+        self.dimension = dimension
+        self.max_seq_length = max_seq_length
+        self.model_version = f"hashing-{dimension}-{max_seq_length}"
+
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = TOKEN_PATTERN.findall((text or "").lower())[:self.max_seq_length]
+            features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            for feature in features:
+                digest = zlib.crc32(feature.encode("utf-8"))
+                sign = 1.0 if digest & 0x80000000 else -1.0
+                matrix[row, digest % self.dimension] += sign
+        return _normalize_rows(matrix)
+
+    def memory_usage(self) -> Dict[str, Any]:
+        return {"bytes": 0}
+
+class Word2VecEmbeddingBackend:
+    """Mean of gensim word vectors, loaded memory-mapped from a local file"""
+
+    name = "word2vec"
+
+    def __init__(self, model_path: str, max_seq_length: int):
+        from gensim.models import KeyedVectors
+
+        if model_path.endswith((".bin", ".bin.gz")):
+            self.vectors = KeyedVectors.load_word2vec_format(model_path, binary=True)
+        else:
+            self.vectors = KeyedVectors.load(model_path, mmap="r")
+        self.dimension = self.vectors.vector_size
+        self.max_seq_length = max_seq_length
+        self.model_version = f"word2vec-{_file_version(model_path)}"
+
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        key_to_index = self.vectors.key_to_index
+        for row, text in enumerate(texts):
+            tokens = TOKEN_PATTERN.findall((text or "").lower())[:self.max_seq_length]
+            indices = [key_to_index[token] for token in tokens if token in key_to_index]
+            if indices:
+                matrix[row] = self.vectors.vectors[indices].mean(axis=0)
+        return _normalize_rows(matrix)
+
+    def memory_usage(self) -> Dict[str, Any]:
+        """Vector matrix and vocabulary; a memory-mapped matrix is file-backed and not counted"""
+        vectors = self.vectors.vectors
+        vocabulary = deep_sizeof(self.vectors.key_to_index) + deep_sizeof(self.vectors.index_to_key)
+        return {
+            "bytes": array_bytes(vectors) + vocabulary,
+            "vectors_bytes": array_bytes(vectors),
+            "mapped_bytes": vectors.nbytes if isinstance(vectors, np.memmap) else 0,
+            "vocabulary_bytes": vocabulary
+        }
+
+class OnnxEmbeddingBackend:
+    """Sentence-transformer style ONNX model with mean pooling, run on CPU
+
+    model_path is a directory with model.onnx and tokenizer.json, or the path
+    of an .onnx file with tokenizer.json next to it.
+    """
+
+    name = "onnx"
+
+    def __init__(self, model_path: str, max_seq_length: int, num_threads: int):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_file = model_path if model_path.endswith(".onnx") else os.path.join(model_path, "model.onnx")
+        tokenizer_file = os.path.join(os.path.dirname(model_file), "tokenizer.json")
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = num_threads
+        options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(model_file, sess_options=options, providers=["CPUExecutionProvider"])
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(tokenizer_file)
+        self.tokenizer.enable_truncation(max_length=max_seq_length)
+        self.tokenizer.enable_padding()
+
+        self.max_seq_length = max_seq_length
+        self.model_file = model_file
+        self.model_version = f"onnx-{_file_version(model_file)}-{max_seq_length}"
+        self.dimension = int(self._run(["dimension probe"]).shape[1])
+
+    def _run(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([encoding.ids for encoding in encodings], dtype=np.int64)
+        attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+        output = self.session.run(None, {name: value for name, value in feeds.items() if name in self.input_names})[0]
+
+        if output.ndim == 3:
+            # Mean-pool token embeddings, ignoring padding
+            mask = attention_mask[..., None].astype(np.float32)
+            output = (output * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        return output.astype(np.float32)
+
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        return _normalize_rows(self._run([text or "" for text in texts]))
+
+    def memory_usage(self) -> Dict[str, Any]:
+        """onnxruntime allocates the weights natively; the model file size approximates them"""
+        model_bytes = os.path.getsize(self.model_file)
+        return {"bytes": model_bytes, "model_file_bytes": model_bytes, "estimated": True}
+
+BACKENDS = {
+    "hashing": HashingEmbeddingBackend,
+    "word2vec": Word2VecEmbeddingBackend,
+    "onnx": OnnxEmbeddingBackend
+}
+
+class EmbeddingService:
+    """Batched text embeddings from a pluggable local backend
+
+    The backend is loaded lazily from disk; if the configured model or its
+    optional dependency is missing, the hashing backend is used instead.
+    """
+
+    def __init__(self,
+                 backend_name: str = None,
+                 model_path: str = None,
+                 dimension: int = None,
+                 max_seq_length: int = None,
+                 batch_size: int = None,
+                 num_threads: int = None):
+        self.backend_name = backend_name or settings.EMBEDDING_BACKEND
+        self.model_path = model_path if model_path is not None else settings.EMBEDDING_MODEL_PATH
+        self.fallback_dimension = dimension or settings.EMBEDDING_DIMENSION
+        self.max_seq_length = max_seq_length or settings.EMBEDDING_MAX_SEQ_LENGTH
+        self.batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+        self.num_threads = num_threads or settings.EMBEDDING_NUM_THREADS
+        self.fallback_reason: Optional[str] = None
+        self._backend = None
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self):
+        """Lazily load the configured backend"""
+        if self._backend is None:
+            with self._lock:
+                if self._backend is None:
+                    with time_model_load(f"embedding:{self.backend_name}"):
+                        self._backend = self._load()
+        return self._backend
+
+    def _load(self):
+        if self.backend_name != "hashing":
+            try:
+                if self.backend_name not in BACKENDS:
+                    raise ValueError(f"Unknown embedding backend '{self.backend_name}'")
+                if not self.model_path or not os.path.exists(self.model_path):
+                    raise FileNotFoundError(f"Model not found at '{self.model_path}'")
+                if self.backend_name == "onnx":
+                    return OnnxEmbeddingBackend(self.model_path, self.max_seq_length, self.num_threads)
+                return Word2VecEmbeddingBackend(self.model_path, self.max_seq_length)
+            except Exception as e:
+                self.fallback_reason = f"{type(e).__name__}: {str(e)}"
+                print(f"Warning: Could not load {self.backend_name} embedding backend ({self.fallback_reason}). "
+                      f"Using hashing embeddings.")
+        return HashingEmbeddingBackend(self.fallback_dimension, self.max_seq_length)
+
+    @property
+    def dimension(self) -> int:
+        return self.backend.dimension
+
+    @property
+    def model_version(self) -> str:
+        """Identifies the vectors produced, for staleness checks and cache keys"""
+        return self.backend.model_version
+
+    def embed(self, text: str) -> np.ndarray:
+        """Embed one text as a unit-length vector"""
+        return self.embed_batch([text])[0]
+
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        """Embed texts as a (len(texts), dimension) matrix, computing only uncached texts"""
+        backend = self.backend
+        if not texts:
+            return np.zeros((0, backend.dimension), dtype=np.float32)
+        vectors = embedding_cache.get_or_compute_batch(backend.model_version, texts, self._embed_uncached)
+        return np.vstack(vectors)
+    
+    def _embed_uncached(self, texts: List[str]) -> np.ndarray:
+        """Run the backend in batches of batch_size"""
+        chunks = [
+            self.backend.embed_batch(texts[start:start + self.batch_size])
+            for start in range(0, len(texts), self.batch_size)
+        ]
+        return np.vstack(chunks)
+    
+    def reload(self) -> None:
+        """Reload the backend from disk and drop cached vectors of a replaced model"""
+        with self._lock:
+            old_version = self._backend.model_version if self._backend is not None else None
+            self._backend = None
+            self.fallback_reason = None
+        if old_version is not None and old_version != self.model_version:
+            embedding_cache.invalidate(old_version)
+
+    def ensure_embeddings(self,
+                          documents: List[Dict[str, Any]],
+                          get_text: Callable[[Dict[str, Any]], str],
+                          field: str = "embedding") -> List[Dict[str, Any]]:
+        """Embed documents whose stored embedding is missing or from another model
+
+        Returns:
+            The documents that were newly embedded, to be stored
+        """
+        version = self.model_version
+        stale = []
+        for document in documents:
+            if document.get(f"{field}_model") != version:
+                stale.append(document)
+            elif not document.get(field):
+                # Quantized storage is decoded for matching but not written back
+                exact = document.get(f"{field}_f16") or document.get(f"{field}_q")
+                if exact:
+                    document[field] = decode_vector(exact).tolist()
+                else:
+                    stale.append(document)
+        if stale:
+            vectors = self.embed_batch([get_text(document) for document in stale])
+            for document, vector in zip(stale, vectors):
+                document[field] = vector.tolist()
+                document[f"{field}_model"] = version
+        return stale
+
+    def memory_usage(self) -> Dict[str, Any]:
+        """Memory of the loaded backend; does not trigger loading"""
+        backend = self._backend
+        if backend is None:
+            return {"bytes": 0, "loaded": False}
+        return {"backend": backend.name, "loaded": True, **backend.memory_usage()}
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get the configured and active backend"""
+        backend = self.backend
+        return {
+            "configured_backend": self.backend_name,
+            "active_backend": backend.name,
+            "model_path": self.model_path,
+            "model_version": backend.model_version,
+            "dimension": backend.dimension,
+            "max_seq_length": self.max_seq_length,
+            "batch_size": self.batch_size,
+            "num_threads": self.num_threads,
+            "fallback_reason": self.fallback_reason
+        }
+
+def job_text(job: Dict[str, Any]) -> str:
+    """Text of a job posting used for vectors and embeddings"""
+    return (f"{job.get('title', '')} {job.get('description', '')} "
+            f"{' '.join(job.get('requirements') or [])} {' '.join(job.get('qualifications') or [])}")
+
+def resume_text(resume: Dict[str, Any]) -> str:
+    """Text of a resume used for vectors and embeddings"""
+    return resume.get("raw_text") or ""
+
+def resume_embedding_fields(vector: np.ndarray, model_version: str) -> Dict[str, Any]:
+    """Resume fields storing an embedding, quantized unless EMBEDDING_QUANTIZATION is "none"
+
+    Exactly one of embedding and embedding_q is set so a stale copy never lingers.
+    int8 storage also keeps a float16 copy in embedding_f16 for exact re-ranking.
+    """
+    if settings.EMBEDDING_QUANTIZATION in QUANTIZATION_DTYPES:
+        int8 = settings.EMBEDDING_QUANTIZATION == "int8"
+        return {
+            "embedding": None,
+            "embedding_q": encode_vector(vector, settings.EMBEDDING_QUANTIZATION),
+            "embedding_f16": encode_vector(vector, "float16") if int8 else None,
+            "embedding_model": model_version
+        }
+    return {
+        "embedding": np.asarray(vector).tolist(),
+        "embedding_q": None,
+        "embedding_f16": None,
+        "embedding_model": model_version
+    }
+
+def stored_float_embedding(resume: Dict[str, Any]) -> Optional[np.ndarray]:
+    """The most precise stored embedding of a resume as float32, or None if only int8 codes are stored"""
+    if resume.get("embedding"):
+        return np.asarray(resume["embedding"], dtype=np.float32)
+    if resume.get("embedding_f16"):
+        return decode_vector(resume["embedding_f16"])
+    if resume.get("embedding_q") and resume["embedding_q"]["dtype"] != "int8":
+        return decode_vector(resume["embedding_q"])
+    return None
+
+def prepare_match_embeddings(db, job: Dict[str, Any], resumes: List[Dict[str, Any]]) -> None:
+    """Fill in missing or stale embeddings before matching and store them"""
+    for document in sentence_embedder.ensure_embeddings([job], job_text):
+        db.jobs.update_one(
+            {"id": document["id"]},
+            {"$set": {"embedding": document["embedding"], "embedding_model": document["embedding_model"]}}
+        )
+    updates = [
+        UpdateOne(
+            {"id": document["id"]},
+            {"$set": resume_embedding_fields(document["embedding"], document["embedding_model"])}
+        )
+        for document in sentence_embedder.ensure_embeddings(resumes, resume_text)
+    ]
+    if updates:
+        db.resumes.bulk_write(updates, ordered=False)
+
+# Global embedding services: sentence embeddings for matching and the
+# "bert" analysis features, word embeddings for the "word2vec" features
+sentence_embedder = EmbeddingService()
+word_embedder = EmbeddingService(
+    backend_name="word2vec" if settings.WORD2VEC_MODEL_PATH else "hashing",
+    model_path=settings.WORD2VEC_MODEL_PATH,
+    dimension=100
+)
+memory_accountant.register("sentence_embeddings", sentence_embedder.memory_usage)
+memory_accountant.register("word_embeddings", word_embedder.memory_usage)
@@ -0,0 +1,119 @@
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import spacy
+
+from app.core.config import settings
+from app.core.memory import memory_accountant, spacy_model_usage
+from app.core.prometheus import time_model_load
+
+# Components that named entity recognition never reads from. They are excluded
+# at load time; the shared tok2vec is only kept when the NER component listens to it.
+UNUSED_PIPES = ["tagger", "parser", "attribute_ruler", "lemmatizer", "senter", "morphologizer"]
+
+class EntityExtractor:
+    """Named entity extraction on a spaCy pipeline trimmed down to NER"""
+
+    def __init__(self,
+                 model_name: str = None,
+                 batch_size: int = None,
+                 n_process: int = None):
+        self.model_name = model_name or settings.SPACY_MODEL
+        self.batch_size = batch_size or settings.NER_BATCH_SIZE
+        self.n_process = n_process or settings.NER_N_PROCESS
+        self.disabled_pipes: List[str] = []
+        self._nlp = None
+        self._load_failed = False
+        self._lock = threading.Lock()
+
+    @property
+    def nlp(self):
+        """Lazily load the trimmed pipeline, returning None if the model is missing"""
+        if self._nlp is None and not self._load_failed:
+            with self._lock:
+                if self._nlp is None and not self._load_failed:
+                    self._load()
+        return self._nlp
+
+    def _load(self) -> None:
+        try:
+            with time_model_load(f"spacy:{self.model_name}"):
+                nlp = spacy.load(self.model_name, exclude=UNUSED_PIPES)
+        except OSError:
+            print(f"Warning: spaCy model not found. Install with: python -m spacy download {self.model_name}")
+            self._load_failed = True
+            return
+
+        disabled = list(UNUSED_PIPES)
+        if "tok2vec" in nlp.pipe_names:
+            listeners = getattr(nlp.get_pipe("tok2vec"), "listening_components", [])
+            if "ner" not in listeners:
+                nlp.disable_pipe("tok2vec")
+                disabled.append("tok2vec")
+
+        self.disabled_pipes = disabled
+        self._nlp = nlp
+
+    def iter_docs(self,
+                  texts: Iterable[str],
+                  batch_size: int = None,
+                  n_process: int = None) -> Iterator:
+        """Stream spaCy docs for texts through nlp.pipe"""
+        if self.nlp is None:
+            return iter(())
+
+        return self.nlp.pipe(
+            (text or "" for text in texts),
+            batch_size=batch_size or self.batch_size,
+            n_process=n_process or self.n_process
+        )
+
+    @staticmethod
+    def group_entities(doc) -> Dict[str, List[str]]:
+        """Group the entities of a doc by label"""
+        entities = {}
+        for ent in doc.ents:
+            entities.setdefault(ent.label_, []).append(ent.text)
+        return entities
+
+    def extract(self, text: str) -> Dict[str, List[str]]:
+        """Extract entities from a single text, grouped by label"""
+        if self.nlp is None:
+            return {}
+        return self.group_entities(self.nlp(text or ""))
+
+    def extract_batch(self,
+                      texts: List[str],
+                      batch_size: int = None,
+                      n_process: int = None) -> List[Dict[str, List[str]]]:
+        """Extract entities for many texts, preserving input order"""
+        if self.nlp is None:
+            return [{} for _ in texts]
+
+        return [
+            self.group_entities(doc)
+            for doc in self.iter_docs(texts, batch_size=batch_size, n_process=n_process)
+        ]
+
+    def get_status(self) -> Dict[str, Optional[object]]:
+        """Describe the loaded pipeline and batching configuration"""
+        nlp = self._nlp
+        return {
+            "model": self.model_name,
+            "loaded": nlp is not None,
+            "active_pipes": list(nlp.pipe_names) if nlp is not None else [],
+            "disabled_pipes": list(self.disabled_pipes),
+            "batch_size": self.batch_size,
+            "n_process": self.n_process
+        }
+
+    def memory_usage(self) -> Dict[str, object]:
+        """Weights held by the loaded pipeline; does not trigger loading"""
+        nlp = self._nlp
+        if nlp is None:
+            return {"bytes": 0, "model": self.model_name, "loaded": False}
+        return {"model": self.model_name, "loaded": True, **spacy_model_usage(nlp)}
+
+# Global entity extractor instance
+entity_extractor = EntityExtractor()
+memory_accountant.register("spacy", entity_extractor.memory_usage)
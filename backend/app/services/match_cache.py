@@ -0,0 +1,91 @@
+import threading
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.memory import memory_accountant
+from app.services.cache import LRUCache, stable_key
+from app.services.data_versions import make_etag
+from app.services.performance_monitor import performance_monitor
+
+class MatchResultCache:
+    """Ranked match results keyed by job, job version, resume corpus version and scoring weights
+
+    Versions come from data_versions, so a key is built without reading the job
+    or any resume. Any write to the job or the corpus bumps a version and thus
+    changes the key; old keys simply age out of the LRU.
+    """
+
+    def __init__(self, max_entries: int = None, max_bytes: int = None, ttl: float = None):
+        self.cache = LRUCache(
+            max_entries=max_entries or settings.MATCH_CACHE_MAX_ENTRIES,
+            max_bytes=max_bytes or settings.MATCH_CACHE_MAX_BYTES,
+            ttl=ttl if ttl is not None else settings.MATCH_CACHE_TTL_SECONDS
+        )
+        # Key of the results last written to the matches collection, per job
+        self.persisted: Dict[str, Hashable] = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(matcher_name: str,
+            job_id: str,
+            versions: Dict[str, int],
+            resume_ids: Optional[List[str]],
+            vector_field: str,
+            weights: Tuple,
+            model_version: str = "") -> Tuple:
+        """Cache key of a ranking; versions is data_versions.match_versions() of the job"""
+        # Digest explicit resume lists so keys stay small; None means the whole corpus
+        resume_set = stable_key(*sorted(set(resume_ids))) if resume_ids else None
+        return (
+            matcher_name,
+            job_id,
+            versions["job"],
+            versions["resumes"],
+            resume_set,
+            vector_field,
+            weights,
+            model_version
+        )
+
+    @staticmethod
+    def etag(key: Tuple) -> str:
+        """ETag of the results stored under key"""
+        return make_etag(*key)
+
+    def get(self, key: Tuple) -> Optional[List[Dict[str, Any]]]:
+        return self.cache.get(key)
+
+    def put(self, key: Tuple, results: List[Dict[str, Any]]) -> None:
+        self.cache.put(key, results)
+
+    def needs_persist(self, key: Tuple) -> bool:
+        """Whether the matches collection holds other results for this job than the ones under key"""
+        with self.lock:
+            return self.persisted.get(key[1]) != key
+
+    def mark_persisted(self, key: Tuple) -> None:
+        with self.lock:
+            self.persisted[key[1]] = key
+
+    def forget_persisted(self, job_id: str) -> None:
+        """Record that the matches collection was written for a job outside this cache"""
+        with self.lock:
+            self.persisted.pop(job_id, None)
+
+    def invalidate_job(self, job_id: str) -> int:
+        """Drop all cached results of a job"""
+        self.forget_persisted(job_id)
+        return self.cache.invalidate(lambda key: key[1] == job_id)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.persisted.clear()
+        self.cache.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return self.cache.get_stats()
+
+# Global match result cache instance
+match_result_cache = MatchResultCache()
+performance_monitor.register_cache("match_results", match_result_cache.get_stats)
+memory_accountant.register("match_results", match_result_cache.cache.memory_usage)
@@ -50,13 +50,17 @@ class ResumeMatcher:
             }
         }
     
-    def rank_resumes(self, job: Dict[str, Any], resumes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def rank_resumes(self,
+                     job: Dict[str, Any],
+                     resumes: List[Dict[str, Any]],
+                     vector_field: str = "vector") -> List[Dict[str, Any]]:
         """
         Rank resumes based on match score for a given job
         
         Args:
             job: Job posting data with vector and skills
             resumes: List of resume data with vector and skills
+            vector_field: Document field to compare, "vector" (TF-IDF) or "embedding"
             
         Returns:
             List of match results with scores and ranking
@@ -65,8 +69,8 @@ class ResumeMatcher:
         
         for idx, resume in enumerate(resumes):
             match_data = self.calculate_match_score(
-                resume.get("vector", []),
-                job.get("vector", []),
+                resume.get(vector_field, []),
+                job.get(vector_field, []),
                 resume.get("skills", []),
                 job.get("skills_required", [])
             )
@@ -0,0 +1,261 @@
+import itertools
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+import psutil
+
+from app.core.config import settings
+from app.core.memory import deep_sizeof
+
+class RingBuffer:
+    """Fixed-size buffer of the most recent items, preallocated as a list
+
+    Writers claim a slot from an itertools.count, whose next() is atomic under
+    the GIL, and store an (index, item) tuple with a single assignment, so
+    appends never lock and readers never see a half-written slot.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, capacity)
+        self._slots: List[Optional[tuple]] = [None] * self.capacity
+        self._counter = itertools.count()
+
+    def append(self, item: Any) -> None:
+        index = next(self._counter)
+        self._slots[index % self.capacity] = (index, item)
+
+    def items(self, limit: int = None) -> List[Any]:
+        """Buffered items, oldest first, optionally only the newest limit"""
+        slots = sorted(slot for slot in list(self._slots) if slot is not None)
+        if limit is not None:
+            slots = slots[-limit:] if limit > 0 else []
+        return [item for _, item in slots]
+
+    def __len__(self) -> int:
+        return sum(1 for slot in self._slots if slot is not None)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate bytes of the slot list and the buffered items"""
+        return deep_sizeof(self._slots)
+
+class LatencyHistogram:
+    """Streaming log-linear histogram of non-negative integers, in the style of HdrHistogram
+
+    Values below 2**sub_bucket_bits are counted exactly; larger ones fall into
+    one of 2**sub_bucket_bits linear sub-buckets of their power of two, so
+    quantiles are within 1/2**sub_bucket_bits relative error (about 3% by
+    default) with constant memory and O(1) recording. Not thread-safe on its own.
+    """
+
+    def __init__(self, sub_bucket_bits: int = 5):
+        self.sub_bucket_bits = sub_bucket_bits
+        self.counts = [0] * (64 << sub_bucket_bits)
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max = 0
+
+    def _index(self, value: int) -> int:
+        shift = value.bit_length() - self.sub_bucket_bits - 1
+        if shift <= 0:
+            return value
+        return ((shift + 1) << self.sub_bucket_bits) + (value >> shift) - (1 << self.sub_bucket_bits)
+
+    def _value(self, index: int) -> float:
+        """Midpoint of the values counted in a bucket"""
+        shift = (index >> self.sub_bucket_bits) - 1
+        if shift <= 0:
+            return float(index)
+        lower = ((index & ((1 << self.sub_bucket_bits) - 1)) + (1 << self.sub_bucket_bits)) << shift
+        return lower + ((1 << shift) - 1) / 2
+
+    def record(self, value: int) -> None:
+        value = max(0, int(value))
+        self.counts[self._index(value)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Add the counts of a histogram with the same bucket layout"""
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        self.max = max(self.max, other.max)
+
+    @property
+    def nbytes(self) -> int:
+        return deep_sizeof(self.counts)
+
+    def copy(self) -> "LatencyHistogram":
+        histogram = LatencyHistogram(self.sub_bucket_bits)
+        histogram.merge(self)
+        return histogram
+
+    def quantiles(self, qs: Iterable[float]) -> List[float]:
+        """Values at the given quantiles (0-1), in one pass over the buckets"""
+        qs = list(qs)
+        if not self.count:
+            return [0.0] * len(qs)
+        ranks = sorted((max(1, min(self.count, int(q * self.count + 0.5))), i) for i, q in enumerate(qs))
+        results = [0.0] * len(qs)
+        seen, position = 0, 0
+        for index, count in enumerate(self.counts):
+            if not count:
+                continue
+            seen += count
+            while position < len(ranks) and ranks[position][0] <= seen:
+                # Clamp to the exact extremes, which are tracked separately
+                results[ranks[position][1]] = min(max(self._value(index), self.min), self.max)
+                position += 1
+            if position == len(ranks):
+                break
+        return results
+
+    def summary(self, scale: float = 1.0) -> Dict[str, float]:
+        """Mean, extremes and quantiles, each multiplied by scale"""
+        median, p95, p99 = self.quantiles((0.5, 0.95, 0.99))
+        return {
+            "mean": self.total / self.count * scale if self.count else 0.0,
+            "median": median * scale,
+            "min": (self.min or 0) * scale,
+            "max": self.max * scale,
+            "p95": p95 * scale,
+            "p99": p99 * scale
+        }
+
+class FunctionMetrics:
+    """Call counts, latency and CPU histograms and recent calls of one monitored function"""
+
+    def __init__(self, name: str, capacity: int = None):
+        self.name = name
+        self.recent = RingBuffer(capacity or settings.PERFORMANCE_RECENT_CALLS)
+        self.wall = LatencyHistogram()
+        self.cpu = LatencyHistogram()
+        self.failures = 0
+        self.memory_samples = 0
+        self.memory_total = 0
+        self.memory_max: Optional[int] = None
+        self.lock = threading.Lock()
+
+    def record(self, elapsed_ns: int, cpu_ns: int, memory_delta: Optional[int], success: bool) -> None:
+        self.recent.append((time.time(), elapsed_ns, cpu_ns, memory_delta, success))
+        with self.lock:
+            self.wall.record(elapsed_ns)
+            self.cpu.record(cpu_ns)
+            if not success:
+                self.failures += 1
+            if memory_delta is not None:
+                self.memory_samples += 1
+                self.memory_total += memory_delta
+                if self.memory_max is None or memory_delta > self.memory_max:
+                    self.memory_max = memory_delta
+
+    @property
+    def nbytes(self) -> int:
+        return self.recent.nbytes + self.wall.nbytes + self.cpu.nbytes
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Consistent copy of the aggregate counters and histograms"""
+        with self.lock:
+            return {
+                "wall": self.wall.copy(),
+                "cpu": self.cpu.copy(),
+                "failures": self.failures,
+                "memory_samples": self.memory_samples,
+                "memory_total": self.memory_total,
+                "memory_max": self.memory_max
+            }
+
+    def recent_calls(self, limit: int = None) -> List[Dict[str, Any]]:
+        """Recent calls as metric dicts, oldest first"""
+        calls = []
+        for timestamp, elapsed_ns, cpu_ns, memory_delta, success in self.recent.items(limit):
+            call = {
+                "function": self.name,
+                "execution_time": elapsed_ns / 1e9,
+                "cpu_time": cpu_ns / 1e9,
+                "timestamp": datetime.fromtimestamp(timestamp).isoformat(),
+                "success": success
+            }
+            if memory_delta is not None:
+                call["memory_used_mb"] = memory_delta / 1024 / 1024
+            calls.append(call)
+        return calls
+
+class SystemSampler:
+    """Samples system and process resource usage on a background thread
+
+    Readers get the latest sample instead of querying psutil on every call.
+    """
+
+    def __init__(self, interval: float = None, history: int = None):
+        self.interval = interval or settings.PERFORMANCE_SYSTEM_SAMPLE_SECONDS
+        self.history = RingBuffer(history or 720)
+        self.latest: Optional[Dict[str, Any]] = None
+        self._process = psutil.Process()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def sample(self) -> Dict[str, Any]:
+        """Take one sample now and keep it as the latest"""
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage('/')
+        with self._process.oneshot():
+            process_rss = self._process.memory_info().rss
+            process_cpu = self._process.cpu_percent()
+        sample = {
+            "timestamp": datetime.now().isoformat(),
+            "cpu_percent": psutil.cpu_percent(),
+            "memory_percent": memory.percent,
+            "memory_available_gb": round(memory.available / (1024**3), 2),
+            "memory_used_mb": round(memory.used / (1024**2), 2),
+            "disk_usage_percent": disk.percent,
+            "disk_free_gb": round(disk.free / (1024**3), 2),
+            "process_rss_mb": round(process_rss / (1024**2), 2),
+            "process_cpu_percent": process_cpu
+        }
+        self.latest = sample
+        self.history.append(sample)
+        return sample
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"Error sampling system stats: {e}")
+
+    def start(self) -> None:
+        """Start the sampling thread if it is not running"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                # The first cpu_percent calls only set the baseline
+                self.sample()
+                self._thread = threading.Thread(target=self._run, name="system-sampler", daemon=True)
+                self._thread.start()
+
+    def stop(self) -> None:
+        with self._lock:
+            self._stop.set()
+            if self._thread is not None:
+                self._thread.join(timeout=self.interval + 1)
+                self._thread = None
+
+    def get_latest(self) -> Dict[str, Any]:
+        """Latest sample, starting the sampler on first use"""
+        if self._thread is None:
+            self.start()
+        return self.latest
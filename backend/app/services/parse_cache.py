@@ -0,0 +1,173 @@
+import copy
+import hashlib
+import threading
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from app.core.config import settings
+from app.core.memory import memory_accountant
+from app.services.cache import LRUCache
+from app.services.data_versions import SEQUENCE_FIELD
+
+# Bump when parsing or record building changes in a way that invalidates cached results
+PARSER_VERSION = "2"
+
+# Record fields that are specific to one upload and never cached
+PER_UPLOAD_FIELDS = ("_id", "id", "created_at", "updated_at", "content_hash", "duplicate_of", "extraction", SEQUENCE_FIELD)
+
+def content_hash(content: bytes) -> str:
+    """SHA-256 hex digest of uploaded file bytes"""
+    return hashlib.sha256(content).hexdigest()
+
+def build_model_version(vectorizer_fingerprint: str) -> str:
+    """Combine parser, spaCy model, vectorizer and embedding versions into one cache key part"""
+    version = f"parser-{PARSER_VERSION}:{settings.SPACY_MODEL}:tfidf-{vectorizer_fingerprint}"
+    if settings.EMBEDDING_STORE:
+        from app.services.embeddings import sentence_embedder
+        version += f":{sentence_embedder.model_version}"
+    return version
+
+class ParseCache:
+    """Parse results keyed by content hash and model version
+
+    Hot entries are kept in an in-process LRU in front of the parse_cache collection.
+    """
+
+    def __init__(self, max_memory_entries: int = None, collection_name: str = "parse_cache"):
+        self.max_memory_entries = max_memory_entries or settings.PARSE_CACHE_MAX_ENTRIES
+        self.collection_name = collection_name
+        self.memory = LRUCache(max_entries=self.max_memory_entries)
+        self.lock = threading.Lock()
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    def get(self, db, digest: str, model_version: str) -> Optional[Dict[str, Any]]:
+        """Get cached record fields for a content hash, or None on a miss"""
+        key = (digest, model_version)
+        fields = self.memory.get(key)
+        if fields is not None:
+            with self.lock:
+                self.memory_hits += 1
+            return fields
+
+        entry = db[self.collection_name].find_one(
+            {"content_hash": digest, "model_version": model_version}
+        )
+        if entry is None:
+            with self.lock:
+                self.misses += 1
+            return None
+
+        fields = entry["fields"]
+        self.memory.put(key, fields)
+        with self.lock:
+            self.db_hits += 1
+        return fields
+
+    def get_many(self, db, digests: List[str], model_version: str) -> Dict[str, Dict[str, Any]]:
+        """Look up several content hashes with at most one database query"""
+        found = {}
+        missing = []
+        for digest in set(digests):
+            fields = self.memory.get((digest, model_version))
+            if fields is not None:
+                found[digest] = fields
+            else:
+                missing.append(digest)
+        with self.lock:
+            self.memory_hits += len(found)
+
+        db_found = 0
+        if missing:
+            entries = db[self.collection_name].find(
+                {"content_hash": {"$in": missing}, "model_version": model_version}
+            )
+            for entry in entries:
+                found[entry["content_hash"]] = entry["fields"]
+                self.memory.put((entry["content_hash"], model_version), entry["fields"])
+                db_found += 1
+
+        with self.lock:
+            self.db_hits += db_found
+            self.misses += len(missing) - db_found
+        return found
+
+    def put(self, db, digest: str, model_version: str, record: Dict[str, Any]) -> None:
+        """Cache the reusable fields of a freshly parsed resume record"""
+        fields = cacheable_fields(record)
+        self.memory.put((digest, model_version), fields)
+        try:
+            db[self.collection_name].insert_one({
+                "content_hash": digest,
+                "model_version": model_version,
+                "fields": fields,
+                "created_at": datetime.now()
+            })
+        except DuplicateKeyError:
+            # Another worker parsed the same file concurrently
+            pass
+
+    def put_many(self, db, entries: List[tuple], model_version: str) -> None:
+        """Cache (content_hash, record) pairs with a single unordered insert"""
+        documents = []
+        for digest, record in entries:
+            fields = cacheable_fields(record)
+            self.memory.put((digest, model_version), fields)
+            documents.append({
+                "content_hash": digest,
+                "model_version": model_version,
+                "fields": fields,
+                "created_at": datetime.now()
+            })
+
+        if documents:
+            try:
+                db[self.collection_name].insert_many(documents, ordered=False)
+            except BulkWriteError:
+                # Duplicate keys from concurrent ingestion of the same files
+                pass
+
+    def find_originals(self, db, digests: List[str]) -> Dict[str, str]:
+        """Map content hashes to the id of the earliest stored resume with that content"""
+        originals = {}
+        cursor = db.resumes.find(
+            {"content_hash": {"$in": list(set(digests))}},
+            {"id": 1, "content_hash": 1}
+        ).sort("created_at", 1)
+        for resume in cursor:
+            originals.setdefault(resume["content_hash"], resume["id"])
+        return originals
+
+    def clear_memory(self) -> None:
+        """Drop the in-process tier"""
+        self.memory.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit and miss counts for both tiers"""
+        with self.lock:
+            hits = self.memory_hits + self.db_hits
+            total = hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "db_hits": self.db_hits,
+                "misses": self.misses,
+                "hit_rate": hits / total if total > 0 else 0,
+                "memory_entries": len(self.memory),
+                "memory_bytes": self.memory.bytes,
+                "max_memory_entries": self.max_memory_entries
+            }
+
+def cacheable_fields(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Strip per-upload fields from a resume record"""
+    return {key: value for key, value in record.items() if key not in PER_UPLOAD_FIELDS}
+
+def copy_cached_fields(fields: Dict[str, Any]) -> Dict[str, Any]:
+    """Deep copy cached fields so a new record never shares nested lists with the cache"""
+    return copy.deepcopy(fields)
+
+# Global parse cache instance
+parse_cache = ParseCache()
+memory_accountant.register("parse_cache", parse_cache.memory.memory_usage)
@@ -0,0 +1,239 @@
+import multiprocessing
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+try:
+    import resource
+except ImportError:  # Windows has no rlimits
+    resource = None
+
+from app.core.config import settings
+
+class ParserWorkerError(Exception):
+    """Raised when a document could not be parsed in an isolated worker"""
+
+class ParserTimeoutError(ParserWorkerError):
+    """Raised when a worker exceeds the per-document time limit and is killed"""
+
+class ParserCrashedError(ParserWorkerError):
+    """Raised when a worker process dies while parsing a document"""
+
+def apply_memory_limit(limit_mb: int) -> None:
+    """Cap the address space of the current process so runaway parsing raises MemoryError"""
+    if not limit_mb or resource is None or not hasattr(resource, "RLIMIT_AS"):
+        return
+    limit = limit_mb * 1024 * 1024
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+def _worker_main(conn, memory_limit_mb: int) -> None:
+    """Worker loop: receive (func, args, kwargs), send back (ok, result or exception)"""
+    apply_memory_limit(memory_limit_mb)
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            return
+        if task is None:
+            return
+
+        func, args, kwargs = task
+        try:
+            reply = (True, func(*args, **kwargs))
+        except Exception as e:
+            reply = (False, e)
+
+        try:
+            conn.send(reply)
+        except Exception as e:
+            # The result or exception could not be pickled
+            conn.send((False, ParserWorkerError(f"{type(e).__name__}: {str(e)}")))
+
+        if isinstance(reply[1], MemoryError):
+            # The heap may be fragmented past the limit; let the pool start a fresh worker
+            return
+
+class _Worker:
+    """One worker process and the parent end of its pipe"""
+
+    def __init__(self, context, memory_limit_mb: int):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, memory_limit_mb),
+            name="parser-worker",
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+
+    def stop(self, kill: bool = False) -> None:
+        try:
+            if kill:
+                self.process.kill()
+            else:
+                self.conn.send(None)
+            self.process.join(timeout=1)
+            if self.process.is_alive():
+                self.process.kill()
+                self.process.join(timeout=1)
+        except Exception:
+            pass
+        finally:
+            self.conn.close()
+
+class ParserWorkerPool:
+    """Runs document parsing in separate processes with time and memory limits
+
+    Each call gets a dedicated worker for its duration. Workers that time out,
+    crash or run out of memory are killed and replaced on the next call, and
+    healthy workers are recycled after max_tasks_per_worker documents.
+    """
+
+    def __init__(self,
+                 max_workers: int = None,
+                 timeout: float = None,
+                 memory_limit_mb: int = None,
+                 max_tasks_per_worker: int = None,
+                 start_method: str = None):
+        self.max_workers = max_workers or settings.PARSER_POOL_WORKERS or os.cpu_count() or 1
+        self.timeout = timeout if timeout is not None else settings.PARSER_POOL_TIMEOUT_SECONDS
+        self.memory_limit_mb = memory_limit_mb if memory_limit_mb is not None else settings.PARSER_POOL_MEMORY_LIMIT_MB
+        self.max_tasks_per_worker = (max_tasks_per_worker if max_tasks_per_worker is not None
+                                     else settings.PARSER_POOL_MAX_TASKS_PER_WORKER)
+        self.context = multiprocessing.get_context(start_method or settings.PARSER_POOL_START_METHOD)
+
+        self._idle: List[_Worker] = []
+        self._size = 0
+        self._condition = threading.Condition()
+        self._closed = False
+
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.crashes = 0
+        self.restarts = 0
+        self.recycled = 0
+        self.total_run_time = 0.0
+
+    def _acquire(self) -> _Worker:
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise ParserWorkerError("Parser worker pool is shut down")
+                if self._idle:
+                    return self._idle.pop()
+                if self._size < self.max_workers:
+                    self._size += 1
+                    break
+                self._condition.wait()
+
+        try:
+            return _Worker(self.context, self.memory_limit_mb)
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+
+    def _release(self, worker: _Worker, healthy: bool) -> None:
+        recycle = self.max_tasks_per_worker and worker.tasks >= self.max_tasks_per_worker
+        if healthy and not recycle and not self._closed:
+            with self._condition:
+                self._idle.append(worker)
+                self._condition.notify()
+            return
+
+        worker.stop(kill=not healthy)
+        with self._condition:
+            self._size -= 1
+            if healthy:
+                self.recycled += 1
+            else:
+                self.restarts += 1
+            self._condition.notify()
+
+    def run(self, func: Callable, *args, timeout: float = None, **kwargs) -> Any:
+        """Run func(*args, **kwargs) in a worker process and return its result
+
+        func must be a picklable module-level function. Exceptions raised by func
+        are re-raised here; timeouts and crashes raise ParserWorkerError subclasses.
+        """
+        timeout = timeout if timeout is not None else self.timeout
+        worker = self._acquire()
+        healthy = False
+        started = time.perf_counter()
+
+        try:
+            try:
+                worker.conn.send((func, args, kwargs))
+                if not worker.conn.poll(timeout or None):
+                    with self._condition:
+                        self.timeouts += 1
+                    raise ParserTimeoutError(f"Parsing did not finish within {timeout:g} seconds")
+                ok, value = worker.conn.recv()
+            except (EOFError, OSError):
+                worker.process.join(timeout=1)
+                with self._condition:
+                    self.crashes += 1
+                raise ParserCrashedError(
+                    f"Parser worker exited with code {worker.process.exitcode} while parsing"
+                )
+
+            worker.tasks += 1
+            healthy = not isinstance(value, MemoryError)
+            with self._condition:
+                if ok:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+            if ok:
+                return value
+            if isinstance(value, MemoryError):
+                raise ParserWorkerError(
+                    f"Parsing exceeded the {self.memory_limit_mb} MB worker memory limit"
+                )
+            raise value
+        finally:
+            with self._condition:
+                self.total_run_time += time.perf_counter() - started
+            self._release(worker, healthy)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get worker counts, failure counts and limits"""
+        with self._condition:
+            finished = self.completed + self.failed + self.timeouts + self.crashes
+            return {
+                "max_workers": self.max_workers,
+                "workers": self._size,
+                "idle_workers": len(self._idle),
+                "busy_workers": self._size - len(self._idle),
+                "completed": self.completed,
+                "failed": self.failed,
+                "timeouts": self.timeouts,
+                "crashes": self.crashes,
+                "restarts": self.restarts,
+                "recycled": self.recycled,
+                "avg_run_seconds": self.total_run_time / finished if finished else 0.0,
+                "timeout_seconds": self.timeout,
+                "memory_limit_mb": self.memory_limit_mb,
+                "max_tasks_per_worker": self.max_tasks_per_worker
+            }
+
+    def shutdown(self) -> None:
+        """Stop idle workers; busy workers are stopped when their call returns"""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._condition.notify_all()
+        for worker in idle:
+            worker.stop()
+
+# Global parser worker pool instance
+parser_pool = ParserWorkerPool()
@@ -0,0 +1,279 @@
+import json
+import os
+import re
+import threading
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+try:
+    import re._parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+from app.core.config import settings
+
+# Default pattern sets of advanced entity recognition, matched case-insensitively
+DEFAULT_ENTITY_PATTERNS = {
+    'skills': [
+        r'\b(?:Python|JavaScript|Java|C\+\+|C#|Go|Rust|Swift|Kotlin|TypeScript|PHP|Ruby|Scala|R|MATLAB)\b',
+        r'\b(?:React|Angular|Vue\.js|Node\.js|Express\.js|Django|Flask|Spring Boot|ASP\.NET|Laravel)\b',
+        r'\b(?:SQL|MySQL|PostgreSQL|MongoDB|Redis|Oracle|SQLite|Cassandra|DynamoDB)\b',
+        r'\b(?:AWS|Azure|GCP|Docker|Kubernetes|Terraform|Jenkins|GitLab CI|GitHub Actions)\b',
+        r'\b(?:Machine Learning|Deep Learning|Neural Networks|TensorFlow|PyTorch|Scikit-learn|NLP)\b'
+    ],
+    'education': [
+        r'\b(?:Bachelor|Master|PhD|Associate|Diploma|Certificate)\b',
+        r'\b(?:Computer Science|Information Technology|Data Science|Software Engineering)\b',
+        r'\b(?:University|College|Institute|School)\b'
+    ],
+    'experience': [
+        r'\b(?:years?|months?|experience|senior|junior|lead|manager|director)\b',
+        r'\b(?:Software Engineer|Developer|Data Scientist|Product Manager|DevOps Engineer)\b'
+    ],
+    'companies': [
+        r'\b(?:Google|Microsoft|Amazon|Facebook|Apple|IBM|Oracle|Twitter|LinkedIn|Uber|Airbnb|Netflix)\b'
+    ],
+    'emails': [
+        r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+    ],
+    'phones': [
+        r'\b(\+\d{1,2}\s)?\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4}\b'
+    ]
+}
+
+_CATEGORY_CLASSES = {
+    sre_parse.CATEGORY_WORD: r"\w",
+    sre_parse.CATEGORY_DIGIT: r"\d",
+    sre_parse.CATEGORY_SPACE: r"\s"
+}
+_ZERO_WIDTH = (sre_parse.AT, sre_parse.ASSERT, sre_parse.ASSERT_NOT)
+_REPEATS = (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT, getattr(sre_parse, "POSSESSIVE_REPEAT", None))
+_GROUP_REFERENCES = (sre_parse.GROUPREF, sre_parse.GROUPREF_EXISTS)
+
+def _first_chars(items) -> Optional[Tuple[Set[str], bool]]:
+    """Character class items a parsed sequence can start with, and whether it can match empty
+
+    Returns None when the first character cannot be bounded.
+    """
+    fragments = set()
+    for op, av in items:
+        if op in _ZERO_WIDTH:
+            continue
+        if op is sre_parse.LITERAL:
+            fragments.add(re.escape(chr(av)))
+            return fragments, False
+        if op is sre_parse.IN:
+            for item_op, item_av in av:
+                if item_op is sre_parse.LITERAL:
+                    fragments.add(re.escape(chr(item_av)))
+                elif item_op is sre_parse.RANGE:
+                    fragments.add(f"{re.escape(chr(item_av[0]))}-{re.escape(chr(item_av[1]))}")
+                elif item_op is sre_parse.CATEGORY and item_av in _CATEGORY_CLASSES:
+                    fragments.add(_CATEGORY_CLASSES[item_av])
+                else:
+                    return None
+            return fragments, False
+
+        if op is sre_parse.SUBPATTERN:
+            branches, minimum = [av[-1]], 1
+        elif op is getattr(sre_parse, "ATOMIC_GROUP", None):
+            branches, minimum = [av], 1
+        elif op is sre_parse.BRANCH:
+            branches, minimum = av[1], 1
+        elif op in _REPEATS:
+            branches, minimum = [av[2]], av[0]
+        else:
+            return None
+
+        nullable = minimum == 0
+        for branch in branches:
+            first = _first_chars(branch)
+            if first is None:
+                return None
+            fragments |= first[0]
+            nullable = nullable or first[1]
+        if not nullable:
+            return fragments, False
+    return fragments, True
+
+def first_char_guard(patterns: List[str]) -> str:
+    """A lookahead for the characters any of the patterns can start with, or "" if unbounded
+
+    Prefixing the combined alternation with it lets the regex engine skip
+    positions where no pattern can start without trying every alternative.
+    """
+    fragments = set()
+    try:
+        for pattern in patterns:
+            first = _first_chars(sre_parse.parse(pattern))
+            if first is None or first[1]:
+                return ""
+            fragments |= first[0]
+    except Exception:
+        return ""
+    return f"(?=[{''.join(sorted(fragments))}])" if fragments else ""
+
+def _parse_state(pattern: str):
+    """Parsed pattern and its parser state (group names, global flags)"""
+    parsed = sre_parse.parse(pattern, re.IGNORECASE)
+    return parsed, getattr(parsed, "state", None) or parsed.pattern  # "pattern" before Python 3.11
+
+_BASE_FLAGS = _parse_state("")[1].flags
+
+def _parsed_ops(value) -> Iterator[int]:
+    """Every opcode of a parsed pattern, including those of nested groups"""
+    if isinstance(value, sre_parse.SubPattern):
+        for op, av in value:
+            yield op
+            yield from _parsed_ops(av)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _parsed_ops(item)
+
+def combinable(pattern: str) -> bool:
+    """Whether a pattern can be one alternative of a combined scan
+
+    Backreferences and named groups depend on the pattern's own group numbers
+    and names, and global inline flags such as (?x) are only valid at the
+    start of a whole expression, so such patterns must be scanned on their own.
+    """
+    parsed, state = _parse_state(pattern)
+    if state.groupdict or state.flags != _BASE_FLAGS:
+        return False
+    return not any(op in _GROUP_REFERENCES for op in _parsed_ops(parsed))
+
+class _CompiledPatterns:
+    """One immutable compiled pattern set; replaced as a whole on reload"""
+
+    def __init__(self, patterns: Dict[str, List[str]], version: int):
+        self.patterns = {entity_type: list(items) for entity_type, items in patterns.items()}
+        self.version = version
+        self.singles: List[Tuple[str, re.Pattern]] = []
+        self.combined: List[int] = []
+        self.separate: List[int] = []
+
+        for entity_type, items in self.patterns.items():
+            for pattern in items:
+                # Compiling each pattern alone validates it before anything else is done with it
+                compiled = re.compile(pattern, re.IGNORECASE)
+                (self.combined if combinable(pattern) else self.separate).append(len(self.singles))
+                self.singles.append((entity_type, compiled))
+
+        self.candidates = None
+        self.first_chars: List[Optional[re.Pattern]] = []
+        if self.combined:
+            sources = [self.singles[index][1].pattern for index in self.combined]
+            guard = first_char_guard(sources)
+            alternatives = "|".join(f"(?:{source})" for source in sources)
+            self.candidates = re.compile(f"{guard}(?:{alternatives})", re.IGNORECASE)
+            self.first_chars = [
+                re.compile(first_char_guard([source]), re.IGNORECASE) if first_char_guard([source]) else None
+                for source in sources
+            ]
+        self._by_first_char: Dict[str, List[int]] = {}
+
+    def patterns_starting_with(self, char: str) -> List[int]:
+        """Indexes of the combined patterns whose match can start with char"""
+        indexes = self._by_first_char.get(char)
+        if indexes is None:
+            indexes = [
+                index for index, first in zip(self.combined, self.first_chars)
+                if first is None or first.match(char)
+            ]
+            self._by_first_char[char] = indexes
+        return indexes
+
+class EntityPatternMatcher:
+    """Regex entity patterns matched with one combined scan
+
+    The combined scan only finds the positions where some pattern matches;
+    at each of them every pattern is tried anchored, resuming after its own
+    previous match. Every match is tagged with the entity type of the pattern
+    that produced it, and results equal running each pattern separately with
+    finditer, including matches of different patterns that overlap or nest
+    (e.g. "Manager" in "Product Manager"). Patterns that cannot share the
+    combined scan (see combinable) are scanned on their own.
+    Pattern sets can be replaced at runtime without blocking readers.
+    """
+
+    def __init__(self, patterns: Dict[str, List[str]] = None, patterns_path: str = None):
+        self.patterns_path = patterns_path if patterns_path is not None else settings.ENTITY_PATTERNS_PATH
+        self._lock = threading.Lock()
+        self._compiled: Optional[_CompiledPatterns] = None
+        self.load(patterns if patterns is not None else self._read_patterns())
+
+    def _read_patterns(self) -> Dict[str, List[str]]:
+        """Patterns from patterns_path if it exists, otherwise the defaults"""
+        if self.patterns_path and os.path.exists(self.patterns_path):
+            with open(self.patterns_path, "r") as f:
+                return json.load(f)
+        return DEFAULT_ENTITY_PATTERNS
+
+    @property
+    def patterns(self) -> Dict[str, List[str]]:
+        return self._compiled.patterns
+
+    @property
+    def version(self) -> int:
+        return self._compiled.version
+
+    def load(self, patterns: Dict[str, List[str]]) -> None:
+        """Compile and swap in a new pattern set; raises re.error for an invalid pattern"""
+        with self._lock:
+            version = self._compiled.version + 1 if self._compiled is not None else 1
+            self._compiled = _CompiledPatterns(patterns, version)
+
+    def reload(self) -> None:
+        """Reload the pattern set from patterns_path, or the defaults"""
+        self.load(self._read_patterns())
+
+    def match(self, text: str) -> Dict[str, List[str]]:
+        """
+        Find entities of every type in text
+
+        Returns:
+            Unique matched strings per entity type, in order of first occurrence
+        """
+        compiled = self._compiled
+        found = {entity_type: {} for entity_type in compiled.patterns}
+        if not compiled.singles or not text:
+            return {entity_type: [] for entity_type in found}
+
+        singles = compiled.singles
+        hits = []  # (start, pattern index, matched text)
+        if compiled.candidates is not None:
+            # Like finditer, a pattern resumes after the end of its own previous match
+            resume_at = [0] * len(singles)
+            search = compiled.candidates.search
+            candidate = search(text)
+            while candidate is not None:
+                start = candidate.start()
+                for index in compiled.patterns_starting_with(text[start:start + 1]):
+                    if resume_at[index] > start:
+                        continue
+                    match = singles[index][1].match(text, start)
+                    if match is not None:
+                        hits.append((start, index, match.group(0)))
+                        resume_at[index] = max(match.end(), start + 1)
+                # search clamps positions past the end, which would find an empty match there again
+                candidate = search(text, start + 1) if start < len(text) else None
+
+        if compiled.separate:
+            for index in compiled.separate:
+                hits.extend((match.start(), index, match.group(0)) for match in singles[index][1].finditer(text))
+            hits.sort(key=lambda hit: hit[:2])
+
+        for _, index, matched in hits:
+            found[singles[index][0]][matched] = None
+
+        return {entity_type: list(matches) for entity_type, matches in found.items()}
+
+    def get_status(self) -> Dict[str, object]:
+        """Get the active pattern set and its version"""
+        compiled = self._compiled
+        return {
+            "version": compiled.version,
+            "patterns_path": self.patterns_path,
+            "entity_types": list(compiled.patterns),
+            "pattern_count": len(compiled.singles),
+            "separately_scanned_patterns": len(compiled.separate)
+        }
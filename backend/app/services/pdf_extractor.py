@@ -0,0 +1,84 @@
+import io
+import time
+from typing import Dict, Any, Iterator, Tuple
+
+from PyPDF2 import PdfReader
+
+from app.core.config import settings
+from app.services.document_extractor import DocumentLimitExceededError
+
+class PdfLimitExceededError(DocumentLimitExceededError):
+    """Raised when a PDF is rejected before extraction because it is too large"""
+
+def iter_pdf_pages(content: bytes, max_pages: int = None) -> Iterator[Tuple[int, str, float]]:
+    """Yield (page_number, text, seconds) for each page, extracting pages lazily"""
+    return _iter_reader_pages(PdfReader(io.BytesIO(content)), max_pages)
+
+def _iter_reader_pages(reader: PdfReader, max_pages: int = None) -> Iterator[Tuple[int, str, float]]:
+    for index, page in enumerate(reader.pages):
+        if max_pages and index >= max_pages:
+            return
+        started = time.perf_counter()
+        text = page.extract_text() or ""
+        yield index + 1, text, time.perf_counter() - started
+
+def extract_pdf_text(content: bytes,
+                     max_pages: int = None,
+                     max_bytes: int = None,
+                     max_chars: int = None,
+                     time_budget: float = None) -> Dict[str, Any]:
+    """
+    Extract PDF text page by page within page, byte, text and time budgets
+
+    Extraction stops early once max_chars of text have been gathered, since
+    matching never needs more. The time budget is checked between pages.
+
+    Returns:
+        Dictionary with the joined text and extraction statistics
+    """
+    max_pages = max_pages if max_pages is not None else settings.PDF_MAX_PAGES
+    max_bytes = max_bytes if max_bytes is not None else settings.PDF_MAX_BYTES
+    max_chars = max_chars if max_chars is not None else settings.PDF_MAX_TEXT_CHARS
+    time_budget = time_budget if time_budget is not None else settings.PDF_TIME_BUDGET_SECONDS
+
+    if max_bytes and len(content) > max_bytes:
+        raise PdfLimitExceededError(
+            f"PDF is {len(content)} bytes, which exceeds the {max_bytes} byte limit"
+        )
+
+    started = time.perf_counter()
+    reader = PdfReader(io.BytesIO(content))
+    total_pages = len(reader.pages)
+    parts = []
+    page_timings = []
+    total_chars = 0
+    stop_reason = None
+
+    for page_number, text, seconds in _iter_reader_pages(reader, max_pages):
+        parts.append(text)
+        total_chars += len(text)
+        page_timings.append({"page": page_number, "chars": len(text), "seconds": seconds})
+
+        if page_number >= total_pages:
+            break
+        if max_chars and total_chars >= max_chars:
+            stop_reason = "max_chars"
+            break
+        if time_budget and time.perf_counter() - started >= time_budget:
+            stop_reason = "time_budget"
+            break
+    else:
+        if len(page_timings) < total_pages:
+            stop_reason = "max_pages"
+
+    return {
+        # Pages are joined with newlines so a heading at the top of a page stays on its own line
+        "text": "\n".join(parts),
+        "pages_total": total_pages,
+        "pages_extracted": len(page_timings),
+        "chars": total_chars,
+        "truncated": stop_reason is not None,
+        "stop_reason": stop_reason,
+        "seconds": time.perf_counter() - started,
+        "page_timings": page_timings
+    }
@@ -1,171 +1,301 @@
 import time
 import psutil
 import threading
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, Hashable, List, Any, Optional
 from functools import wraps
 import json
 import os
 from datetime import datetime
 import asyncio
+import inspect
+import types
 import aiohttp
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from app.core.config import settings
+from app.core.memory import memory_accountant
+from app.core.prometheus import Family, registry
+from app.services.cache import LRUCache
+from app.services.metrics import FunctionMetrics, LatencyHistogram, SystemSampler
+
+@types.coroutine
+def _cpu_timed(coro, cpu_ns: List[int]):
+    """Drive coro like await would, adding the thread CPU time of each of its steps to cpu_ns[0]
+    
+    Time spent suspended, in other tasks or in executor threads, is not counted.
+    """
+    value, error = None, None
+    while True:
+        start = time.thread_time_ns()
+        try:
+            if error is None:
+                yielded = coro.send(value)
+            else:
+                yielded = coro.throw(error)
+        except StopIteration as stop:
+            return stop.value
+        finally:
+            cpu_ns[0] += time.thread_time_ns() - start
+        
+        try:
+            value, error = (yield yielded), None
+        except GeneratorExit:
+            coro.close()
+            raise
+        except BaseException as e:
+            value, error = None, e
+
 class PerformanceMonitor:
     def __init__(self, cache_enabled: bool = True, max_cache_size: int = 1000):
         self.cache_enabled = cache_enabled
         self.max_cache_size = max_cache_size
-        self.cache = {}
-        self.cache_hits = 0
-        self.cache_misses = 0
-        self.performance_metrics = []
+        self.cache = LRUCache(max_entries=max_cache_size)
         self.lock = threading.Lock()
+        self._process = psutil.Process()
+        # Per-function ring buffers and histograms; system stats come from a background sampler
+        self.functions: Dict[str, FunctionMetrics] = {}
+        self.system_sampler = SystemSampler()
+        self.start_time = time.time()
+        # Stats callbacks of service caches, reported alongside the decorator cache
+        self.registered_caches: Dict[str, Callable[[], Dict[str, Any]]] = {}
+    
+    @property
+    def performance_metrics(self) -> List[Dict[str, Any]]:
+        """Recent calls of all monitored functions, oldest first"""
+        calls = [call for stats in list(self.functions.values()) for call in stats.recent_calls()]
+        calls.sort(key=lambda call: call["timestamp"])
+        return calls[-settings.PERFORMANCE_RECENT_CALLS:]
+    
+    def function_metrics(self, name: str) -> FunctionMetrics:
+        """Metrics of a monitored function, created on first use"""
+        stats = self.functions.get(name)
+        if stats is None:
+            with self.lock:
+                stats = self.functions.setdefault(name, FunctionMetrics(name))
+        return stats
+    
+    def register_cache(self, name: str, get_stats: Callable[[], Dict[str, Any]]) -> None:
+        """Report a service cache's hit rate and size in the performance summary"""
+        self.registered_caches[name] = get_stats
     
-    def monitor_performance(self, func_name: str = None):
-        """Decorator to monitor function performance"""
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get stats of the result cache and all registered service caches"""
+        stats = {
+            "result_cache": self.cache.get_stats()
+        }
+        for name, get_stats in list(self.registered_caches.items()):
+            try:
+                stats[name] = get_stats()
+            except Exception as e:
+                stats[name] = {"error": str(e)}
+        return stats
+    
+    def memory_usage(self) -> Dict[str, Any]:
+        """Bytes of the per-function ring buffers and histograms and the system sample history"""
+        functions = {name: stats.nbytes for name, stats in list(self.functions.items())}
+        history = self.system_sampler.history.nbytes
+        return {
+            "bytes": sum(functions.values()) + history,
+            "functions": functions,
+            "system_history_bytes": history
+        }
+    
+    def monitor_performance(self, func_name: str = None, track_memory: bool = None):
+        """Decorator to monitor function performance
+        
+        Coroutine functions are awaited inside the timed region, so async
+        endpoints record their full latency rather than coroutine creation.
+        CPU time is that of the calling thread; for coroutines only the steps
+        the coroutine itself runs on the event loop are counted.
+        """
+        if track_memory is None:
+            track_memory = settings.PERFORMANCE_TRACK_MEMORY
+        
         def decorator(func):
+            stats = self.function_metrics(func_name or func.__name__)
+            memory = self._process.memory_info if track_memory else None
+            
+            if inspect.iscoroutinefunction(func):
+                @wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    start_memory = memory().rss if memory else None
+                    cpu_ns = [0]
+                    start_ns = time.perf_counter_ns()
+                    success = False
+                    try:
+                        result = await _cpu_timed(func(*args, **kwargs), cpu_ns)
+                        success = True
+                        return result
+                    finally:
+                        self._record(stats, time.perf_counter_ns() - start_ns, cpu_ns[0], start_memory, success)
+                return async_wrapper
+            
             @wraps(func)
             def wrapper(*args, **kwargs):
-                start_time = time.time()
-                start_memory = psutil.Process().memory_info().rss / 1024 / 1024  # MB
-                
+                start_memory = memory().rss if memory else None
+                start_cpu_ns = time.thread_time_ns()
+                start_ns = time.perf_counter_ns()
+                success = False
                 try:
                     result = func(*args, **kwargs)
                     success = True
-                except Exception as e:
-                    success = False
-                    raise e
+                    return result
                 finally:
-                    end_time = time.time()
-                    end_memory = psutil.Process().memory_info().rss / 1024 / 1024  # MB
-                    
-                    execution_time = end_time - start_time
-                    memory_used = end_memory - start_memory
-                    
-                    metric = {
-                        "function": func_name or func.__name__,
-                        "execution_time": execution_time,
-                        "memory_used_mb": memory_used,
-                        "timestamp": datetime.now().isoformat(),
-                        "success": success,
-                        "cpu_percent": psutil.cpu_percent(),
-                        "memory_percent": psutil.virtual_memory().percent
-                    }
-                    
-                    with self.lock:
-                        self.performance_metrics.append(metric)
-                    
-                    # Keep only last 1000 metrics
-                    if len(self.performance_metrics) > 1000:
-                        self.performance_metrics = self.performance_metrics[-1000:]
-                
-                return result
+                    elapsed_ns = time.perf_counter_ns() - start_ns
+                    self._record(stats, elapsed_ns, time.thread_time_ns() - start_cpu_ns, start_memory, success)
             return wrapper
         return decorator
     
-    def cache_result(self, key: str, ttl: int = 3600):
-        """Decorator to cache function results"""
+    def _record(self, stats: FunctionMetrics, elapsed_ns: int, cpu_ns: int, start_memory: Optional[int], success: bool) -> None:
+        memory_delta = self._process.memory_info().rss - start_memory if start_memory is not None else None
+        stats.record(elapsed_ns, cpu_ns, memory_delta, success)
+    
+    def cache_result(self, key: str, ttl: int = 3600, key_func: Callable[..., Hashable] = None):
+        """Decorator to cache function results
+        
+        Results are keyed by the call arguments themselves, which must be
+        hashable, or by key_func(*args, **kwargs); calls with unhashable
+        arguments are not cached.
+        """
         def decorator(func):
             @wraps(func)
             def wrapper(*args, **kwargs):
                 if not self.cache_enabled:
                     return func(*args, **kwargs)
                 
-                # Create cache key
-                cache_key = f"{key}:{hash(str(args) + str(sorted(kwargs.items())))}"
-                
-                # Check cache
-                if cache_key in self.cache:
-                    cache_entry = self.cache[cache_key]
-                    if time.time() - cache_entry["timestamp"] < ttl:
-                        self.cache_hits += 1
-                        return cache_entry["result"]
-                
-                # Cache miss
-                self.cache_misses += 1
-                result = func(*args, **kwargs)
-                
-                # Store in cache
-                with self.lock:
-                    if len(self.cache) >= self.max_cache_size:
-                        # Remove oldest entry
-                        oldest_key = min(self.cache.keys(), 
-                                       key=lambda k: self.cache[k]["timestamp"])
-                        del self.cache[oldest_key]
-                    
-                    self.cache[cache_key] = {
-                        "result": result,
-                        "timestamp": time.time()
-                    }
+                try:
+                    call_key = key_func(*args, **kwargs) if key_func else (args, frozenset(kwargs.items()))
+                    cache_key = (key, call_key)
+                    hash(cache_key)
+                except TypeError:
+                    return func(*args, **kwargs)
                 
-                return result
+                return self.cache.get_or_compute(cache_key, lambda: func(*args, **kwargs), ttl)
             return wrapper
         return decorator
     
     def get_performance_summary(self) -> Dict[str, Any]:
         """Get performance summary statistics"""
-        if not self.performance_metrics:
+        snapshots = [stats.snapshot() for stats in list(self.functions.values())]
+        wall, cpu = LatencyHistogram(), LatencyHistogram()
+        for snapshot in snapshots:
+            wall.merge(snapshot["wall"])
+            cpu.merge(snapshot["cpu"])
+        if not wall.count:
             return {"message": "No performance data available"}
         
-        execution_times = [m["execution_time"] for m in self.performance_metrics]
-        memory_usage = [m["memory_used_mb"] for m in self.performance_metrics]
+        failures = sum(snapshot["failures"] for snapshot in snapshots)
+        memory_samples = sum(snapshot["memory_samples"] for snapshot in snapshots)
+        memory_total = sum(snapshot["memory_total"] for snapshot in snapshots)
+        memory_max = max((snapshot["memory_max"] for snapshot in snapshots if snapshot["memory_max"] is not None), default=0)
+        system = self.system_sampler.get_latest()
         
         return {
-            "total_calls": len(self.performance_metrics),
-            "success_rate": sum(1 for m in self.performance_metrics if m["success"]) / len(self.performance_metrics),
-            "execution_time": {
-                "mean": sum(execution_times) / len(execution_times),
-                "median": sorted(execution_times)[len(execution_times) // 2],
-                "min": min(execution_times),
-                "max": max(execution_times),
-                "p95": sorted(execution_times)[int(len(execution_times) * 0.95)]
+            "total_calls": wall.count,
+            "success_rate": 1 - failures / wall.count,
+            "execution_time": wall.summary(1e-9),
+            "cpu_time": {
+                "mean": cpu.total / cpu.count * 1e-9,
+                "max": cpu.max * 1e-9,
+                "total": cpu.total * 1e-9
             },
             "memory_usage": {
-                "mean_mb": sum(memory_usage) / len(memory_usage),
-                "max_mb": max(memory_usage),
-                "total_mb": sum(memory_usage)
+                "mean_mb": memory_total / memory_samples / 1024 / 1024 if memory_samples else 0.0,
+                "max_mb": memory_max / 1024 / 1024,
+                "total_mb": memory_total / 1024 / 1024
             },
-            "cache_stats": {
-                "hits": self.cache_hits,
-                "misses": self.cache_misses,
-                "hit_rate": self.cache_hits / (self.cache_hits + self.cache_misses) if (self.cache_hits + self.cache_misses) > 0 else 0,
-                "cache_size": len(self.cache)
+            "cache_stats": self.cache.get_stats(),
+            "service_caches": {
+                name: stats for name, stats in self.get_cache_stats().items() if name != "result_cache"
             },
             "system_stats": {
-                "cpu_percent": psutil.cpu_percent(),
-                "memory_percent": psutil.virtual_memory().percent,
-                "disk_usage_percent": psutil.disk_usage('/').percent
+                "cpu_percent": system["cpu_percent"],
+                "memory_percent": system["memory_percent"],
+                "disk_usage_percent": system["disk_usage_percent"],
+                "sampled_at": system["timestamp"]
             }
         }
     
     def get_function_performance(self, function_name: str) -> Dict[str, Any]:
         """Get performance metrics for a specific function"""
-        function_metrics = [m for m in self.performance_metrics if m["function"] == function_name]
-        
-        if not function_metrics:
+        stats = self.functions.get(function_name)
+        snapshot = stats.snapshot() if stats is not None else None
+        if snapshot is None or not snapshot["wall"].count:
             return {"message": f"No data for function {function_name}"}
         
-        execution_times = [m["execution_time"] for m in function_metrics]
-        
+        wall, cpu = snapshot["wall"], snapshot["cpu"]
         return {
             "function": function_name,
-            "total_calls": len(function_metrics),
-            "success_rate": sum(1 for m in function_metrics if m["success"]) / len(function_metrics),
-            "execution_time": {
-                "mean": sum(execution_times) / len(execution_times),
-                "median": sorted(execution_times)[len(execution_times) // 2],
-                "min": min(execution_times),
-                "max": max(execution_times),
-                "p95": sorted(execution_times)[int(len(execution_times) * 0.95)]
+            "total_calls": wall.count,
+            "success_rate": 1 - snapshot["failures"] / wall.count,
+            "execution_time": wall.summary(1e-9),
+            "cpu_time": {
+                "mean": cpu.total / cpu.count * 1e-9,
+                "max": cpu.max * 1e-9,
+                "total": cpu.total * 1e-9
             },
-            "recent_calls": function_metrics[-10:]  # Last 10 calls
+            "recent_calls": stats.recent_calls(10)  # Last 10 calls
         }
     
+    def function_summaries(self) -> Dict[str, Dict[str, Any]]:
+        """Call counts and latency of every monitored function"""
+        summaries = {}
+        for name, stats in list(self.functions.items()):
+            snapshot = stats.snapshot()
+            wall = snapshot["wall"]
+            if not wall.count:
+                continue
+            summaries[name] = {
+                "calls": wall.count,
+                "failures": snapshot["failures"],
+                "execution_time": wall.summary(1e-9),
+                "cpu_time_total": snapshot["cpu"].total * 1e-9
+            }
+        return summaries
+    
+    def collect_prometheus(self) -> List[Family]:
+        """Monitored function latency, cache hit ratios and sampled system usage as metric families"""
+        durations, cpu, failures = [], [], []
+        for name, summary in self.function_summaries().items():
+            labels = {"function": name}
+            execution_time = summary["execution_time"]
+            for quantile, key in ((0.5, "median"), (0.95, "p95"), (0.99, "p99")):
+                durations.append(("", {**labels, "quantile": str(quantile)}, execution_time[key]))
+            durations.append(("_sum", labels, execution_time["mean"] * summary["calls"]))
+            durations.append(("_count", labels, summary["calls"]))
+            cpu.append(("_total", labels, summary["cpu_time_total"]))
+            failures.append(("_total", labels, summary["failures"]))
+        
+        hit_ratios, hits, misses = [], [], []
+        for name, stats in self.get_cache_stats().items():
+            labels = {"cache": name}
+            if isinstance(stats.get("hit_rate"), (int, float)):
+                hit_ratios.append(("", labels, stats["hit_rate"]))
+            if isinstance(stats.get("hits"), int):
+                hits.append(("_total", labels, stats["hits"]))
+            if isinstance(stats.get("misses"), int):
+                misses.append(("_total", labels, stats["misses"]))
+        
+        system = self.system_sampler.get_latest()
+        return [
+            ("monitored_function_duration_seconds", "summary", "Latency of monitored functions", durations),
+            ("monitored_function_cpu_seconds", "counter", "CPU time of monitored functions", cpu),
+            ("monitored_function_failures", "counter", "Monitored function calls that raised", failures),
+            ("cache_hit_ratio", "gauge", "Cache hit ratio since start", hit_ratios),
+            ("cache_hits", "counter", "Cache hits", hits),
+            ("cache_misses", "counter", "Cache misses", misses),
+            ("system_cpu_percent", "gauge", "Sampled system CPU usage", [("", {}, system["cpu_percent"])]),
+            ("system_memory_percent", "gauge", "Sampled system memory usage", [("", {}, system["memory_percent"])]),
+            ("process_resident_memory_bytes", "gauge", "Sampled resident memory of this process",
+             [("", {}, system["process_rss_mb"] * 1024 * 1024)]),
+            ("process_uptime_seconds", "gauge", "Seconds since the monitor started",
+             [("", {}, time.time() - self.start_time)])
+        ]
+    
     def clear_cache(self):
         """Clear the cache"""
-        with self.lock:
-            self.cache.clear()
-            self.cache_hits = 0
-            self.cache_misses = 0
+        self.cache.clear()
+        self.cache.reset_stats()
     
     def export_metrics(self, filename: str = None):
         """Export performance metrics to JSON file"""
@@ -310,4 +440,7 @@ class LoadTester:
 
 # Global performance monitor instance
 performance_monitor = PerformanceMonitor()
+registry.register_collector("performance_monitor", performance_monitor.collect_prometheus)
+memory_accountant.register("performance_metrics", performance_monitor.memory_usage)
+memory_accountant.register("result_cache", performance_monitor.cache.memory_usage)
 load_tester = LoadTester() 
\ No newline at end of file
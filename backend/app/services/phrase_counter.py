@@ -0,0 +1,209 @@
+import heapq
+import math
+import threading
+from collections import Counter
+from itertools import chain
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.memory import deep_sizeof, memory_accountant
+from app.services.data_versions import data_versions, RESUME_CORPUS, JOB_CORPUS, SEQUENCE_FIELD
+from app.services.embeddings import job_text, resume_text
+
+# Collections feeding the phrase corpus: (collection, data version counter, text of a document, fields to load)
+CORPUS_SOURCES = (
+    ("resumes", RESUME_CORPUS, resume_text, ["raw_text", SEQUENCE_FIELD]),
+    ("jobs", JOB_CORPUS, job_text, ["title", "description", "requirements", "qualifications", SEQUENCE_FIELD])
+)
+
+def iter_ngrams(tokens: List[str], n: int) -> Iterator[Tuple[str, ...]]:
+    """Lazily yield the n-grams of tokens as tuples"""
+    return zip(*(tokens[i:] for i in range(n)))
+
+def count_ngrams(tokens: List[str], max_n: int = 3) -> List[Counter]:
+    """Count 1- to max_n-grams with one Counter per length and tuple keys"""
+    return [Counter(iter_ngrams(tokens, n)) for n in range(1, max_n + 1)]
+
+def top_ngrams(counters: List[Counter], k: int) -> List[Tuple[Tuple[str, ...], int]]:
+    """The k most frequent n-grams across all lengths
+
+    Equal counts keep counting order (shorter n-grams first, then first
+    occurrence), as heapq.nlargest matches a stable descending sort.
+    """
+    return heapq.nlargest(k, chain.from_iterable(counter.items() for counter in counters), key=lambda item: item[1])
+
+class PhraseCorpus:
+    """Document frequencies of n-grams across resumes and jobs, for TF-IDF phrase weighting
+
+    Tokens are integer-encoded and the table is pruned to the max_entries most
+    common n-grams, dropping tokens no kept n-gram uses, so memory stays bounded
+    however large the corpus grows.
+    The corpus follows the database through sync(), which refresh() runs in a
+    background thread so requests never tokenize stored documents themselves.
+    """
+
+    def __init__(self, max_n: int = 3, max_entries: int = None):
+        self.max_n = max_n
+        self.max_entries = max_entries or settings.PHRASE_CORPUS_MAX_NGRAMS
+        self.vocabulary: Dict[str, int] = {}
+        self.document_frequency: Counter = Counter()
+        self.documents = 0
+        self.pruned_below = 0
+        self.lock = threading.Lock()
+
+        self._sync_lock = threading.Lock()
+        self._synced_versions: Optional[Dict[str, Tuple[int, int]]] = None
+        self._synced_until: Dict[str, int] = {}
+        self._synced_counts: Dict[str, int] = {}
+        self._sync_thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+
+    def _encode(self, tokens: List[str], grow: bool) -> List[int]:
+        if grow:
+            return [self.vocabulary.setdefault(token, len(self.vocabulary)) for token in tokens]
+        return [self.vocabulary.get(token, -1) for token in tokens]
+
+    def add_document(self, tokens: List[str]) -> None:
+        """Count each distinct n-gram of a document once"""
+        with self.lock:
+            ids = self._encode(tokens, grow=True)
+            for n in range(1, self.max_n + 1):
+                self.document_frequency.update(set(iter_ngrams(ids, n)))
+            self.documents += 1
+            if len(self.document_frequency) > self.max_entries:
+                self._prune()
+
+    def _prune(self) -> None:
+        """Keep the most common n-grams, leaving room so pruning is not repeated on every document
+
+        The vocabulary is cut down to the tokens of kept n-grams and renumbered,
+        so it never outgrows the n-gram table.
+        """
+        keep = heapq.nlargest(int(self.max_entries * 0.8), self.document_frequency.items(), key=lambda item: item[1])
+        self.pruned_below = keep[-1][1] if keep else 0
+
+        used = sorted({token_id for gram, _ in keep for token_id in gram})
+        renumbered = {token_id: new_id for new_id, token_id in enumerate(used)}
+        tokens = {token_id: token for token, token_id in self.vocabulary.items() if token_id in renumbered}
+        self.vocabulary = {tokens[token_id]: new_id for token_id, new_id in renumbered.items()}
+        self.document_frequency = Counter({
+            tuple(renumbered[token_id] for token_id in gram): df for gram, df in keep
+        })
+
+    def idf(self, document_frequency: int) -> float:
+        """Smoothed inverse document frequency, as in scikit-learn's TfidfVectorizer"""
+        return math.log((1 + self.documents) / (1 + document_frequency)) + 1
+
+    def top_phrases(self, tokens: List[str], k: int) -> List[Tuple[Tuple[str, ...], int, float]]:
+        """The k n-grams of a document with the highest term frequency times corpus IDF
+
+        Returns:
+            (n-gram, frequency in the document, TF-IDF score) tuples, best first
+        """
+        with self.lock:
+            scored = []
+            for counter in count_ngrams(tokens, self.max_n):
+                for gram, frequency in counter.items():
+                    gram_ids = tuple(self._encode(list(gram), grow=False))
+                    df = 0 if -1 in gram_ids else self.document_frequency.get(gram_ids, 0)
+                    scored.append((gram, frequency, frequency * self.idf(df)))
+        return heapq.nlargest(k, scored, key=lambda item: item[2])
+
+    def sync(self, db, tokenize: Callable[[str], List[str]]) -> None:
+        """Bring the corpus up to date with the stored resumes and jobs
+
+        Does nothing unless their data versions changed. Documents inserted
+        since the last sync are then added in insert sequence order. Updates
+        and deletions change documents that were already counted, so the first
+        sync and any sync after them build a new corpus aside and swap it in;
+        readers never see a partial corpus.
+
+        A writer can store its document after one with a later sequence number
+        was read. Counting the stored documents up to the last sequence number
+        read detects such a miss, and the next refresh then rebuilds.
+        """
+        with self._sync_lock:
+            # Versions are read before documents, so later writes trigger another sync
+            versions = data_versions.corpus_versions(db)
+            if versions == self._synced_versions:
+                return
+            rebuild = self._synced_versions is None or any(
+                versions[counter][1:] != self._synced_versions[counter][1:] for _, counter, _, _ in CORPUS_SOURCES
+            )
+            target = PhraseCorpus(self.max_n, self.max_entries) if rebuild else self
+            synced_until = {} if rebuild else dict(self._synced_until)
+            synced_counts = {} if rebuild else dict(self._synced_counts)
+
+            complete = True
+            for name, _, get_text, fields in CORPUS_SOURCES:
+                # A rebuild also reads documents stored before sequence numbers existed
+                query = {} if rebuild else {SEQUENCE_FIELD: {"$gt": synced_until.get(name, 0)}}
+                for document in db[name].find(query, {field: 1 for field in fields}).sort(SEQUENCE_FIELD, 1):
+                    target.add_document(tokenize(get_text(document)))
+                    synced_counts[name] = synced_counts.get(name, 0) + 1
+                    synced_until[name] = max(synced_until.get(name, 0), document.get(SEQUENCE_FIELD) or 0)
+
+                stored = db[name].count_documents({SEQUENCE_FIELD: {"$not": {"$gt": synced_until.get(name, 0)}}})
+                complete = complete and stored == synced_counts.get(name, 0)
+
+            if rebuild:
+                with self.lock:
+                    self.vocabulary = target.vocabulary
+                    self.document_frequency = target.document_frequency
+                    self.documents = target.documents
+                    self.pruned_below = target.pruned_below
+            self._synced_until = synced_until
+            self._synced_counts = synced_counts
+            self._synced_versions = versions if complete else None
+
+    def _sync_in_background(self, db, tokenize: Callable[[str], List[str]]) -> None:
+        try:
+            self.sync(db, tokenize)
+        except Exception as e:
+            print(f"Error syncing phrase corpus: {str(e)}")
+
+    def refresh(self, db, tokenize: Callable[[str], List[str]]) -> bool:
+        """Start a background sync if stored documents changed since the last one
+
+        Costs one small query, so it can run on the request path.
+
+        Returns:
+            Whether a sync is running, i.e. the corpus is still catching up
+        """
+        with self._thread_lock:
+            if self._sync_thread is not None and self._sync_thread.is_alive():
+                return True
+            if data_versions.corpus_versions(db) == self._synced_versions:
+                return False
+            self._sync_thread = threading.Thread(
+                target=self._sync_in_background, args=(db, tokenize), name="phrase-corpus-sync", daemon=True
+            )
+            self._sync_thread.start()
+            return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get corpus size and table usage"""
+        with self.lock:
+            return {
+                "documents": self.documents,
+                "vocabulary": len(self.vocabulary),
+                "ngrams": len(self.document_frequency),
+                "max_entries": self.max_entries,
+                "pruned_below_document_frequency": self.pruned_below,
+                "syncing": self._sync_thread is not None and self._sync_thread.is_alive()
+            }
+
+    def memory_usage(self) -> Dict[str, Any]:
+        """Bytes of the token vocabulary and n-gram document frequencies"""
+        with self.lock:
+            vocabulary = deep_sizeof(self.vocabulary)
+            document_frequency = deep_sizeof(self.document_frequency)
+        return {
+            "bytes": vocabulary + document_frequency,
+            "vocabulary_bytes": vocabulary,
+            "document_frequency_bytes": document_frequency
+        }
+
+# Global phrase corpus instance
+phrase_corpus = PhraseCorpus()
+memory_accountant.register("phrase_corpus", phrase_corpus.memory_usage)
@@ -0,0 +1,148 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+QUANTIZATION_DTYPES = ("int8", "float16")
+
+def quantize(vectors: np.ndarray, dtype: str = "int8") -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Quantize row vectors with one scale per vector
+
+    int8 codes are symmetric: code = round(x / scale) with scale = max|x| / 127.
+    float16 codes are the values themselves with a scale of 1.
+
+    Returns:
+        (codes, scales) with codes shaped like vectors and one float32 scale per row
+    """
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    if dtype == "float16":
+        return vectors.astype(np.float16), np.ones(len(vectors), dtype=np.float32)
+    if dtype != "int8":
+        raise ValueError(f"Unsupported quantization dtype '{dtype}'")
+
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+def dequantize(codes: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    """Reconstruct float32 row vectors from codes and per-row scales"""
+    return codes.astype(np.float32) * np.asarray(scales, dtype=np.float32)[:, None]
+
+def encode_vector(vector: np.ndarray, dtype: str = "int8") -> Dict[str, Any]:
+    """Quantize one vector into a compact document for database storage"""
+    codes, scales = quantize(vector, dtype)
+    return {"dtype": dtype, "scale": float(scales[0]), "dim": int(codes.shape[1]), "data": codes[0].tobytes()}
+
+def decode_vector(encoded: Dict[str, Any]) -> np.ndarray:
+    """Reconstruct a float32 vector from encode_vector output"""
+    codes = np.frombuffer(encoded["data"], dtype=encoded["dtype"])
+    return codes.astype(np.float32) * np.float32(encoded["scale"])
+
+def encoded_codes(encoded: Dict[str, Any], dtype: str = "int8") -> Tuple[np.ndarray, float]:
+    """Get the codes and scale of a stored vector in dtype, re-quantizing only if it differs"""
+    if encoded["dtype"] == dtype:
+        return np.frombuffer(encoded["data"], dtype=dtype), float(encoded["scale"])
+    codes, scales = quantize(decode_vector(encoded), dtype)
+    return codes[0], float(scales[0])
+
+class QuantizedIndex:
+    """Quantized in-memory matrix of unit vectors for cosine top-K search
+
+    Approximate scores are computed block by block on the quantized codes, so
+    memory never holds a float copy of the whole matrix. The best candidates
+    can then be re-scored with exact float vectors.
+    """
+
+    def __init__(self, dtype: str = "int8", block_size: int = 1024):
+        self.dtype = dtype
+        self.block_size = block_size
+        self.ids: List[str] = []
+        self.codes: Optional[np.ndarray] = None
+        self.scales: Optional[np.ndarray] = None
+        self.inv_norms: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_vectors(cls, ids: List[str], vectors: np.ndarray, dtype: str = "int8", **kwargs) -> "QuantizedIndex":
+        """Build an index from float row vectors"""
+        index = cls(dtype=dtype, **kwargs)
+        codes, scales = quantize(vectors, dtype) if len(ids) else (np.zeros((0, 0), dtype=dtype), np.zeros(0, dtype=np.float32))
+        index._set(list(ids), codes, scales)
+        return index
+
+    @classmethod
+    def from_codes(cls, ids: List[str], codes: np.ndarray, scales: np.ndarray, dtype: str = "int8", **kwargs) -> "QuantizedIndex":
+        """Build an index from already quantized rows, e.g. decoded from storage"""
+        index = cls(dtype=dtype, **kwargs)
+        index._set(list(ids), codes, np.asarray(scales, dtype=np.float32))
+        return index
+
+    def _set(self, ids: List[str], codes: np.ndarray, scales: np.ndarray) -> None:
+        self.ids = ids
+        self.codes = codes
+        self.scales = scales
+        # Cosine needs the norms of the reconstructed vectors
+        norms = np.empty(len(ids), dtype=np.float32)
+        for start in range(0, len(ids), self.block_size):
+            block = codes[start:start + self.block_size].astype(np.float32)
+            norms[start:start + self.block_size] = np.linalg.norm(block, axis=1) * scales[start:start + self.block_size]
+        norms[norms == 0] = 1.0
+        self.inv_norms = (1.0 / norms).astype(np.float32)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by codes, scales and norms"""
+        if self.codes is None:
+            return 0
+        return self.codes.nbytes + self.scales.nbytes + self.inv_norms.nbytes
+
+    def scores(self, query: np.ndarray) -> np.ndarray:
+        """Approximate cosine similarity of the query with every indexed vector"""
+        query = np.asarray(query, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        result = np.empty(len(self.ids), dtype=np.float32)
+        for start in range(0, len(self.ids), self.block_size):
+            end = start + self.block_size
+            result[start:end] = self.codes[start:end].astype(np.float32) @ query
+        return result * self.scales * self.inv_norms
+
+    def search(self,
+               query: np.ndarray,
+               top_k: int = 10,
+               rerank: Optional[Callable[[List[str]], np.ndarray]] = None,
+               rerank_factor: int = 4) -> List[Tuple[str, float]]:
+        """
+        Find the top_k most similar vectors
+
+        Args:
+            query: Float query vector
+            top_k: Number of results
+            rerank: Optional callable returning exact float vectors for a list of ids;
+                top_k * rerank_factor candidates are then re-scored exactly
+            rerank_factor: Candidate multiplier for re-ranking
+
+        Returns:
+            (id, similarity) pairs, best first
+        """
+        if not self.ids or top_k <= 0:
+            return []
+
+        approximate = self.scores(query)
+        candidates = min(len(self.ids), top_k * rerank_factor if rerank else top_k)
+        top = np.argpartition(-approximate, candidates - 1)[:candidates]
+
+        if rerank is None:
+            top = top[np.argsort(-approximate[top])]
+            return [(self.ids[i], float(approximate[i])) for i in top[:top_k]]
+
+        candidate_ids = [self.ids[i] for i in top]
+        exact_vectors = np.asarray(rerank(candidate_ids), dtype=np.float32)
+        query = np.asarray(query, dtype=np.float32)
+        norms = np.linalg.norm(exact_vectors, axis=1) * (np.linalg.norm(query) or 1.0)
+        norms[norms == 0] = 1.0
+        exact = exact_vectors @ query / norms
+        order = np.argsort(-exact)[:top_k]
+        return [(candidate_ids[i], float(exact[i])) for i in order]
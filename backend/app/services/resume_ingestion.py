@@ -0,0 +1,157 @@
+import os
+import uuid
+from datetime import datetime
+from typing import Dict, Any
+
+from app.services.resume_parser import ResumeParser
+from app.services.vectorizer import ResumeJobVectorizer
+from app.core.config import settings
+from app.core.tracing import span
+from app.services.embeddings import sentence_embedder, resume_embedding_fields
+from app.services.parse_cache import parse_cache, content_hash, build_model_version, copy_cached_fields
+
+SUPPORTED_EXTENSIONS = (".pdf", ".docx", ".txt", ".json")
+
+class UnsupportedFormatError(ValueError):
+    """Raised when an uploaded file is not a supported resume format"""
+
+def is_supported_file(filename: str) -> bool:
+    """Check whether a file name has a supported resume extension"""
+    return filename.lower().endswith(SUPPORTED_EXTENSIONS)
+
+def parse_resume_file(parser: ResumeParser,
+                      filename: str,
+                      content: bytes,
+                      extract_entities: bool = True) -> Dict[str, Any]:
+    """Parse raw file content into resume data based on the file extension
+
+    Without extract_entities, text resumes are parsed with empty entities so the
+    caller can extract them for many files at once.
+    """
+    # Pass the file name along for better name extraction; the parser is shared
+    # between concurrent requests, so it must not be stored on the instance
+    file_name = os.path.splitext(os.path.basename(filename))[0]
+
+    lower_name = filename.lower()
+    if lower_name.endswith(".pdf"):
+        return parser.parse_pdf(content, file_name=file_name, extract_entities=extract_entities)
+    elif lower_name.endswith(".docx"):
+        return parser.parse_docx(content, file_name=file_name, extract_entities=extract_entities)
+    elif lower_name.endswith(".txt"):
+        return parser.parse_text(content, file_name=file_name, extract_entities=extract_entities)
+    elif lower_name.endswith(".json"):
+        return parser.parse_json(content)
+    raise UnsupportedFormatError("Unsupported file format. Please upload PDF, DOCX, TXT or JSON.")
+
+def build_resume_record(resume_data: Dict[str, Any],
+                        filename: str,
+                        vectorizer: ResumeJobVectorizer) -> Dict[str, Any]:
+    """Validate parsed resume data and turn it into a vectorized database record"""
+    # Ensure all required fields are present with default values
+    if "name" not in resume_data or not resume_data["name"] or resume_data["name"] == "Unknown":
+        # Try to extract name from filename
+        base_name = os.path.splitext(os.path.basename(filename))[0]
+        name_from_file = base_name.replace('_', ' ').replace('-', ' ')
+        resume_data["name"] = name_from_file or "Unknown"
+
+    if "education" not in resume_data or not resume_data["education"]:
+        resume_data["education"] = []
+
+    if "experience" not in resume_data or not resume_data["experience"]:
+        resume_data["experience"] = []
+
+    # Validate and fill missing fields in education entries
+    for edu in resume_data.get("education", []):
+        if "institution" not in edu or not edu["institution"]:
+            edu["institution"] = "Unknown Institution"
+        if "degree" not in edu or not edu["degree"]:
+            edu["degree"] = "Unknown Degree"
+
+    # Validate and fill missing fields in experience entries
+    for exp in resume_data.get("experience", []):
+        if "company" not in exp or not exp["company"]:
+            exp["company"] = "Unknown Company"
+        if "title" not in exp or not exp["title"]:
+            exp["title"] = "Unknown Title"
+
+    # Create resume object with validated data
+    resume = {
+        "id": str(uuid.uuid4()),
+        "name": resume_data.get("name", "Unknown"),
+        "email": resume_data.get("email"),
+        "phone": resume_data.get("phone"),
+        "summary": resume_data.get("summary", ""),
+        "skills": resume_data.get("skills", []),
+        "education": resume_data.get("education", []),
+        "experience": resume_data.get("experience", []),
+        "raw_text": resume_data.get("raw_text", ""),
+        "entities": resume_data.get("entities", {}),
+        "created_at": datetime.now(),
+        "updated_at": datetime.now()
+    }
+
+    # Keep text extraction statistics for this upload
+    if "extraction" in resume_data:
+        resume["extraction"] = resume_data["extraction"]
+
+    # Vectorize resume text
+    if resume["raw_text"]:
+        try:
+            with span("vectorize.tfidf"):
+                vector = vectorizer.vectorize(resume["raw_text"])
+            resume["vector"] = vector.tolist()
+        except Exception as e:
+            print(f"Error vectorizing resume: {str(e)}")
+            resume["vector"] = []
+        
+        # Local embeddings for matching with vector_field="embedding"; without
+        # them the resume is embedded on its first embedding match instead
+        if settings.EMBEDDING_STORE:
+            try:
+                with span("vectorize.embedding"):
+                    resume.update(resume_embedding_fields(
+                        sentence_embedder.embed(resume["raw_text"]), sentence_embedder.model_version
+                    ))
+            except Exception as e:
+                print(f"Error embedding resume: {str(e)}")
+
+    return resume
+
+def record_from_cache(fields: Dict[str, Any]) -> Dict[str, Any]:
+    """Create a new resume record from cached parse results"""
+    resume = copy_cached_fields(fields)
+    resume["id"] = str(uuid.uuid4())
+    resume["created_at"] = datetime.now()
+    resume["updated_at"] = datetime.now()
+    return resume
+
+def ingest_resume_file(parser: ResumeParser,
+                       vectorizer: ResumeJobVectorizer,
+                       filename: str,
+                       content: bytes,
+                       db = None) -> Dict[str, Any]:
+    """Parse, validate and vectorize one uploaded file into a database record
+    
+    When db is given, identical uploads are served from the parse cache and the
+    record is linked to the first stored resume with the same content.
+    """
+    digest = content_hash(content)
+    model_version = build_model_version(vectorizer.model_version)
+    
+    cached = parse_cache.get(db, digest, model_version) if db is not None else None
+    if cached is not None:
+        resume = record_from_cache(cached)
+    else:
+        with span("parse", filename=filename, bytes=len(content)):
+            resume_data = parse_resume_file(parser, filename, content)
+        resume = build_resume_record(resume_data, filename, vectorizer)
+        if db is not None:
+            parse_cache.put(db, digest, model_version, resume)
+    
+    resume["content_hash"] = digest
+    if db is not None:
+        original_id = parse_cache.find_originals(db, [digest]).get(digest)
+        if original_id:
+            resume["duplicate_of"] = original_id
+    
+    return resume
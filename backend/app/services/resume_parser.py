@@ -1,34 +1,64 @@
-import io
 import json
 import re
 from typing import Dict, Any, List, Optional
-from PyPDF2 import PdfReader  # Updated from PdfFileReader to PdfReader
 from app.services.text_processor import TextProcessor
+from app.core.config import settings
+from app.services.pdf_extractor import extract_pdf_text
+from app.services.parser_pool import parser_pool, ParserWorkerError
+from app.services.document_extractor import extract_docx_text, extract_plain_text, DocumentLimitExceededError
+from app.services.section_segmenter import (
+    section_segmenter, classify_education_line, classify_experience_line,
+    DATE_RANGE_PARTS, GPA_VALUE
+)
 import pdfplumber
 import docx
-import re
-import spacy
-
-nlp = spacy.load('en_core_web_sm')
 
 class ResumeParser:
-    def __init__(self, skills_database: List[str]):
+    def __init__(self, skills_database: List[str], use_worker_pool: Optional[bool] = None):
         self.text_processor = TextProcessor()
         self.skills_database = skills_database
+        # PDF extraction runs in isolated worker processes unless disabled
+        self.use_worker_pool = settings.PARSER_POOL_ENABLED if use_worker_pool is None else use_worker_pool
     
-    def parse_pdf(self, content: bytes) -> Dict[str, Any]:
+    def parse_pdf(self, content: bytes, file_name: Optional[str] = None, extract_entities: bool = True) -> Dict[str, Any]:
         """Parse resume from PDF file"""
         try:
-            pdf_reader = PdfReader(io.BytesIO(content))  # Updated from PdfFileReader to PdfReader
-            text = ""
-            
-            for page in pdf_reader.pages:  # Updated from getPage(page_num).extractText()
-                text += page.extract_text()  # Updated method name
-            
-            return self._process_text(text)
+            if self.use_worker_pool:
+                extraction = parser_pool.run(extract_pdf_text, content)
+            else:
+                extraction = extract_pdf_text(content)
+            resume_data = self._process_text(extraction.pop("text"), file_name, extract_entities)
+            resume_data["extraction"] = extraction
+            return resume_data
+        except (DocumentLimitExceededError, ParserWorkerError):
+            raise
         except Exception as e:
             raise Exception(f"Error parsing PDF: {str(e)}")
     
+    def parse_docx(self, content: bytes, file_name: Optional[str] = None, extract_entities: bool = True) -> Dict[str, Any]:
+        """Parse resume from DOCX file"""
+        try:
+            extraction = extract_docx_text(content)
+            resume_data = self._process_text(extraction.pop("text"), file_name, extract_entities)
+            resume_data["extraction"] = extraction
+            return resume_data
+        except DocumentLimitExceededError:
+            raise
+        except Exception as e:
+            raise Exception(f"Error parsing DOCX: {str(e)}")
+    
+    def parse_text(self, content: bytes, file_name: Optional[str] = None, extract_entities: bool = True) -> Dict[str, Any]:
+        """Parse resume from plain-text file"""
+        try:
+            extraction = extract_plain_text(content)
+            resume_data = self._process_text(extraction.pop("text"), file_name, extract_entities)
+            resume_data["extraction"] = extraction
+            return resume_data
+        except DocumentLimitExceededError:
+            raise
+        except Exception as e:
+            raise Exception(f"Error parsing text file: {str(e)}")
+    
     def parse_json(self, content: bytes) -> Dict[str, Any]:
         """Parse resume from JSON file"""
         try:
@@ -79,8 +109,12 @@ class ResumeParser:
         except Exception as e:
             raise Exception(f"Error parsing JSON: {str(e)}")
     
-    def _process_text(self, text: str) -> Dict[str, Any]:
-        """Process extracted text to get structured resume data"""
+    def _process_text(self, text: str, file_name: Optional[str] = None, extract_entities: bool = True) -> Dict[str, Any]:
+        """Process extracted text to get structured resume data
+
+        Without extract_entities, entities are left empty for the caller to fill
+        in, e.g. for a whole batch in one nlp.pipe pass.
+        """
         # Basic info extraction using regex
         email_match = re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', text)
         phone_match = re.search(r'\b(\+\d{1,2}\s)?\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4}\b', text)
@@ -95,7 +129,7 @@ class ResumeParser:
             name_match = re.search(r'([A-Z][a-z]+\s+[A-Z][a-z]+)', first_lines)
         
         # If we found a PDF file name, use that as a fallback
-        file_name = getattr(self, 'current_file_name', None)
+        file_name = file_name or getattr(self, 'current_file_name', None)
         extracted_name = name_match.group(0) if name_match else None
         
         if file_name and not extracted_name:
@@ -106,7 +140,7 @@ class ResumeParser:
                 extracted_name = ' '.join(name_parts[:2])
         
         # Extract entities
-        entities = self.text_processor.extract_entities(text)
+        entities = self.text_processor.extract_entities(text) if extract_entities else {}
         
         # Extract skills
         skills = self.text_processor.extract_skills(text, self.skills_database)
@@ -166,45 +200,7 @@ class ResumeParser:
     
     def _extract_sections(self, text: str) -> Dict[str, str]:
         """Extract different sections from the resume text"""
-        # Common section headers in resumes
-        section_headers = [
-            "education", "experience", "work experience", "employment", 
-            "skills", "technical skills", "projects", "certifications",
-            "achievements", "publications", "languages", "interests"
-        ]
-        
-        sections = {}
-        lines = text.split('\n')
-        current_section = None
-        section_content = []
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-                
-            # Check if line is a section header
-            is_header = False
-            for header in section_headers:
-                if re.search(r'\b' + header + r'\b', line.lower()):
-                    # If we've been collecting content for a section, save it
-                    if current_section and section_content:
-                        sections[current_section] = '\n'.join(section_content)
-                    
-                    # Start new section
-                    current_section = header.lower()
-                    section_content = []
-                    is_header = True
-                    break
-            
-            if not is_header and current_section:
-                section_content.append(line)
-        
-        # Save the last section
-        if current_section and section_content:
-            sections[current_section] = '\n'.join(section_content)
-        
-        return sections
+        return section_segmenter.extract_sections(text)
     
     def _parse_education(self, education_text: str) -> List[Dict[str, Any]]:
         """Parse education section to structured format"""
@@ -218,8 +214,10 @@ class ResumeParser:
             if not line:
                 continue
                 
+            kind = classify_education_line(line)
+            
             # Look for institution
-            if re.search(r'university|college|institute|school', line.lower()):
+            if kind == "institution":
                 if current_entry and 'institution' in current_entry:
                     # Only add the entry if it has both required fields
                     if current_entry["institution"] != "Unknown Institution" or current_entry["degree"] != "Unknown Degree":
@@ -229,19 +227,19 @@ class ResumeParser:
                 current_entry['institution'] = line
             
             # Look for degree
-            elif re.search(r'bachelor|master|phd|b\.?s|m\.?s|b\.?tech|m\.?tech', line.lower()):
+            elif kind == "degree":
                 current_entry['degree'] = line
             
             # Look for date ranges
-            elif re.search(r'\d{4}\s*-\s*\d{4}|\d{4}\s*to\s*\d{4}|present', line.lower()):
-                match = re.search(r'(\d{4})\s*-\s*(\d{4}|\w+)', line)
+            elif kind == "dates":
+                match = DATE_RANGE_PARTS.search(line)
                 if match:
                     current_entry['start_date'] = match.group(1)
                     current_entry['end_date'] = match.group(2)
             
             # Look for GPA
-            elif re.search(r'gpa|grade', line.lower()):
-                match = re.search(r'(\d\.\d+)', line)
+            elif kind == "gpa":
+                match = GPA_VALUE.search(line)
                 if match:
                     current_entry['gpa'] = float(match.group(1))
         
@@ -277,8 +275,10 @@ class ResumeParser:
             if not line:
                 continue
             
+            kind = classify_experience_line(line)
+            
             # Look for company name (often has Inc, LLC, etc. or is all caps)
-            if re.search(r'\b(Inc|LLC|Ltd|Corp|Corporation)\b', line) or line.isupper():
+            if kind == "company":
                 if current_entry and 'company' in current_entry:
                     if description_lines:
                         current_entry['description'] = ' '.join(description_lines)
@@ -291,15 +291,15 @@ class ResumeParser:
                 current_entry['company'] = line
             
             # Look for job title (often starts with common titles)
-            elif re.search(r'\b(Software|Developer|Engineer|Manager|Director|Analyst|Consultant|Designer)\b', line):
+            elif kind == "title":
                 if 'title' not in current_entry or current_entry["title"] == "Unknown Title":
                     current_entry['title'] = line
                 else:
                     description_lines.append(line)
             
             # Look for date ranges
-            elif re.search(r'\d{4}\s*-\s*\d{4}|\d{4}\s*to\s*\d{4}|present', line.lower()):
-                match = re.search(r'(\d{4})\s*-\s*(\d{4}|\w+)', line)
+            elif kind == "dates":
+                match = DATE_RANGE_PARTS.search(line)
                 if match:
                     current_entry['start_date'] = match.group(1)
                     current_entry['end_date'] = match.group(2)
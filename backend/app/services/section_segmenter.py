@@ -0,0 +1,118 @@
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Union
+
+# Common section headers in resumes, in priority order: when a line contains
+# several headers, the one listed first wins
+SECTION_HEADERS = [
+    "education", "experience", "work experience", "employment",
+    "skills", "technical skills", "projects", "certifications",
+    "achievements", "publications", "languages", "interests"
+]
+
+# Field patterns for lines inside education and experience sections. Lowercase
+# patterns are matched against the lowercased line.
+EDUCATION_INSTITUTION = re.compile(r'university|college|institute|school')
+EDUCATION_DEGREE = re.compile(r'bachelor|master|phd|b\.?s|m\.?s|b\.?tech|m\.?tech')
+DATE_RANGE = re.compile(r'\d{4}\s*-\s*\d{4}|\d{4}\s*to\s*\d{4}|present')
+DATE_RANGE_PARTS = re.compile(r'(\d{4})\s*-\s*(\d{4}|\w+)')
+EDUCATION_GPA = re.compile(r'gpa|grade')
+GPA_VALUE = re.compile(r'(\d\.\d+)')
+EXPERIENCE_COMPANY = re.compile(r'\b(Inc|LLC|Ltd|Corp|Corporation)\b')
+EXPERIENCE_TITLE = re.compile(r'\b(Software|Developer|Engineer|Manager|Director|Analyst|Consultant|Designer)\b')
+
+class SectionSpan(NamedTuple):
+    """A resume section: its name, header line and the content lines below it"""
+    name: str
+    header: str
+    start_line: int
+    end_line: int
+    lines: List[str]
+
+class SectionSegmenter:
+    """Splits resume text into sections in a single pass over its lines"""
+
+    def __init__(self, headers: List[str] = None):
+        self.headers = list(headers or SECTION_HEADERS)
+        self.priority = {header: index for index, header in enumerate(self.headers)}
+
+        # Longer headers first, so "work experience" is found as one match
+        ordered = sorted(self.headers, key=len, reverse=True)
+        self.header_pattern = re.compile(
+            r'\b(?:' + '|'.join(re.escape(header) for header in ordered) + r')\b'
+        )
+
+        # A header that contains a higher-priority header resolves to that one,
+        # e.g. "work experience" is an "experience" section
+        self.canonical = {}
+        for header in self.headers:
+            for candidate in self.headers:
+                if re.search(r'\b' + re.escape(candidate) + r'\b', header):
+                    self.canonical[header] = candidate
+                    break
+
+    def classify_header(self, lowered_line: str) -> Optional[str]:
+        """Return the section name a lowercased line introduces, or None"""
+        best = None
+        for match in self.header_pattern.finditer(lowered_line):
+            name = self.canonical[match.group(0)]
+            if best is None or self.priority[name] < self.priority[best]:
+                best = name
+        return best
+
+    def segment(self, lines: Iterable[str]) -> List[SectionSpan]:
+        """Split lines into section spans; content before the first header is skipped"""
+        spans = []
+        current = None
+
+        for index, line in enumerate(lines):
+            line = line.strip()
+            if not line:
+                continue
+
+            name = self.classify_header(line.lower())
+            if name is not None:
+                if current is not None:
+                    spans.append(current._replace(end_line=index))
+                current = SectionSpan(name, line, index, index + 1, [])
+            elif current is not None:
+                current.lines.append(line)
+
+        if current is not None:
+            spans.append(current._replace(end_line=index + 1))
+
+        return spans
+
+    def extract_sections(self, text: Union[str, Iterable[str]]) -> Dict[str, str]:
+        """Map section names to their content; a later non-empty section with the same name wins"""
+        lines = text.split('\n') if isinstance(text, str) else text
+        sections = {}
+        for span in self.segment(lines):
+            if span.lines:
+                sections[span.name] = '\n'.join(span.lines)
+        return sections
+
+def classify_education_line(line: str) -> str:
+    """Classify a stripped education line as institution, degree, dates, gpa or other"""
+    lowered = line.lower()
+    if EDUCATION_INSTITUTION.search(lowered):
+        return "institution"
+    if EDUCATION_DEGREE.search(lowered):
+        return "degree"
+    if DATE_RANGE.search(lowered):
+        return "dates"
+    if EDUCATION_GPA.search(lowered):
+        return "gpa"
+    return "other"
+
+def classify_experience_line(line: str) -> str:
+    """Classify a stripped experience line as company, title, dates or description"""
+    if EXPERIENCE_COMPANY.search(line) or line.isupper():
+        return "company"
+    if EXPERIENCE_TITLE.search(line):
+        return "title"
+    if DATE_RANGE.search(line.lower()):
+        return "dates"
+    return "description"
+
+# Shared segmenter instance
+section_segmenter = SectionSegmenter()
@@ -3,10 +3,8 @@ import nltk
 from nltk.tokenize import word_tokenize
 from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
-import spacy
-
-# Load spaCy model
-nlp = spacy.load("en_core_web_sm")
+from typing import Dict, List
+from app.services.entity_extractor import entity_extractor
 
 # Ensure NLTK resources are downloaded
 nltk.download('punkt', quiet=True)
@@ -66,12 +64,10 @@ class TextProcessor:
         """
         Extract named entities using spaCy
         """
-        doc = nlp(text)
-        entities = {}
-        
-        for ent in doc.ents:
-            if ent.label_ not in entities:
-                entities[ent.label_] = []
-            entities[ent.label_].append(ent.text)
-        
-        return entities
\ No newline at end of file
+        return entity_extractor.extract(text)
+    
+    def extract_entities_batch(self, texts: List[str]) -> List[Dict[str, List[str]]]:
+        """
+        Extract named entities for many texts in one nlp.pipe pass
+        """
+        return entity_extractor.extract_batch(texts)
\ No newline at end of file
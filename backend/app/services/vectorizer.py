@@ -1,14 +1,32 @@
 from sklearn.feature_extraction.text import TfidfVectorizer
 import numpy as np
+import hashlib
 import pickle
 import os
+import threading
 from typing import List, Tuple, Dict, Any
+from app.core.memory import array_bytes, deep_sizeof, memory_accountant
+from app.core.prometheus import time_model_load
 from app.services.text_processor import TextProcessor
+from app.services.embedding_cache import embedding_cache
+
+def model_fingerprint(path: str = None) -> str:
+    """Short content digest of a model file, or "untrained" if it does not exist"""
+    if not path or not os.path.exists(path):
+        return "untrained"
+    
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
 
 class ResumeJobVectorizer:
     def __init__(self, model_path: str = None):
         self.text_processor = TextProcessor()
         self.vectorizer = None
+        self.model_path = model_path
+        self.model_version = "untrained"
         
         if model_path and os.path.exists(model_path):
             self.load_model(model_path)
@@ -24,6 +42,16 @@ class ResumeJobVectorizer:
         processed_docs = [self.text_processor.preprocess_text(doc) for doc in documents]
         self.vectorizer.fit(processed_docs)
     
+    @property
+    def is_fitted(self) -> bool:
+        """Whether the vectorizer has a vocabulary and can transform text"""
+        return self.vectorizer is not None and hasattr(self.vectorizer, "vocabulary_")
+    
+    @property
+    def dimension(self) -> int:
+        """Number of features in the fitted vocabulary, or 0 if not fitted"""
+        return len(self.vectorizer.vocabulary_) if self.is_fitted else 0
+    
     def vectorize(self, text: str) -> np.ndarray:
         """Convert text to vector representation"""
         if not self.vectorizer:
@@ -33,12 +61,70 @@ class ResumeJobVectorizer:
         vector = self.vectorizer.transform([processed_text])
         return vector.toarray()[0]
     
+    def vectorize_batch(self, texts: List[str]) -> np.ndarray:
+        """Convert several texts to a (len(texts), dimension) matrix with one transform call"""
+        if not self.vectorizer:
+            raise ValueError("Vectorizer not trained or loaded")
+        
+        processed_texts = [self.text_processor.preprocess_text(text) for text in texts]
+        return self.vectorizer.transform(processed_texts).toarray()
+    
     def save_model(self, path: str) -> None:
         """Save the trained vectorizer model"""
         with open(path, 'wb') as f:
             pickle.dump(self.vectorizer, f)
+        self.model_version = model_fingerprint(path)
     
     def load_model(self, path: str) -> None:
         """Load a trained vectorizer model"""
-        with open(path, 'rb') as f:
-            self.vectorizer = pickle.load(f)
\ No newline at end of file
+        old_version = self.model_version
+        with open(path, 'rb') as f, time_model_load("tfidf"):
+            self.vectorizer = pickle.load(f)
+        self.model_version = model_fingerprint(path)
+        
+        # Cached TF-IDF embeddings of a replaced model are never valid again
+        if old_version != "untrained" and old_version != self.model_version:
+            embedding_cache.invalidate(f"tfidf-{old_version}")
+    
+    def reload(self) -> None:
+        """Reload the model from model_path if it exists"""
+        if self.model_path and os.path.exists(self.model_path):
+            self.load_model(self.model_path)
+
+    def memory_usage(self) -> Dict[str, Any]:
+        """Bytes of the fitted vocabulary, idf weights and stop word set"""
+        if not self.is_fitted:
+            return {"bytes": 0, "fitted": False}
+        vocabulary = deep_sizeof(self.vectorizer.vocabulary_)
+        idf = array_bytes(getattr(self.vectorizer, "idf_", None))
+        # Terms cut by max_features/min_df; kept only for introspection by older scikit-learn
+        stop_words = deep_sizeof(getattr(self.vectorizer, "stop_words_", None))
+        return {
+            "bytes": vocabulary + idf + stop_words,
+            "fitted": True,
+            "terms": len(self.vectorizer.vocabulary_),
+            "vocabulary_bytes": vocabulary,
+            "idf_bytes": idf,
+            "stop_words_bytes": stop_words
+        }
+
+_shared_vectorizers: Dict[str, ResumeJobVectorizer] = {}
+_shared_vectorizers_lock = threading.Lock()
+
+def get_shared_vectorizer(model_path: str) -> ResumeJobVectorizer:
+    """Load a persisted vectorizer once per process and reuse it"""
+    with _shared_vectorizers_lock:
+        vectorizer = _shared_vectorizers.get(model_path)
+        if vectorizer is None:
+            vectorizer = ResumeJobVectorizer(model_path)
+            _shared_vectorizers[model_path] = vectorizer
+        return vectorizer
+
+def shared_vectorizers_memory_usage() -> Dict[str, Any]:
+    """Memory of every shared vectorizer, by model path"""
+    with _shared_vectorizers_lock:
+        vectorizers = dict(_shared_vectorizers)
+    models = {path: vectorizer.memory_usage() for path, vectorizer in vectorizers.items()}
+    return {"bytes": sum(model["bytes"] for model in models.values()), "models": models}
+
+memory_accountant.register("tfidf", shared_vectorizers_memory_usage)
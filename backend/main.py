@@ -1,11 +1,22 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 import uvicorn
 import os
 from pymongo import MongoClient
 
 from app.core.config import settings
 from app.api.endpoints import resumes, jobs, matches, match, advanced_matches, nlp_analysis, performance
+from app.core.executor import task_executor
+from app.core.prometheus import CONTENT_TYPE, PrometheusMiddleware, mongo_command_listener, registry
+from app.core.tracing import TracingMiddleware, mongo_trace_listener
+from app.services.bulk_ingestion import bulk_ingestion_manager
+from app.services.parser_pool import parser_pool
+from app.services.embedding_cache import embedding_cache
+from app.services.advanced_nlp import nlp_processor
+from app.services.phrase_counter import phrase_corpus
+from app.services.data_versions import SEQUENCE_FIELD
+from app.services.performance_monitor import performance_monitor
 
 # Create FastAPI app
 app = FastAPI(
@@ -22,10 +33,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.METRICS_ENABLED:
+    app.add_middleware(PrometheusMiddleware)
+    registry.register_stats("executor", task_executor.get_stats, "CPU task executor")
+    registry.register_stats("parser_pool", parser_pool.get_stats, "PDF parser pool")
+
+if settings.TRACING_ENABLED:
+    app.add_middleware(TracingMiddleware)
+
 # MongoDB connection
 @app.on_event("startup")
 async def startup_db_client():
-    app.mongodb_client = MongoClient(settings.MONGODB_URL)
+    app.mongodb_client = MongoClient(settings.MONGODB_URL, event_listeners=[mongo_command_listener, mongo_trace_listener])
     app.mongodb = app.mongodb_client[settings.DATABASE_NAME]
     
     # Ensure collections exist
@@ -36,16 +55,34 @@ async def startup_db_client():
         app.mongodb.create_collection("jobs")
     if "matches" not in collection_names:
         app.mongodb.create_collection("matches")
+    if "parse_cache" not in collection_names:
+        app.mongodb.create_collection("parse_cache")
     
     # Create indexes
     app.mongodb.resumes.create_index("id", unique=True)
     app.mongodb.jobs.create_index("id", unique=True)
     app.mongodb.matches.create_index([("job_id", 1), ("resume_id", 1)], unique=True)
+    app.mongodb.resumes.create_index("content_hash")
+    # Incremental phrase corpus syncs read documents inserted since the last one
+    app.mongodb.resumes.create_index(SEQUENCE_FIELD)
+    app.mongodb.jobs.create_index(SEQUENCE_FIELD)
+    app.mongodb.parse_cache.create_index([("content_hash", 1), ("model_version", 1)], unique=True)
     
     print("Connected to MongoDB!")
+    
+    # Warm the TF-IDF key phrase corpus without delaying startup
+    phrase_corpus.refresh(app.mongodb, nlp_processor.phrase_tokens)
+    
+    performance_monitor.system_sampler.start()
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    performance_monitor.system_sampler.stop()
+    bulk_ingestion_manager.shutdown()
+    parser_pool.shutdown()
+    nlp_processor.shutdown()
+    embedding_cache.close()
+    task_executor.shutdown()
     app.mongodb_client.close()
     print("MongoDB connection closed")
 
@@ -69,6 +106,13 @@ def read_root():
 def health():
     return {"status": "ok"}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint"""
+    if not settings.METRICS_ENABLED:
+        return Response(status_code=404)
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
 if __name__ == "__main__":
     # Create necessary directories
     os.makedirs("data", exist_ok=True)
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Document Parsing Benchmark
+Compares extraction and parsing throughput of PDF, DOCX and TXT resumes
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Any, Callable
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import docx
+
+from app.services.pdf_extractor import extract_pdf_text
+from app.services.document_extractor import extract_docx_text, extract_plain_text
+
+SECTION_LINES = {
+    "EDUCATION": [
+        "Stanford University",
+        "Bachelor of Science in Computer Science",
+        "2012 - 2016",
+        "GPA: 3.8"
+    ],
+    "WORK EXPERIENCE": [
+        "ACME CORPORATION",
+        "Senior Software Engineer",
+        "2018 - present",
+        "Built data pipelines in Python and Spark serving millions of users.",
+        "Led migration of services to Kubernetes and AWS."
+    ],
+    "TECHNICAL SKILLS": [
+        "Python, JavaScript, React, Node.js, MongoDB, Docker, Kubernetes, AWS"
+    ],
+    "PROJECTS": [
+        "Resume matcher using TF-IDF and spaCy named entity recognition.",
+        "Realtime dashboard with WebSockets and Redis."
+    ]
+}
+
+def generate_resume_lines(repeat: int) -> List[str]:
+    """Generate a synthetic resume, repeating the experience section to grow it"""
+    lines = ["Jane Doe", "jane.doe@example.com", "(555) 123-4567", ""]
+    for header, content in SECTION_LINES.items():
+        lines.append(header)
+        times = repeat if header == "WORK EXPERIENCE" else 1
+        for _ in range(times):
+            lines.extend(content)
+        lines.append("")
+    return lines
+
+def build_txt(lines: List[str]) -> bytes:
+    return "\n".join(lines).encode("utf-8")
+
+def build_docx(lines: List[str]) -> bytes:
+    document = docx.Document()
+    for line in lines:
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def build_pdf(lines: List[str], lines_per_page: int = 50) -> bytes:
+    """Write a minimal multi-page PDF with one Helvetica text line per resume line"""
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    page_count = len(pages)
+
+    # Object numbers: 1 catalog, 2 page tree, 3 font, then a page and content stream per page
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        ("<< /Type /Pages /Kids [%s] /Count %d >>" % (
+            " ".join(f"{4 + 2 * i} 0 R" for i in range(page_count)), page_count
+        )).encode("latin-1"),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+    ]
+    for index, page_lines in enumerate(pages):
+        commands = ["BT", "/F1 10 Tf", "12 TL", "50 800 Td"]
+        for line in page_lines:
+            commands.append(f"({_pdf_escape(line)}) Tj T*")
+        commands.append("ET")
+        stream = "\n".join(commands).encode("latin-1", "replace")
+        objects.append((
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * index} 0 R >>"
+        ).encode("latin-1"))
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    output = io.BytesIO()
+    output.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(output.tell())
+        output.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+
+    xref_offset = output.tell()
+    output.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        output.write(b"%010d 00000 n \n" % offset)
+    output.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset))
+    return output.getvalue()
+
+BUILDERS = {"pdf": build_pdf, "docx": build_docx, "txt": build_txt}
+
+def benchmark(func: Callable, content: bytes, iterations: int) -> Dict[str, Any]:
+    """Time repeated calls of func(content) and report throughput"""
+    func(content)  # warm-up
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        result = func(content)
+        timings.append(time.perf_counter() - started)
+
+    total = sum(timings)
+    chars = len(result["raw_text"] if "raw_text" in result else result["text"])
+    return {
+        "iterations": iterations,
+        "mean_seconds": total / iterations,
+        "min_seconds": min(timings),
+        "max_seconds": max(timings),
+        "docs_per_second": iterations / total if total else 0.0,
+        "mb_per_second": len(content) * iterations / total / (1024 * 1024) if total else 0.0,
+        "chars_per_second": chars * iterations / total if total else 0.0
+    }
+
+def run_benchmarks(sizes: List[int], iterations: int, full_parse: bool) -> Dict[str, Any]:
+    extractors = {
+        "pdf": lambda content: extract_pdf_text(content, max_pages=0, max_bytes=0, max_chars=0, time_budget=0),
+        "docx": lambda content: extract_docx_text(content, max_bytes=0, max_chars=0),
+        "txt": lambda content: extract_plain_text(content, max_bytes=0, max_chars=0)
+    }
+
+    parser = None
+    if full_parse:
+        from app.services.resume_parser import ResumeParser
+        with open("data/skills_database.json", "r") as f:
+            parser = ResumeParser(json.load(f))
+        parsers = {"pdf": parser.parse_pdf, "docx": parser.parse_docx, "txt": parser.parse_text}
+
+    results = {}
+    for repeat in sizes:
+        lines = generate_resume_lines(repeat)
+        size_results = {}
+        for fmt, builder in BUILDERS.items():
+            content = builder(lines)
+            entry = {
+                "bytes": len(content),
+                "lines": len(lines),
+                "extract": benchmark(extractors[fmt], content, iterations)
+            }
+            if parser is not None:
+                entry["parse"] = benchmark(parsers[fmt], content, iterations)
+            size_results[fmt] = entry
+            print(f"{len(lines):>6} lines  {fmt:<4}  {len(content):>9} bytes  "
+                  f"extract {entry['extract']['docs_per_second']:>9.1f} docs/s"
+                  + (f"  parse {entry['parse']['docs_per_second']:>7.1f} docs/s" if "parse" in entry else ""))
+        results[str(len(lines))] = size_results
+    return results
+
+def main():
+    """Main function to run the document parsing benchmark"""
+    arg_parser = argparse.ArgumentParser(description="Benchmark PDF, DOCX and TXT resume parsing")
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[1, 20, 200],
+                            help="How many times to repeat the experience section per resume")
+    arg_parser.add_argument("--iterations", type=int, default=20)
+    arg_parser.add_argument("--full-parse", action="store_true",
+                            help="Also time the full ResumeParser pipeline (needs the NLP models)")
+    arg_parser.add_argument("--output", help="Write results as JSON to this file")
+    args = arg_parser.parse_args()
+
+    print("Document Parsing Benchmark")
+    print("=" * 60)
+    results = run_benchmarks(args.sizes, args.iterations, args.full_parse)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"results": results, "generated_at": datetime.now().isoformat()}, f, indent=2)
+        print(f"\nResults saved to: {args.output}")
+
+if __name__ == "__main__":
+    main()
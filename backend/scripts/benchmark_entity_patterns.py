@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Entity Pattern Benchmark
+Compares per-pattern re.findall with the single-scan EntityPatternMatcher on long resumes
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Any
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.pattern_matcher import EntityPatternMatcher, DEFAULT_ENTITY_PATTERNS
+
+RESUME_LINES = [
+    "Senior Software Engineer at Google, 2018 - present",
+    "Led a team of 8 developers building data pipelines in Python, Scala and Apache Spark.",
+    "Migrated services to Kubernetes on AWS and Azure using Terraform and GitHub Actions.",
+    "Product Manager for machine learning features with TensorFlow and PyTorch models.",
+    "Bachelor of Science in Computer Science, Stanford University",
+    "Master in Data Science from the Institute of Technology",
+    "Contact: jane.doe@example.com, +1 (555) 123-4567, 555.987.6543",
+    "Worked 5 years with React, Node.js, Express.js, PostgreSQL, MongoDB and Redis at Amazon.",
+    "Junior Developer at Oracle; DevOps Engineer at Netflix; Data Scientist at Uber.",
+    "Responsible for stakeholder communication, hiring and quarterly planning across offices."
+]
+
+def legacy_patterns(text: str) -> Dict[str, List[str]]:
+    """Pattern part of the previous advanced_entity_recognition"""
+    entities = {key: [] for key in DEFAULT_ENTITY_PATTERNS}
+    for entity_type, patterns in DEFAULT_ENTITY_PATTERNS.items():
+        if entity_type in ("emails", "phones"):
+            continue
+        for pattern in patterns:
+            entities[entity_type].extend(re.findall(pattern, text, re.IGNORECASE))
+    entities["emails"] = re.findall(DEFAULT_ENTITY_PATTERNS["emails"][0], text)
+    # findall returned the optional country code group here; compare full numbers instead
+    entities["phones"] = [match.group(0) for match in re.finditer(DEFAULT_ENTITY_PATTERNS["phones"][0], text)]
+    return {key: list(set(values)) for key, values in entities.items()}
+
+def make_resume(lines: int, seed: int) -> str:
+    rng = random.Random(seed)
+    return "\n".join(rng.choice(RESUME_LINES) for _ in range(lines))
+
+def time_call(func, text: str, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func(text)
+    return (time.perf_counter() - started) / iterations
+
+def run_benchmarks(sizes: List[int], iterations: int) -> List[Dict[str, Any]]:
+    matcher = EntityPatternMatcher(patterns=DEFAULT_ENTITY_PATTERNS)
+    results = []
+
+    for lines in sizes:
+        text = make_resume(lines, seed=lines)
+        legacy = legacy_patterns(text)
+        compiled = matcher.match(text)
+        identical = all(set(legacy[key]) == set(compiled[key]) for key in legacy)
+
+        legacy_seconds = time_call(legacy_patterns, text, iterations)
+        compiled_seconds = time_call(matcher.match, text, iterations)
+        result = {
+            "lines": lines,
+            "chars": len(text),
+            "legacy_ms": legacy_seconds * 1000,
+            "compiled_ms": compiled_seconds * 1000,
+            "speedup": legacy_seconds / compiled_seconds if compiled_seconds else None,
+            "identical": identical
+        }
+        results.append(result)
+        print(f"{lines:>6} lines {len(text):>9} chars  legacy {result['legacy_ms']:9.3f} ms  "
+              f"compiled {result['compiled_ms']:9.3f} ms  speedup {result['speedup']:.2f}x  "
+              f"identical={identical}")
+
+    return results
+
+def main():
+    """Main function to run the entity pattern benchmark"""
+    arg_parser = argparse.ArgumentParser(description="Benchmark entity pattern matching")
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[20, 200, 2000, 20000],
+                            help="Resume lengths in lines")
+    arg_parser.add_argument("--iterations", type=int, default=20)
+    arg_parser.add_argument("--output", help="Write results as JSON to this file")
+    args = arg_parser.parse_args()
+
+    print("Entity Pattern Benchmark")
+    print("=" * 60)
+    results = run_benchmarks(args.sizes, args.iterations)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"results": results, "generated_at": datetime.now().isoformat()}, f, indent=2)
+        print(f"\nResults saved to: {args.output}")
+
+if __name__ == "__main__":
+    main()
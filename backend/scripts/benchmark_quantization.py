@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Embedding Quantization Benchmark
+Compares accuracy, latency and memory of float32, float16 and int8 embedding search
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Any
+
+import numpy as np
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.quantization import QuantizedIndex
+from app.services.match_evaluation import precision_at_k, ndcg_at_k
+
+def make_embeddings(n_resumes: int, n_queries: int, dimension: int, n_clusters: int, noise: float, seed: int):
+    """Clustered unit vectors; a resume is relevant to a query from the same cluster"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_clusters, dimension)).astype(np.float32)
+
+    def sample(count):
+        labels = rng.integers(0, n_clusters, count)
+        vectors = centers[labels] + noise * rng.standard_normal((count, dimension)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors, labels
+
+    resumes, resume_labels = sample(n_resumes)
+    queries, query_labels = sample(n_queries)
+    return resumes, resume_labels, queries, query_labels
+
+def evaluate(name: str,
+             score_fn,
+             resume_labels: np.ndarray,
+             queries: np.ndarray,
+             query_labels: np.ndarray,
+             exact_top: List[np.ndarray],
+             k: int,
+             memory_bytes: int,
+             to_scores=None) -> Dict[str, Any]:
+    """Time score_fn per query and compare its ranking with the labels and the float top-K
+
+    to_scores turns the output of score_fn into a score per resume, outside the timing.
+    """
+    latencies, precisions, ndcgs, overlaps = [], [], [], []
+    for query, label, exact in zip(queries, query_labels, exact_top):
+        started = time.perf_counter()
+        scores = score_fn(query)
+        latencies.append(time.perf_counter() - started)
+        if to_scores is not None:
+            scores = to_scores(query, scores)
+
+        y_true = (resume_labels == label).astype(int)
+        precisions.append(precision_at_k(y_true, scores, k))
+        ndcgs.append(ndcg_at_k(y_true, scores, k))
+        top = np.argsort(scores)[::-1][:k]
+        overlaps.append(len(set(top) & set(exact)) / k)
+
+    result = {
+        "method": name,
+        f"precision_at_{k}": float(np.mean(precisions)),
+        f"ndcg_at_{k}": float(np.mean(ndcgs)),
+        f"overlap_with_float_top_{k}": float(np.mean(overlaps)),
+        "median_ms": float(np.median(latencies) * 1000),
+        "p95_ms": float(np.percentile(latencies, 95) * 1000),
+        "memory_bytes": int(memory_bytes)
+    }
+    print(f"{name:<18} P@{k}={result[f'precision_at_{k}']:.4f}  NDCG@{k}={result[f'ndcg_at_{k}']:.4f}  "
+          f"overlap={result[f'overlap_with_float_top_{k}']:.4f}  median={result['median_ms']:.2f} ms  "
+          f"p95={result['p95_ms']:.2f} ms  memory={memory_bytes / 1024 / 1024:.1f} MB")
+    return result
+
+def reranked_scores(index: QuantizedIndex,
+                    positions: Dict[str, int],
+                    query: np.ndarray,
+                    results: List[tuple]) -> np.ndarray:
+    """Score vector whose order matches index.search results, so the shared metrics can be applied"""
+    scores = index.scores(query)
+    # Put the re-ranked results above every approximate score, in their exact order
+    for rank, (id_, _) in enumerate(results):
+        scores[positions[id_]] = 2.0 + (len(results) - rank)
+    return scores
+
+def run_benchmark(args) -> List[Dict[str, Any]]:
+    resumes, resume_labels, queries, query_labels = make_embeddings(
+        args.resumes, args.queries, args.dimension, args.clusters, args.noise, args.seed
+    )
+    k = args.top_k
+    print(f"{args.resumes} resumes, {args.queries} queries, dimension {args.dimension}, top {k}\n")
+
+    exact_top = [np.argsort(resumes @ query)[::-1][:k] for query in queries]
+    ids = [str(i) for i in range(len(resumes))]
+    int8_index = QuantizedIndex.from_vectors(ids, resumes, dtype="int8")
+    float16_index = QuantizedIndex.from_vectors(ids, resumes, dtype="float16")
+    positions = {id_: i for i, id_ in enumerate(ids)}
+
+    def exact_vectors(candidate_ids):
+        # Stands in for the stored or cached float embeddings of the candidates
+        return resumes[[positions[id_] for id_ in candidate_ids]]
+
+    common = (resume_labels, queries, query_labels, exact_top, k)
+    results = [
+        evaluate("float32", lambda query: resumes @ query, *common, memory_bytes=resumes.nbytes),
+        evaluate("float16", float16_index.scores, *common, memory_bytes=float16_index.nbytes),
+        evaluate("int8", int8_index.scores, *common, memory_bytes=int8_index.nbytes)
+    ]
+    for factor in args.rerank_factors:
+        results.append(evaluate(
+            f"int8+rerank x{factor}",
+            lambda query: int8_index.search(query, top_k=k, rerank=exact_vectors, rerank_factor=factor),
+            *common,
+            memory_bytes=int8_index.nbytes,
+            to_scores=lambda query, found: reranked_scores(int8_index, positions, query, found)
+        ))
+    return results
+
+def main():
+    """Main function to run the quantization benchmark"""
+    arg_parser = argparse.ArgumentParser(description="Benchmark quantized embedding search")
+    arg_parser.add_argument("--resumes", type=int, default=50000)
+    arg_parser.add_argument("--queries", type=int, default=100)
+    arg_parser.add_argument("--dimension", type=int, default=384)
+    arg_parser.add_argument("--clusters", type=int, default=200)
+    arg_parser.add_argument("--noise", type=float, default=3.0,
+                            help="Spread of resumes around their cluster center, per dimension")
+    arg_parser.add_argument("--top-k", type=int, default=10)
+    arg_parser.add_argument("--rerank-factors", type=int, nargs="+", default=[2, 4])
+    arg_parser.add_argument("--seed", type=int, default=42)
+    arg_parser.add_argument("--output", help="Write results as JSON to this file")
+    args = arg_parser.parse_args()
+
+    print("Embedding Quantization Benchmark")
+    print("=" * 60)
+    results = run_benchmark(args)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"parameters": vars(args), "results": results,
+                       "generated_at": datetime.now().isoformat()}, f, indent=2)
+        print(f"\nResults saved to: {args.output}")
+
+if __name__ == "__main__":
+    main()
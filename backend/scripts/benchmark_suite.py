@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Matching Hot Path Benchmark Suite
+Times matching, skill, bias and text processing functions over 1k to 1M resumes
+with warm-up, repeated rounds and summary statistics, and saves results as JSON
+so runs can be compared across commits
+"""
+
+import argparse
+import gc
+import inspect
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.matcher import ResumeMatcher
+from app.services.advanced_matcher import AdvancedResumeMatcher
+from app.services.text_processor import TextProcessor
+from app.services.vectorizer import ResumeJobVectorizer
+
+FILLER_WORDS = [
+    "developed", "designed", "implemented", "maintained", "led", "built", "improved", "managed",
+    "services", "platform", "pipeline", "customers", "team", "features", "performance", "reliability",
+    "backend", "frontend", "data", "systems", "scalable", "distributed", "testing", "deployment",
+    "reduced", "latency", "costs", "migrated", "infrastructure", "reporting", "analytics", "users"
+]
+
+# Phrases the bias detector looks for, so detect_bias does real work
+BIAS_PHRASES = ["he", "she", "his", "her", "senior", "junior", "recent graduate", "experienced",
+                "stanford", "mit", "university", "college"]
+
+def undecorated(method: Callable) -> Callable:
+    """The function behind any functools.wraps decorators (e.g. monitor_performance), still bound"""
+    func = getattr(method, "__func__", method)
+    inner = inspect.unwrap(func)
+    if inner is func:
+        return method
+    instance = getattr(method, "__self__", None)
+    return inner.__get__(instance) if instance is not None else inner
+
+def default_skills() -> List[str]:
+    """Skill names and synonyms known to the advanced matcher"""
+    skills = set()
+    for skill, synonyms in AdvancedResumeMatcher().skill_synonyms.items():
+        skills.add(skill)
+        skills.update(synonyms)
+    return sorted(skills)
+
+class BenchmarkData:
+    """Pool of distinct synthetic resumes and one job
+
+    Larger sizes repeat the pool by reference, so a million resumes cost a list
+    of pointers rather than a million documents.
+    """
+
+    def __init__(self, pool_size: int, dimension: int, skills: List[str], vector_format: str, seed: int):
+        rng = np.random.default_rng(seed)
+        self.skills = skills
+
+        vectors = rng.random((pool_size + 1, dimension))
+        # MongoDB returns vectors as lists, which is what the matchers see in production
+        as_stored = (lambda row: row.tolist()) if vector_format == "list" else (lambda row: row)
+
+        self.resumes = []
+        for i in range(pool_size):
+            resume_skills = [str(s) for s in rng.choice(skills, size=min(len(skills), int(rng.integers(5, 20))), replace=False)]
+            words = [str(w) for w in rng.choice(FILLER_WORDS, size=150)]
+            words += [str(w) for w in rng.choice(BIAS_PHRASES, size=int(rng.integers(0, 6)))]
+            words += resume_skills
+            rng.shuffle(words)
+            self.resumes.append({
+                "id": f"resume_{i}",
+                "skills": resume_skills,
+                "raw_text": " ".join(words),
+                "vector": as_stored(vectors[i])
+            })
+
+        self.job = {
+            "id": "job_0",
+            "title": "Senior Software Engineer",
+            "description": "Build scalable backend services and data pipelines",
+            "skills_required": [str(s) for s in rng.choice(skills, size=min(len(skills), 10), replace=False)],
+            "vector": as_stored(vectors[pool_size])
+        }
+
+    def take(self, n: int) -> List[Dict[str, Any]]:
+        """n resumes, cycling through the pool"""
+        pool = self.resumes
+        return [pool[i % len(pool)] for i in range(n)]
+
+def build_benchmarks(data: BenchmarkData) -> Dict[str, Callable[[int], Callable[[], Any]]]:
+    """Benchmark name -> setup(n) returning a call that processes n resumes
+
+    Setup work (selecting inputs, fitting the vectorizer) is never timed.
+    """
+    matcher = ResumeMatcher()
+    advanced_matcher = AdvancedResumeMatcher()
+    text_processor = TextProcessor()
+
+    calculate_match_score = undecorated(matcher.calculate_match_score)
+    rank_resumes = undecorated(matcher.rank_resumes)
+    semantic_skill_matching = undecorated(advanced_matcher.semantic_skill_matching)
+    detect_bias = undecorated(advanced_matcher.detect_bias)
+    extract_skills = undecorated(text_processor.extract_skills)
+    preprocess_text = undecorated(text_processor.preprocess_text)
+
+    job = data.job
+    job_vector, job_skills = job["vector"], job["skills_required"]
+    vectorizer: Optional[ResumeJobVectorizer] = None
+
+    def get_vectorize():
+        nonlocal vectorizer
+        if vectorizer is None:
+            vectorizer = ResumeJobVectorizer()
+            vectorizer.train([resume["raw_text"] for resume in data.resumes])
+        return undecorated(vectorizer.vectorize)
+
+    def texts(n):
+        return [resume["raw_text"] for resume in data.take(n)]
+
+    def setup_calculate_match_score(n):
+        resumes = data.take(n)
+        return lambda: [calculate_match_score(r["vector"], job_vector, r["skills"], job_skills) for r in resumes]
+
+    def setup_rank_resumes(n):
+        resumes = data.take(n)
+        return lambda: rank_resumes(job, resumes)
+
+    def setup_semantic_skill_matching(n):
+        skill_lists = [resume["skills"] for resume in data.take(n)]
+        return lambda: [semantic_skill_matching(skills, job_skills) for skills in skill_lists]
+
+    def setup_detect_bias(n):
+        items = texts(n)
+        return lambda: [detect_bias(text) for text in items]
+
+    def setup_vectorize(n):
+        vectorize = get_vectorize()
+        items = texts(n)
+        return lambda: [vectorize(text) for text in items]
+
+    def setup_extract_skills(n):
+        items = texts(n)
+        skills = data.skills
+        return lambda: [extract_skills(text, skills) for text in items]
+
+    def setup_preprocess_text(n):
+        items = texts(n)
+        return lambda: [preprocess_text(text) for text in items]
+
+    return {
+        "calculate_match_score": setup_calculate_match_score,
+        "rank_resumes": setup_rank_resumes,
+        "semantic_skill_matching": setup_semantic_skill_matching,
+        "detect_bias": setup_detect_bias,
+        "vectorize": setup_vectorize,
+        "extract_skills": setup_extract_skills,
+        "preprocess_text": setup_preprocess_text
+    }
+
+def time_round(func: Callable[[], Any], collect_garbage: bool) -> int:
+    """Nanoseconds of one call; like timeit, the garbage collector is paused unless requested"""
+    gc_enabled = gc.isenabled()
+    if not collect_garbage:
+        gc.collect()
+        gc.disable()
+    try:
+        start = time.perf_counter_ns()
+        func()
+        return time.perf_counter_ns() - start
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+def summarize(times_ns: List[int], items: int) -> Dict[str, Any]:
+    """Round statistics in seconds, plus per-resume cost from the median"""
+    times = [t / 1e9 for t in times_ns]
+    median = statistics.median(times)
+    if len(times) > 1:
+        q1, _, q3 = statistics.quantiles(times, n=4, method="inclusive")
+        stddev = statistics.stdev(times)
+    else:
+        q1 = q3 = times[0]
+        stddev = 0.0
+    return {
+        "rounds": len(times),
+        "min_s": min(times),
+        "max_s": max(times),
+        "mean_s": statistics.fmean(times),
+        "median_s": median,
+        "stddev_s": stddev,
+        "iqr_s": q3 - q1,
+        "per_item_us": median / items * 1e6,
+        "items_per_second": items / median if median > 0 else None
+    }
+
+def run_case(name: str, size: int, func: Callable[[], Any], args) -> Dict[str, Any]:
+    """Warm up, pick a round count that fits the time budget, then time the rounds"""
+    warmup = [time_round(func, args.gc) for _ in range(max(1, args.warmup))]
+    # The last warm-up round is the best guess for a steady-state round
+    rounds = int(args.target_seconds / max(warmup[-1] / 1e9, 1e-9))
+    rounds = max(args.min_rounds, min(args.max_rounds, rounds))
+    times = [time_round(func, args.gc) for _ in range(rounds)]
+    return {"benchmark": name, "size": size, "warmup_rounds": len(warmup), **summarize(times, size)}
+
+def environment() -> Dict[str, Any]:
+    """Interpreter, library and commit details needed to compare runs"""
+    import sklearn
+
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    def git(*command):
+        try:
+            return subprocess.run(["git", *command], cwd=backend_dir, capture_output=True,
+                                  text=True, timeout=10).stdout.strip() or None
+        except Exception:
+            return None
+
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "scikit_learn": sklearn.__version__,
+        "git_commit": git("rev-parse", "HEAD"),
+        "git_dirty": bool(git("status", "--porcelain", "--untracked-files=no"))
+    }
+
+def run_suite(args) -> List[Dict[str, Any]]:
+    skills = default_skills()
+    if args.skills_database:
+        with open(args.skills_database, "r") as f:
+            skills = json.load(f)
+    data = BenchmarkData(args.pool_size, args.dimension, skills, args.vector_format, args.seed)
+    benchmarks = build_benchmarks(data)
+    print(f"{len(data.resumes)} distinct resumes, dimension {args.dimension} ({args.vector_format}), "
+          f"{len(skills)} skills, sizes {args.sizes}\n")
+
+    results = []
+    for name in args.benchmarks:
+        per_item_s = None
+        for size in sorted(args.sizes):
+            # Cost grows with size, so extrapolate from the previous size to skip rounds we cannot afford
+            if per_item_s is not None and per_item_s * size > args.max_round_seconds:
+                estimate = per_item_s * size
+                print(f"{name:<24} n={size:>8}  skipped: ~{estimate:.0f} s per round exceeds --max-round-seconds")
+                results.append({"benchmark": name, "size": size, "skipped": True, "estimated_round_s": estimate})
+                continue
+
+            func = benchmarks[name](size)
+            result = run_case(name, size, func, args)
+            del func
+            per_item_s = result["per_item_us"] / 1e6
+            results.append(result)
+            print(f"{name:<24} n={size:>8}  median={result['median_s'] * 1000:10.2f} ms  "
+                  f"±{result['stddev_s'] * 1000:.2f} ms  per resume={result['per_item_us']:8.2f} us  "
+                  f"rounds={result['rounds']}")
+    return results
+
+def compare(results: List[Dict[str, Any]], baseline_path: str) -> List[Dict[str, Any]]:
+    """Median ratio of each case against a previous run (below 1 is faster)"""
+    with open(baseline_path, "r") as f:
+        baseline = json.load(f)
+    previous = {(r["benchmark"], r["size"]): r for r in baseline.get("results", []) if not r.get("skipped")}
+
+    comparison = []
+    print(f"\nCompared with {baseline_path} ({baseline.get('environment', {}).get('git_commit')})")
+    for result in results:
+        before = previous.get((result["benchmark"], result["size"]))
+        if result.get("skipped") or before is None:
+            continue
+        ratio = result["median_s"] / before["median_s"] if before["median_s"] > 0 else None
+        comparison.append({
+            "benchmark": result["benchmark"],
+            "size": result["size"],
+            "baseline_median_s": before["median_s"],
+            "median_s": result["median_s"],
+            "ratio": ratio
+        })
+        if ratio is not None:
+            print(f"{result['benchmark']:<24} n={result['size']:>8}  {ratio:6.3f}x")
+    return comparison
+
+def main():
+    """Main function to run the benchmark suite"""
+    benchmark_names = ["calculate_match_score", "rank_resumes", "semantic_skill_matching",
+                       "detect_bias", "vectorize", "extract_skills", "preprocess_text"]
+    arg_parser = argparse.ArgumentParser(description="Benchmark matching hot paths at increasing resume counts")
+    arg_parser.add_argument("--benchmarks", nargs="+", choices=benchmark_names, default=benchmark_names)
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000, 1000000],
+                            help="Resumes processed per round")
+    arg_parser.add_argument("--pool-size", type=int, default=1000,
+                            help="Distinct synthetic resumes; larger sizes cycle through them")
+    arg_parser.add_argument("--dimension", type=int, default=1000, help="Length of resume and job vectors")
+    arg_parser.add_argument("--vector-format", choices=["list", "array"], default="list",
+                            help="Vectors as stored in MongoDB (list) or as numpy arrays")
+    arg_parser.add_argument("--skills-database", help="JSON list of skills (defaults to the matcher's synonyms)")
+    arg_parser.add_argument("--warmup", type=int, default=1, help="Untimed rounds before measuring")
+    arg_parser.add_argument("--min-rounds", type=int, default=3)
+    arg_parser.add_argument("--max-rounds", type=int, default=20)
+    arg_parser.add_argument("--target-seconds", type=float, default=2.0,
+                            help="Timed budget per case, used to choose the number of rounds")
+    arg_parser.add_argument("--max-round-seconds", type=float, default=60.0,
+                            help="Skip sizes whose estimated round time exceeds this")
+    arg_parser.add_argument("--gc", action="store_true", help="Keep the garbage collector enabled while timing")
+    arg_parser.add_argument("--seed", type=int, default=42)
+    arg_parser.add_argument("--output", help="Write results as JSON to this file "
+                            "(default: benchmark_suite_results_<timestamp>.json)")
+    arg_parser.add_argument("--compare", help="JSON file of a previous run to compare medians against")
+    args = arg_parser.parse_args()
+
+    print("Matching Hot Path Benchmark Suite")
+    print("=" * 60)
+    results = run_suite(args)
+    comparison = compare(results, args.compare) if args.compare else None
+
+    output = args.output or f"benchmark_suite_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    report = {
+        "environment": environment(),
+        "parameters": vars(args),
+        "results": results,
+        "generated_at": datetime.now().isoformat()
+    }
+    if comparison is not None:
+        report["comparison"] = comparison
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved to: {output}")
+
+if __name__ == "__main__":
+    main()
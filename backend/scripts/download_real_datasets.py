@@ -378,24 +378,21 @@ class RealDatasetIntegrator:
             print(f"Error creating realistic skills dataset: {e}")
             return False
     
-    def preprocess_resume_data(self) -> List[Dict[str, Any]]:
-        """Preprocess resume data with advanced NLP analysis"""
-        print("Preprocessing resume data with advanced NLP...")
-        
-        processed_resumes = []
+    def _analyze_records(self, records: List[Dict[str, Any]], texts: List[str], label: str) -> List[Dict[str, Any]]:
+        """Analyze record texts in one batch, running only the stages that are kept"""
+        analyses = nlp_processor.comprehensive_text_analysis_batch(
+            texts, stages=["entities", "sentiment", "key_phrases", "complexity"]
+        )
+        vectorizer = ResumeJobVectorizer()
         
-        for resume in self.resume_data:
+        processed_records = []
+        for record, text, analysis in zip(records, texts, analyses):
             try:
-                # Get comprehensive text analysis
-                text = f"{resume['summary']} {' '.join(resume['skills'])}"
-                analysis = nlp_processor.comprehensive_text_analysis(text)
-                
                 # Get embeddings
-                vectorizer = ResumeJobVectorizer()
                 vector = vectorizer.vectorize(text)
                 
-                processed_resume = {
-                    **resume,
+                processed_records.append({
+                    **record,
                     "vector": vector.tolist(),
                     "nlp_analysis": {
                         "entities": analysis['entities'],
@@ -404,51 +401,41 @@ class RealDatasetIntegrator:
                         "complexity": analysis['complexity']
                     },
                     "processed_at": datetime.now().isoformat()
-                }
-                
-                processed_resumes.append(processed_resume)
+                })
                 
             except Exception as e:
-                print(f"Error processing resume {resume.get('id', 'unknown')}: {e}")
+                print(f"Error processing {label} {record.get('id', 'unknown')}: {e}")
                 continue
         
-        return processed_resumes
+        return processed_records
+    
+    def preprocess_resume_data(self) -> List[Dict[str, Any]]:
+        """Preprocess resume data with advanced NLP analysis"""
+        print("Preprocessing resume data with advanced NLP...")
+        
+        resumes, texts = [], []
+        for resume in self.resume_data:
+            try:
+                texts.append(f"{resume['summary']} {' '.join(resume['skills'])}")
+                resumes.append(resume)
+            except Exception as e:
+                print(f"Error processing resume {resume.get('id', 'unknown')}: {e}")
+        
+        return self._analyze_records(resumes, texts, "resume")
     
     def preprocess_job_data(self) -> List[Dict[str, Any]]:
         """Preprocess job data with advanced NLP analysis"""
         print("Preprocessing job data with advanced NLP...")
         
-        processed_jobs = []
-        
+        jobs, texts = [], []
         for job in self.job_data:
             try:
-                # Get comprehensive text analysis
-                text = f"{job['title']} {job['description']} {' '.join(job['skills_required'])}"
-                analysis = nlp_processor.comprehensive_text_analysis(text)
-                
-                # Get embeddings
-                vectorizer = ResumeJobVectorizer()
-                vector = vectorizer.vectorize(text)
-                
-                processed_job = {
-                    **job,
-                    "vector": vector.tolist(),
-                    "nlp_analysis": {
-                        "entities": analysis['entities'],
-                        "sentiment": analysis['sentiment'],
-                        "key_phrases": analysis['key_phrases'][:5],  # Top 5 phrases
-                        "complexity": analysis['complexity']
-                    },
-                    "processed_at": datetime.now().isoformat()
-                }
-                
-                processed_jobs.append(processed_job)
-                
+                texts.append(f"{job['title']} {job['description']} {' '.join(job['skills_required'])}")
+                jobs.append(job)
             except Exception as e:
                 print(f"Error processing job {job.get('id', 'unknown')}: {e}")
-                continue
         
-        return processed_jobs
+        return self._analyze_records(jobs, texts, "job")
     
     def create_training_dataset(self) -> pd.DataFrame:
         """Create training dataset for model evaluation"""
@@ -15,6 +15,7 @@ from typing import Dict, List, Any
 # Add parent directory to path to import modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from app.core.memory import memory_accountant
 from app.services.performance_monitor import performance_monitor, load_tester
 from app.services.advanced_matcher import AdvancedResumeMatcher
 from app.services.matcher import ResumeMatcher
@@ -216,7 +217,7 @@ class PerformanceTestSuite:
                 "skills": ["Python", "JavaScript", "React", "Node.js", "MongoDB"] * 10,
                 "experience": [{"duration": "5 years", "description": "Software development" * 100}],
                 "raw_text": "Experienced software engineer " * 1000,
-                "vector": np.random.rand(1000).tolist()
+                "vector": np.random.rand(100).tolist()
             }
             large_resumes.append(resume)
         
@@ -234,6 +235,12 @@ class PerformanceTestSuite:
         # Get final memory
         final_memory = psutil.Process().memory_info().rss / 1024 / 1024  # MB
         
+        # RSS deltas include allocator slack; trace a second run to see where Python allocates
+        memory_accountant.start_tracing()
+        matcher.rank_resumes_advanced(job, large_resumes[:100])
+        traced = memory_accountant.diff(limit=10)
+        memory_accountant.stop_tracing()
+        
         # Clean up
         del large_resumes
         gc.collect()
@@ -245,7 +252,10 @@ class PerformanceTestSuite:
             "final_memory_mb": final_memory,
             "memory_increase_mb": peak_memory - initial_memory,
             "execution_time": end_time - start_time,
-            "resumes_processed": 100
+            "resumes_processed": 100,
+            "traced_peak_mb": traced["status"]["peak_traced_bytes"] / 1024 / 1024,
+            "top_allocations": traced["top"],
+            "components": memory_accountant.report()["components"]
         }
     
     def run_all_tests(self) -> Dict[str, Any]:
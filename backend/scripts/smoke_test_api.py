@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+API Smoke Test for the Resume Upload Flow
+Uploads a plain text resume through the API, lists resumes and deletes the upload
+again, failing if any step errors or a response leaks stored embeddings
+"""
+
+import os
+import sys
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+
+from main import app
+
+SAMPLE_RESUME = b"""Jane Doe
+jane.doe@example.com
++1 555 0100
+
+Summary
+Backend engineer building data pipelines and APIs in Python.
+
+Skills
+Python, FastAPI, MongoDB, Docker, SQL
+
+Experience
+Software Engineer, Example Corp, 2019 - 2024
+Built ingestion services and search features.
+
+Education
+BSc Computer Science, Example University, 2019
+"""
+
+EMBEDDING_FIELDS = ("embedding", "embedding_q", "embedding_f16")
+
+def check(condition: bool, message: str) -> None:
+    if not condition:
+        raise AssertionError(message)
+    print(f"  ok: {message}")
+
+def run_smoke_test(client: TestClient) -> None:
+    """Upload, list and delete one .txt resume"""
+    prefix = "/api/v1/resumes"
+
+    print("POST .txt resume")
+    response = client.post(f"{prefix}/", files={"file": ("smoke_test_resume.txt", SAMPLE_RESUME, "text/plain")})
+    check(response.status_code == 200, f"upload returns 200 (got {response.status_code}: {response.text[:200]})")
+    resume = response.json()
+    check(bool(resume.get("id")), "upload returns the new resume id")
+    check(not any(field in resume for field in EMBEDDING_FIELDS), "upload response has no stored embeddings")
+
+    try:
+        print("GET resumes")
+        response = client.get(f"{prefix}/")
+        check(response.status_code == 200, f"list returns 200 (got {response.status_code}: {response.text[:200]})")
+        listed = [item for item in response.json() if item.get("id") == resume["id"]]
+        check(len(listed) == 1, "list includes the uploaded resume")
+        check(not any(field in listed[0] for field in EMBEDDING_FIELDS), "list response has no stored embeddings")
+    finally:
+        print("DELETE resume")
+        response = client.delete(f"{prefix}/{resume['id']}")
+        check(response.status_code == 200, f"delete returns 200 (got {response.status_code})")
+
+def main():
+    """Run the smoke test against the configured MongoDB"""
+    print("Resume Upload API Smoke Test")
+    print("=" * 60)
+
+    with TestClient(app) as client:
+        run_smoke_test(client)
+
+    print("=" * 60)
+    print("All checks passed")
+
+if __name__ == "__main__":
+    main()
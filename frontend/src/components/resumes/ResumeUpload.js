@@ -157,7 +157,7 @@ const ResumeUpload = ({ onUploadSuccess }) => {
           <FileInput 
             type="file" 
             id="resume-file" 
-            accept=".pdf,.json" 
+            accept=".pdf,.docx,.txt,.json" 
             onChange={handleFileChange} 
           />
           <FileInputLabel htmlFor="resume-file">
@@ -165,7 +165,7 @@ const ResumeUpload = ({ onUploadSuccess }) => {
               <i className="fas fa-file-upload"></i>
             </UploadIcon>
             <UploadText>Drag & drop a file here, or click to browse</UploadText>
-            <UploadSubtext>Supports PDF and JSON files up to 10MB</UploadSubtext>
+            <UploadSubtext>Supports PDF, DOCX, TXT and JSON files up to 10MB</UploadSubtext>
             {file && <FileName>Selected file: {file.name}</FileName>}
           </FileInputLabel>
         </FormGroup>